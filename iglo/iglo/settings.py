@@ -225,6 +225,21 @@ COUNTRIES_FIRST = [
 CELERY_BROKER_URL = env("CELERY_BROKER_URL", default="redis://localhost:6379/0")
 CELERY_TASK_ALWAYS_EAGER = env("CELERY_TASK_ALWAYS_EAGER", default=True, as_bool=True)
 
+# Cache has to be shared between web processes and the worker, so that results saved anywhere invalidate cached
+# pages. Deployments with a worker share the Redis used as the broker. Without a shared cache, e.g. with eager
+# tasks in development, group pages are not cached and IGoR recalculation triggers are not merged, as per-process
+# memory caches would serve stale pages and lose triggers.
+CACHE_URL = env("CACHE_URL", required=False, default=None if CELERY_TASK_ALWAYS_EAGER else CELERY_BROKER_URL)
+SHARED_CACHE = bool(CACHE_URL)
+if SHARED_CACHE:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+GROUP_PAGE_CACHE_TIMEOUT = env("GROUP_PAGE_CACHE_TIMEOUT", as_int=True, default=60 * 60)
+
 # Periodic task schedules uses the UTC time zone
 CELERY_BEAT_SCHEDULE = {
     "send-upcoming-games-reminder": {
@@ -238,7 +253,21 @@ CELERY_BEAT_SCHEDULE = {
     "mark-overdue-games-as-unplayed": {
         "task": "league.tasks.mark_overdue_games_as_unplayed",
         "schedule": crontab(minute="15", hour='*'),
-    }
+    },
+    "fetch-pending-sgfs": {
+        "task": "league.tasks.fetch_pending_sgfs",
+        "schedule": crontab(minute="45", hour='*'),
+    },
+    "upload-ai-analyses": {
+        "task": "league.tasks.upload_ai_analyses",
+        "schedule": crontab(minute="*/15"),
+    },
+    # Incremental IGoR fits keep ratings of earlier seasons, a full refit lets new results move them too
+    "recalculate-igor-full": {
+        "task": "league.tasks.recalculate_igor",
+        "schedule": crontab(day_of_week="mon", hour="3", minute="30"),
+        "kwargs": {"full": True},
+    },
 }
 
 AI_SENSEI = {
@@ -247,6 +276,33 @@ AI_SENSEI = {
     "EMAIL": env("AI_SENSEI_EMAIL", required=False),
     "PASSWORD": env("AI_SENSEI_PASSWORD", required=False),
 }
+AI_SENSEI_UPLOAD_WORKERS = env("AI_SENSEI_UPLOAD_WORKERS", default=2, as_int=True)
+
+# On-disk cache of responses of EGD, OGS and KGS, empty path disables it
+HTTP_CACHE_PATH = env("HTTP_CACHE_PATH", default=str(BASE_DIR / "../../data/http_cache/responses.sqlite3"))
+HTTP_CACHE_MAX_SIZE = env("HTTP_CACHE_MAX_SIZE", default=256 * 1024 * 1024, as_int=True)
+# Time to live in seconds of responses with URLs matching patterns, the first matching pattern is used
+HTTP_CACHE_TTLS = [
+    (r"^https?://www\.europeangodatabase\.eu/", 6 * 60 * 60),
+    (r"^https://online-go\.com/api/v1/players", 60 * 60),
+    (r"^https://online-go\.com/api/v1/games/\d+/sgf", 30 * 24 * 60 * 60),
+    (r"^https?://www\.gokgs\.com/gameArchives\.jsp", 24 * 60 * 60),
+    (r"^https?://files\.gokgs\.com/", 30 * 24 * 60 * 60),
+]
+
+# Ratings sync with EGD - concurrent requests, requests per second and age (in hours) of data which is not refreshed
+EGD_SYNC_WORKERS = env("EGD_SYNC_WORKERS", default=4, as_int=True)
+EGD_RATE_LIMIT = env("EGD_RATE_LIMIT", default=5, as_int=True)
+EGD_SYNC_MAX_AGE = env("EGD_SYNC_MAX_AGE", default=12, as_int=True)
+# Ratings sync with OGS - concurrent requests and requests per second
+OGS_SYNC_WORKERS = env("OGS_SYNC_WORKERS", default=4, as_int=True)
+OGS_RATE_LIMIT = env("OGS_RATE_LIMIT", default=5, as_int=True)
+# Scraping of KGS archives by fill_kgs_games - concurrent requests and requests per second
+KGS_SCRAPE_WORKERS = env("KGS_SCRAPE_WORKERS", default=4, as_int=True)
+KGS_RATE_LIMIT = env("KGS_RATE_LIMIT", default=4, as_int=True)
+# SGF links entered within that many seconds are fetched in one batch
+SGF_FETCH_DELAY = env("SGF_FETCH_DELAY", default=30, as_int=True)
+SGF_FETCH_BATCH_SIZE = env("SGF_FETCH_BATCH_SIZE", default=100, as_int=True)
 
 OGS_GAME_LINK_REGEX = r"https:\/\/online-go\.com\/game\/(\d+)"
 OGS_SGF_LINK_FORMAT = "https://online-go.com/api/v1/games/{id}/sgf"
@@ -306,6 +362,13 @@ if FAST_IGOR:
     IGOR_MAX_STEPS = env("IGOR_MAX_STEPS", default=30, as_int=True)
 else:
     IGOR_MAX_STEPS = env("IGOR_MAX_STEPS", default=1000, as_int=True)
+# Result edits coming within that many seconds are merged into a single IGoR recalculation
+IGOR_RECALCULATION_DELAY = env("IGOR_RECALCULATION_DELAY", default=5 * 60, as_int=True)
+# Incremental IGoR fits refit also that many seasons before the first one whose matches changed, which keeps their
+# ratings close to the ones of a full refit
+IGOR_REFIT_TRAILING_SEASONS = env("IGOR_REFIT_TRAILING_SEASONS", default=3, as_int=True)
+# Number of stored IGoR fits, least recently used are deleted first
+IGOR_FIT_RETENTION = env("IGOR_FIT_RETENTION", default=10, as_int=True)
 IGOR_CONFIG = {
     'season_rating_stability': 0.5,
     'smoothing': 0.25,
@@ -34,6 +34,13 @@ class GroupSerializer(ModelSerializer):
 
 class MemberSerializer(ModelSerializer):
     player = serializers.CharField(source="player.nick")
+    points = serializers.IntegerField(source="standing.points", read_only=True)
+    score = serializers.FloatField(source="standing.score", read_only=True)
+    sodos = serializers.IntegerField(source="standing.sodos", read_only=True)
+    sos = serializers.FloatField(source="standing.sos", read_only=True)
+    sosos = serializers.FloatField(source="standing.sosos", read_only=True)
+    walkovers = serializers.IntegerField(source="standing.walkovers", read_only=True)
+    position = serializers.IntegerField(source="standing.position", read_only=True)
 
     class Meta:
         model = Member
@@ -44,6 +51,13 @@ class MemberSerializer(ModelSerializer):
             "order",
             "final_order",
             "initial_score",
+            "points",
+            "score",
+            "sodos",
+            "sos",
+            "sosos",
+            "walkovers",
+            "position",
         ]
 
 
@@ -88,7 +102,7 @@ class GroupViewSet(ListModelMixin, RetrieveModelMixin, NestedViewSetMixin, Gener
 
 
 class MemberViewSet(ListModelMixin, RetrieveModelMixin, NestedViewSetMixin, GenericViewSet):
-    queryset = Member.objects.all().select_related("player")
+    queryset = Member.objects.all().select_related("player", "standing")
     serializer_class = MemberSerializer
 
 
@@ -0,0 +1,68 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from accounts.models import UserRole
+
+GROUP_RESULTS_FRAGMENT = "group_results"
+
+ROLE_CLASS_ANONYMOUS = "anonymous"
+ROLE_CLASS_PLAYER = "player"
+ROLE_CLASS_TEACHER = "teacher"
+ROLE_CLASS_REFEREE = "referee"
+ROLE_CLASS_ADMIN = "admin"
+ROLE_CLASSES = [ROLE_CLASS_ANONYMOUS, ROLE_CLASS_PLAYER, ROLE_CLASS_TEACHER, ROLE_CLASS_REFEREE, ROLE_CLASS_ADMIN]
+
+
+def get_role_class(user) -> str:
+    """Users of the same role class see the same group page, so they can share cached fragments."""
+    if not user.is_authenticated:
+        return ROLE_CLASS_ANONYMOUS
+    if user.is_admin:
+        return ROLE_CLASS_ADMIN
+    if user.has_role(UserRole.REFEREE):
+        return ROLE_CLASS_REFEREE
+    if user.has_role(UserRole.TEACHER):
+        return ROLE_CLASS_TEACHER
+    return ROLE_CLASS_PLAYER
+
+
+def get_group_page_version_key(season_number: int, group_name: str) -> str:
+    return f"league:group-page-version:{season_number}:{group_name.upper()}"
+
+
+def get_group_page_version(season_number: int, group_name: str) -> str:
+    """Version of cached pages of the group, a new one is set whenever the group page changes."""
+    key = get_group_page_version_key(season_number, group_name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_group_page_key(
+    season_number: int, group_name: str, version: str, language: str, role_class: str, scheme: str, host: str
+) -> str:
+    # Pages contain absolute links to the requested host, so every host gets its own copy. Copies can't be listed
+    # to be deleted, instead they are invalidated all at once by a new version of the group.
+    return f"league:group-page:{season_number}:{group_name.upper()}:{version}:{language}:{role_class}:{scheme}:{host}"
+
+
+def get_group_results_fragment_key(season_number: int, group_name: str, language: str, role_class: str) -> str:
+    return make_template_fragment_key(
+        GROUP_RESULTS_FRAGMENT, [season_number, group_name.upper(), language, role_class]
+    )
+
+
+def invalidate_group_page(season_number: int, group_name: str) -> None:
+    cache.set(get_group_page_version_key(season_number, group_name), uuid.uuid4().hex, timeout=None)
+    cache.delete_many(
+        [
+            get_group_results_fragment_key(season_number, group_name, language, role_class)
+            for language, _ in settings.LANGUAGES
+            for role_class in ROLE_CLASSES
+        ]
+    )
@@ -7,10 +7,23 @@ from rest_framework.renderers import JSONRenderer
 from rest_framework_extensions.routers import ExtendedDefaultRouter
 
 from django.conf import settings
-from league.models import Game, WinType, Player
+from league.models import Game, WinType, Player, IgorFit, Member, Group
 
 import accurating
+import hashlib
+import jax
+import jax.numpy as jnp
 import json
+import logging
+import numpy as np
+import time
+from accurating.model import apply_selective_smoothing, log_data_prob
+from typing import Optional
+
+logger = logging.getLogger("league")
+
+# Incremental fit stops when no rating moves by more than that (in units of `rating_difference_for_2_to_1_odds`)
+CONVERGENCE_TOLERANCE = 1e-6
 
 
 class IgorMatchSerializer(ModelSerializer):
@@ -48,48 +61,255 @@ def register(router: ExtendedDefaultRouter):
     router.register("igor-matches", IgorViewSet, basename="api-igor-matches")
 
 
-def recalculate_igor():
-
+def recalculate_igor(full: bool = False) -> tuple[IgorFit, dict[str, float]]:
+    """
+    Fits IGoR ratings and saves them to players. If a stored fit has the same config and matches, its ratings are
+    reused without fitting. Otherwise, unless `full` is set, only seasons starting `IGOR_REFIT_TRAILING_SEASONS`
+    before the first one whose matches changed since the last fit are refitted, warm-started from its ratings.
+    Earlier seasons keep their stored ratings, they are refitted by the periodic full refit.
+    Returns the fit and duration of each phase in seconds.
+    """
     igor_config = settings.IGOR_CONFIG
     # igor_config['max_steps'] = 20
     ar_config = accurating.Config(**igor_config)
+    timings = {}
+
+    phase_start = time.perf_counter()
+    matches = load_matches()
+    season_digests = get_season_digests(matches)
+    content_hash = get_content_hash(config=igor_config, season_digests=season_digests)
+    stored_fit = IgorFit.objects.get_by_content_hash(content_hash, full=full)
+    if stored_fit:
+        first_season = None
+    else:
+        last_fit = None if full else IgorFit.objects.get_last()
+        first_season = get_first_affected_season(last_fit=last_fit, config=igor_config, season_digests=season_digests)
+        if first_season:
+            first_season = max(first_season - settings.IGOR_REFIT_TRAILING_SEASONS, 0)
+        stored_fit = last_fit
+    timings["load"] = time.perf_counter() - phase_start
+
+    phase_start = time.perf_counter()
+    if first_season is None:
+        logger.info("IGoR matches and config did not change since a stored fit, reusing its ratings")
+        fit = stored_fit
+        fit.mark_used()
+    else:
+        if first_season == 0:
+            model = accurating.fit(accurating.data_from_dicts(matches), ar_config)
+            ratings = {nick: [rating for _, rating in sorted(history.items())] for nick, history in model.rating.items()}
+            learning_rate, steps = None, None
+        else:
+            ratings, learning_rate, steps = fit_seasons(
+                matches=matches,
+                config=ar_config,
+                ratings=last_fit.ratings,
+                learning_rate=last_fit.learning_rate if last_fit.learning_rate is not None else ar_config.initial_lr,
+                first_season=first_season,
+                season_count=len(season_digests),
+            )
+        fit = IgorFit.objects.create(
+            content_hash=content_hash,
+            config=igor_config,
+            season_digests=season_digests,
+            ratings=ratings,
+            learning_rate=learning_rate,
+            first_fitted_season=first_season,
+            steps=steps,
+            duration=time.perf_counter() - phase_start,
+        )
+        IgorFit.objects.delete_least_recently_used(keep=settings.IGOR_FIT_RETENTION)
+    timings["fit"] = time.perf_counter() - phase_start
+
+    phase_start = time.perf_counter()
+    _save_player_ratings(fit.ratings)
+    timings["persist"] = time.perf_counter() - phase_start
+
+    logger.info(
+        f"IGoR recalculated from season index {first_season} with {len(matches)} matches: "
+        + ", ".join(f"{phase} {duration:.3f}s" for phase, duration in timings.items())
+    )
+    return fit, timings
+
 
-    matches = [
+def get_current_content_hash() -> str:
+    """Content hash of the current config and matches, equal to the one of a fit made from them."""
+    return get_content_hash(config=settings.IGOR_CONFIG, season_digests=get_season_digests(load_matches()))
+
+
+def load_matches() -> list[dict]:
+    return [
         dict(
-            p1=game.black.player.nick,
-            p2=game.white.player.nick,
-            season=game.group.season.number - 1,  # For internal datastructure we index seasons from 0
-            winner=game.winner.player.nick,
-        ) for game in igor_matches()
+            p1=black,
+            p2=white,
+            season=season_number - 1,  # For internal datastructure we index seasons from 0
+            winner=winner,
+        )
+        for black, white, season_number, winner in igor_matches().values_list(
+            "black__player__nick", "white__player__nick", "group__season__number", "winner__player__nick"
+        )
     ]
     # The above code is equivalent to:
     # matches_json = JSONRenderer().render(IgorMatchSerializer(igor_matches(), many=True).data)
     # matches = json.loads(matches_json)
-    ar_data = accurating.data_from_dicts(matches)
-    model = accurating.fit(ar_data, ar_config)
-
-    to_update = Player.objects.filter(nick__in=model.rating.keys())
-    for player in to_update:
-        if player.nick in model.rating:
-            memberships = player.memberships.select_related("group__season")
-            participated_seasons = {m.group.season.number - 1 for m in memberships} # index seasons from 0
-
-            def get_rating(kv):
-                season, rating = kv
-                return rating if season in participated_seasons else None
-
-            pratings = model.rating[player.nick]
-            pratings = sorted(pratings.items())
-            pratings = list(map(get_rating, pratings))
-            player.igor_history = pratings
-            non_none_pratings = [r for r in pratings if r is not None]
-            if len(non_none_pratings) > 0:
-                player.igor = non_none_pratings[-1]
-
-            # Useful when testing from `manage.py shell` (PTAL README.md):
-            # print("player.nick = ", player.nick)
-            # print("participated_seasons = ", participated_seasons)
-            # print("player.igor_history = ", player.igor_history)
-            # print()
-
-    Player.objects.bulk_update(to_update, fields=['igor', 'igor_history'])
+
+
+def get_season_digests(matches: list[dict]) -> list[str]:
+    """Digest of matches of every season, independent of the order in which matches were loaded."""
+    seasons = [[] for _ in range(max((match["season"] for match in matches), default=-1) + 1)]
+    for match in matches:
+        seasons[match["season"]].append([match["p1"], match["p2"], match["winner"]])
+    return [hashlib.sha256(json.dumps(sorted(season_matches)).encode()).hexdigest() for season_matches in seasons]
+
+
+def get_content_hash(config: dict, season_digests: list[str]) -> str:
+    return hashlib.sha256(json.dumps([config, season_digests], sort_keys=True).encode()).hexdigest()
+
+
+def get_first_affected_season(last_fit: Optional[IgorFit], config: dict, season_digests: list[str]) -> Optional[int]:
+    """Returns index of the first season which has to be refitted, 0 means a full refit and None no refit at all."""
+    if last_fit is None or last_fit.config != config or len(season_digests) < len(last_fit.season_digests):
+        return 0
+    for season, digest in enumerate(season_digests):
+        if season >= len(last_fit.season_digests) or digest != last_fit.season_digests[season]:
+            return season
+    return None
+
+
+def fit_seasons(
+    matches: list[dict],
+    config: accurating.Config,
+    ratings: dict[str, list[float]],
+    learning_rate: float,
+    first_season: int,
+    season_count: int,
+) -> tuple[dict[str, list[float]], float, int]:
+    """
+    Refits ratings of seasons from `first_season` on. Matches, smoothing and priors of these seasons are scored like
+    in `accurating.fit`, but ratings of earlier seasons are fixed to stored `ratings` instead of being fitted too, and
+    the last of them anchors the refitted ones through `season_rating_stability`. So it only approximates a full fit:
+    results can't move ratings of frozen seasons, which makes refitted ones drift from those of a full fit.
+    Optimization is warm-started from stored ratings and learning rate. With `first_season` 0 and no `ratings` nothing
+    is frozen, so it is a full fit from scratch.
+    Returns new ratings, final learning rate and number of steps.
+    """
+    scale = config.rating_difference_for_2_to_1_odds
+    window_size = season_count - first_season
+    window_matches = [match for match in matches if match["season"] >= first_season]
+    nicks = sorted(set(ratings) | {match["p1"] for match in window_matches} | {match["p2"] for match in window_matches})
+    index = {nick: idx for idx, nick in enumerate(nicks)}
+
+    # Players without stored ratings are new, they start from the middle of priors and are not anchored
+    default_rating = (config.winner_prior_rating + config.loser_prior_rating) / 2.0 / scale
+    initial_rating = np.full((len(nicks), window_size), default_rating)
+    anchor_rating = np.full(len(nicks), default_rating)
+    anchor_weight = np.zeros(len(nicks))
+    for nick, history in ratings.items():
+        idx = index[nick]
+        anchor_rating[idx] = history[first_season - 1] / scale
+        anchor_weight[idx] = 1.0
+        known = [rating / scale for rating in history[first_season:season_count]]
+        initial_rating[idx, : len(known)] = known
+        initial_rating[idx, len(known) :] = known[-1] if known else anchor_rating[idx]
+
+    p1s = np.array([index[match["p1"]] for match in window_matches], dtype=int)
+    p2s = np.array([index[match["p2"]] for match in window_matches], dtype=int)
+    seasons = np.array([match["season"] - first_season for match in window_matches], dtype=int)
+    p1_win_probs, p2_win_probs = apply_selective_smoothing(
+        p1s,
+        p2s,
+        seasons,
+        np.array([1.0 if match["winner"] == match["p1"] else 0.0 for match in window_matches]),
+        config.smoothing,
+        False,
+    )
+    data_size = max(len(window_matches), 1)
+    winner_prior = config.winner_prior_rating / scale
+    loser_prior = config.loser_prior_rating / scale
+
+    def objective(rating):
+        log_likelihood = jnp.sum(log_data_prob(rating[p1s, seasons], rating[p2s, seasons], p1_win_probs, p2_win_probs))
+        if config.season_rating_stability > 0.0:
+            log_likelihood -= config.season_rating_stability * jnp.sum((rating[:, 1:] - rating[:, :-1]) ** 2)
+            log_likelihood -= config.season_rating_stability * jnp.sum(anchor_weight * (rating[:, 0] - anchor_rating) ** 2)
+        if config.winner_prior_match_count > 0.0:
+            log_likelihood += jnp.sum(
+                log_data_prob(rating, jnp.ones_like(rating) * winner_prior, 0.0, config.winner_prior_match_count)
+            )
+        if config.loser_prior_match_count > 0.0:
+            log_likelihood += jnp.sum(
+                log_data_prob(rating, jnp.ones_like(rating) * loser_prior, config.loser_prior_match_count, 0.0)
+            )
+        return log_likelihood / data_size
+
+    rating, learning_rate, steps = _optimize(
+        objective, jnp.array(initial_rating), learning_rate=learning_rate, max_steps=config.max_steps
+    )
+    rating = np.asarray(rating) * scale
+
+    new_ratings = {}
+    for nick, idx in index.items():
+        window = [float(value) for value in rating[idx]]
+        earlier = ratings[nick][:first_season] if nick in ratings else [window[0]] * first_season
+        new_ratings[nick] = earlier + window
+    return new_ratings, learning_rate, steps
+
+
+def _optimize(objective, params, learning_rate: float, max_steps: int):
+    """Momentum gradient ascent with restarts, the same as used by `accurating.fit`."""
+    value_and_grad = jax.jit(jax.value_and_grad(objective))
+    momentum = jnp.zeros_like(params)
+    last_params, last_value, last_grad = params, -np.inf, jnp.zeros_like(params)
+    last_reset_step = None
+    step = 0
+    for step in range(1, max_steps + 1):
+        value, grad = value_and_grad(params)
+        if value < last_value:
+            learning_rate /= 1.5
+            if last_reset_step == step - 1:
+                learning_rate /= 4
+            last_reset_step = step
+            momentum = jnp.zeros_like(params)
+            params, value, grad = last_params, last_value, last_grad
+        else:
+            last_params, last_value, last_grad = params, value, grad
+        momentum = momentum + grad
+        params = params + learning_rate * momentum
+        if float(jnp.max(jnp.abs(params - last_params))) < CONVERGENCE_TOLERANCE:
+            break
+        learning_rate *= 1.5 ** (1.0 / 12)
+    return params, learning_rate, step
+
+
+def apply_fit(fit: IgorFit) -> None:
+    """Saves ratings of a stored fit to players, e.g. to roll back, and makes it the base of the next recalculation."""
+    fit.mark_used()
+    _save_player_ratings(fit.ratings)
+
+
+def _save_player_ratings(ratings: dict[str, list[float]]) -> None:
+    players = list(Player.objects.filter(nick__in=ratings.keys()))
+    if not players:
+        return
+    season_count = max(len(history) for history in ratings.values())
+    rows = {player.id: row for row, player in enumerate(players)}
+
+    # Matrix of seasons (indexed from 0) in which players participated, loaded with a single query
+    participated = np.zeros((len(players), season_count), dtype=bool)
+    for player_id, season_number in Member.objects.filter(player__in=players).values_list(
+        "player_id", "group__season__number"
+    ):
+        if season_number - 1 < season_count:
+            participated[rows[player_id], season_number - 1] = True
+
+    rating = np.array([ratings[player.nick] for player in players], dtype=float)
+    histories = np.where(participated, rating, None).tolist()
+    last_participated = season_count - 1 - np.argmax(participated[:, ::-1], axis=1)
+    has_participated = participated.any(axis=1)
+    for row, player in enumerate(players):
+        player.igor_history = histories[row]
+        if has_participated[row]:
+            player.igor = float(rating[row, last_participated[row]])
+
+    Player.objects.bulk_update(players, fields=['igor', 'igor_history'])
+    Group.objects.invalidate_page_cache_of_players(list(rows))
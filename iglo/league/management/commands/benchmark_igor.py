@@ -0,0 +1,167 @@
+import csv
+import io
+import itertools
+import json
+import math
+import multiprocessing
+import resource
+import time
+
+import accurating
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from league import igor
+from misc.benchmark import get_environment
+
+CSV_FIELDS = [
+    "season_rating_stability",
+    "smoothing",
+    "prior_match_count",
+    "max_steps",
+    "matches",
+    "log_loss",
+    "accuracy",
+    "fit_time",
+    "steps",
+    "worker_max_rss",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "sweep IGoR configs over local match history with season by season backtesting, "
+        "results are written as JSON or CSV"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--season-rating-stability", type=float, nargs="+")
+        parser.add_argument("--smoothing", type=float, nargs="+")
+        parser.add_argument(
+            "--prior-match-count", type=float, nargs="+", help="used as both winner and loser prior match count"
+        )
+        parser.add_argument("--max-steps", type=int, nargs="+")
+        parser.add_argument(
+            "--min-train-seasons", type=int, default=1, help="number of first seasons used only for training"
+        )
+        parser.add_argument("--workers", type=int, default=2, help="number of processes fitting configs in parallel")
+        parser.add_argument("--format", choices=["json", "csv"], default="json")
+        parser.add_argument("--output", help="path of the output file, standard output by default")
+
+    def handle(self, *args, **options):
+        matches = igor.load_matches()
+        base_config = {**settings.IGOR_CONFIG, "do_log": False}
+        configs = [
+            {
+                **base_config,
+                "season_rating_stability": stability,
+                "smoothing": smoothing,
+                "winner_prior_match_count": prior_match_count,
+                "loser_prior_match_count": prior_match_count,
+                "max_steps": max_steps,
+            }
+            for stability, smoothing, prior_match_count, max_steps in itertools.product(
+                options["season_rating_stability"] or [base_config["season_rating_stability"]],
+                options["smoothing"] or [base_config["smoothing"]],
+                options["prior_match_count"] or [base_config["winner_prior_match_count"]],
+                options["max_steps"] or [base_config["max_steps"]],
+            )
+        ]
+
+        # jax is multithreaded, so workers are spawned instead of forked. Every config is fitted in a new worker,
+        # so that its peak memory is not the one of configs fitted before in the same process.
+        with multiprocessing.get_context("spawn").Pool(
+            processes=options["workers"], initializer=django.setup, maxtasksperchild=1
+        ) as pool:
+            results = pool.starmap(
+                backtest,
+                zip(configs, itertools.repeat(matches), itertools.repeat(options["min_train_seasons"])),
+                chunksize=1,
+            )
+
+        if options["format"] == "csv":
+            output = io.StringIO()
+            writer = csv.DictWriter(output, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for result in results:
+                writer.writerow(
+                    {
+                        **result,
+                        "season_rating_stability": result["config"]["season_rating_stability"],
+                        "smoothing": result["config"]["smoothing"],
+                        "prior_match_count": result["config"]["winner_prior_match_count"],
+                        "max_steps": result["config"]["max_steps"],
+                    }
+                )
+            report = output.getvalue()
+        else:
+            report = json.dumps(
+                {"environment": get_environment(), "matches": len(matches), "results": results}, indent=2
+            )
+        if options["output"]:
+            with open(options["output"], "w") as output_file:
+                output_file.write(report)
+        else:
+            self.stdout.write(report)
+
+
+def backtest(config: dict, matches: list[dict], min_train_seasons: int) -> dict:
+    """
+    For every season fits the model on all earlier seasons and predicts its matches with ratings of the last
+    trained season. Players without a rating yet get the middle of priors.
+    """
+    ar_config = accurating.Config(**config)
+    scale = ar_config.rating_difference_for_2_to_1_odds
+    default_rating = (ar_config.winner_prior_rating + ar_config.loser_prior_rating) / 2.0
+    season_count = max((match["season"] for match in matches), default=-1) + 1
+
+    seasons = []
+    for test_season in range(max(min_train_seasons, 1), season_count):
+        train_matches = [match for match in matches if match["season"] < test_season]
+        test_matches = [match for match in matches if match["season"] == test_season]
+        if not train_matches or not test_matches:
+            continue
+        start = time.perf_counter()
+        ratings, _, steps = igor.fit_seasons(
+            matches=train_matches,
+            config=ar_config,
+            ratings={},
+            learning_rate=ar_config.initial_lr,
+            first_season=0,
+            season_count=test_season,
+        )
+        fit_time = time.perf_counter() - start
+
+        log_loss = 0.0
+        correct = 0.0
+        for match in test_matches:
+            p1_rating = ratings[match["p1"]][-1] if match["p1"] in ratings else default_rating
+            p2_rating = ratings[match["p2"]][-1] if match["p2"] in ratings else default_rating
+            p1_win_prob = 1.0 / (1.0 + math.pow(2.0, (p2_rating - p1_rating) / scale))
+            winner_prob = p1_win_prob if match["winner"] == match["p1"] else 1.0 - p1_win_prob
+            log_loss -= math.log(max(winner_prob, 1e-15))
+            correct += 1.0 if winner_prob > 0.5 else 0.5 if winner_prob == 0.5 else 0.0
+        seasons.append(
+            {
+                "season": test_season + 1,  # seasons are indexed from 0 internally
+                "matches": len(test_matches),
+                "log_loss": log_loss / len(test_matches),
+                "accuracy": correct / len(test_matches),
+                "fit_time": fit_time,
+                "steps": steps,
+            }
+        )
+
+    matches_count = sum(season["matches"] for season in seasons)
+    return {
+        "config": config,
+        "matches": matches_count,
+        "log_loss": sum(s["log_loss"] * s["matches"] for s in seasons) / matches_count if matches_count else None,
+        "accuracy": sum(s["accuracy"] * s["matches"] for s in seasons) / matches_count if matches_count else None,
+        "fit_time": sum(season["fit_time"] for season in seasons),
+        "steps": max((season["steps"] for season in seasons), default=0),
+        # High-water mark of the worker process fitting only this config, in kilobytes on Linux
+        "worker_max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "seasons": seasons,
+    }
@@ -0,0 +1,171 @@
+import json
+import math
+import random
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+
+from league.utils.paring import round_robin, banded_round_robin, shuffle_colors, Bye
+from macmahon import macmahon as mm
+from misc.benchmark import measure, positive_int, summarize, get_environment
+
+MCMAHON_ENGINES = {
+    "mcmahon-greedy": mm.PairingEngine.GREEDY,
+    "mcmahon-optimal": mm.PairingEngine.OPTIMAL,
+}
+SCHEDULE_ENGINES = ["round-robin", "banded-round-robin"]
+
+
+class Command(BaseCommand):
+    help = "benchmark runtime, memory and quality of pairing engines on synthetic leagues, results are written as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--players", type=int, nargs="+", default=[10, 100, 1000])
+        parser.add_argument("--rounds", type=int, nargs="+", default=[5, 12])
+        parser.add_argument(
+            "--engines", nargs="+", choices=[*MCMAHON_ENGINES, *SCHEDULE_ENGINES], default=[*MCMAHON_ENGINES, *SCHEDULE_ENGINES]
+        )
+        parser.add_argument("--band-size", type=int, default=2)
+        parser.add_argument("--repeat", type=positive_int, default=3, help="number of timed calls, the best one is reported")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="path of the JSON file, standard output by default")
+
+    def handle(self, *args, **options):
+        results = []
+        for engine in options["engines"]:
+            for players_count in options["players"]:
+                if engine in MCMAHON_ENGINES:
+                    for rounds_count in options["rounds"]:
+                        results.append(
+                            benchmark_mcmahon(
+                                engine=engine,
+                                players_count=players_count,
+                                rounds_count=rounds_count,
+                                repeat=options["repeat"],
+                                seed=options["seed"],
+                            )
+                        )
+                else:
+                    results.append(
+                        benchmark_schedule(
+                            engine=engine,
+                            players_count=players_count,
+                            band_size=options["band_size"],
+                            repeat=options["repeat"],
+                            seed=options["seed"],
+                        )
+                    )
+        report = json.dumps({"environment": get_environment(), "seed": options["seed"], "results": results}, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report)
+        else:
+            self.stdout.write(report)
+
+
+def _measure_from_same_state(func, *args, repeat: int, **kwargs):
+    """
+    Measures the function, then returns result of one more call made with the global random state from before the
+    measurement. Timed calls consume the global random, so otherwise results and the following rounds would depend
+    on the number of repeats.
+    """
+    state = random.getstate()
+    _, measurement = measure(func, *args, repeat=repeat, **kwargs)
+    random.setstate(state)
+    return func(*args, **kwargs), measurement
+
+
+def benchmark_mcmahon(engine: str, players_count: int, rounds_count: int, repeat: int, seed: int) -> dict:
+    """Simulates a McMahon tournament, pairing every round with the engine and drawing results by rating."""
+    rng = random.Random(seed)
+    random.seed(seed)  # engines use global random for nigiri
+    registered_players = sorted(
+        ((f"player-{idx}", rng.randint(100, 2700)) for idx in range(players_count)), key=lambda player: -player[1]
+    )
+    players = mm.BasicInitialOrdering(number_of_bars=2).order(registered_players)
+    calls = []
+    quality = defaultdict(int)
+    score_distances = []
+    error = None
+    for _ in range(rounds_count):
+        try:
+            (pairs, bye), measurement = _measure_from_same_state(
+                mm.prepare_next_round, players, engine=MCMAHON_ENGINES[engine], repeat=repeat
+            )
+        except (IndexError, ValueError) as e:
+            error = f"{type(e).__name__}: {e}"
+            break
+        calls.append(measurement)
+        scores = {score.player.name: score.score for score in mm.Scoring().get_scores(players)}
+        for pair in pairs:
+            score_distances.append(abs(scores[pair.black.name] - scores[pair.white.name]))
+            if pair.white.name in {game.opponent for game in pair.black.games}:
+                quality["repeat_pairings"] += 1
+        players = _play_round(players=players, pairs=pairs, bye=bye, rng=rng)
+
+    color_imbalance = [
+        abs(sum(1 if game.color == mm.Color.BLACK else -1 for game in player.games if game.color != mm.Color.BYE))
+        for player in players
+    ]
+    return {
+        "engine": engine,
+        "players": players_count,
+        "rounds": rounds_count,
+        "rounds_paired": len(calls),
+        "error": error,
+        "wall_time": summarize([call.wall_time for call in calls]),
+        "retained_bytes": summarize([call.retained_bytes for call in calls]),
+        "peak_memory": max((call.peak_memory for call in calls), default=0),
+        "quality": {
+            "repeat_pairings": quality["repeat_pairings"],
+            "color_imbalance": summarize(color_imbalance),
+            "score_distance": summarize(score_distances),
+        },
+    }
+
+
+def _play_round(players: list[mm.Player], pairs: list[mm.Pair], bye: mm.Player, rng: random.Random) -> list[mm.Player]:
+    new_games = defaultdict(list)
+    for pair in pairs:
+        # Probability of black winning as in Elo with ratings in GoR-like scale
+        black_wins = rng.random() < 1 / (1 + math.pow(10, (pair.white.rating - pair.black.rating) / 400))
+        new_games[pair.black.name].append(
+            mm.GameRecord(pair.white.name, mm.Color.BLACK, mm.ResultType.WIN if black_wins else mm.ResultType.LOSE)
+        )
+        new_games[pair.white.name].append(
+            mm.GameRecord(pair.black.name, mm.Color.WHITE, mm.ResultType.LOSE if black_wins else mm.ResultType.WIN)
+        )
+    if bye:
+        new_games[bye.name].append(mm.GameRecord("", mm.Color.BYE, mm.ResultType.BYE))
+    return [mm.Player(p.name, p.rating, p.initial_score, p.games + new_games[p.name]) for p in players]
+
+
+def benchmark_schedule(engine: str, players_count: int, band_size: int, repeat: int, seed: int) -> dict:
+    random.seed(seed)  # colors are shuffled with global random
+    if engine == "round-robin":
+        pairing, pairing_measurement = measure(round_robin, n=players_count, repeat=repeat)
+    else:
+        pairing, pairing_measurement = measure(
+            banded_round_robin, player_count=players_count, band_size=band_size, add_byes=True, repeat=repeat
+        )
+    shuffled, shuffle_measurement = _measure_from_same_state(shuffle_colors, paring=pairing, repeat=repeat)
+
+    pairs = [pair for round_pairs in shuffled for pair in round_pairs if not isinstance(pair[1], Bye)]
+    pair_counts = Counter(frozenset(pair) for pair in pairs)
+    colors = Counter()
+    for black, white in pairs:
+        colors[black] += 1
+        colors[white] -= 1
+    return {
+        "engine": engine,
+        "players": players_count,
+        "rounds": len(shuffled),
+        "pairing": pairing_measurement.as_dict(),
+        "shuffle_colors": shuffle_measurement.as_dict(),
+        "quality": {
+            "repeat_pairings": sum(count - 1 for count in pair_counts.values()),
+            "color_imbalance": summarize([abs(colors[player]) for player in range(players_count)]),
+            # Players are ordered by strength, so distance of positions stands for score distance
+            "position_distance": summarize([abs(black - white) for black, white in pairs]),
+        },
+    }
@@ -0,0 +1,128 @@
+import json
+import resource
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from league.models import Game, Group, Player, Season
+from misc.benchmark import get_environment, measure, percentile, positive_int
+
+
+class Command(BaseCommand):
+    help = (
+        "benchmark latency, queries and memory of the heavy pages through the test client, results are written "
+        "as JSON. Anonymous requests of cached pages measure the cache, log in with --user to measure rendering"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=positive_int, default=20, help="number of measured requests of every page")
+        parser.add_argument("--warmup", type=int, default=2, help="number of requests before measuring")
+        parser.add_argument("--pages", nargs="+", help="benchmark only pages with given names")
+        parser.add_argument("--user", help="email of the user making requests, anonymous by default")
+        parser.add_argument("--output", help="path of the JSON file, standard output by default")
+
+    def handle(self, *args, **options):
+        if not Season.objects.exists():
+            raise CommandError("There are no seasons, generate a dataset with generate_dataset first")
+        pages = get_pages()
+        if options["pages"]:
+            pages = [(name, url) for name, url in pages if name in options["pages"]]
+
+        client = Client()
+        if options["user"]:
+            client.force_login(User.objects.get(email=options["user"]))
+        # Test client sends requests to "testserver" host
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            results = [
+                benchmark_page(client, name=name, url=url, repeat=options["repeat"], warmup=options["warmup"])
+                for name, url in pages
+            ]
+
+        report = json.dumps(
+            {
+                "environment": get_environment(),
+                "dataset": {
+                    "seasons": Season.objects.count(),
+                    "groups": Group.objects.count(),
+                    "players": Player.objects.count(),
+                    "games": Game.objects.count(),
+                },
+                "user": options["user"],
+                "results": results,
+                # High-water mark of the process, in kilobytes on Linux
+                "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            },
+            indent=2,
+        )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report)
+        else:
+            self.stdout.write(report)
+
+
+def get_pages() -> list[tuple[str, str]]:
+    """Heavy pages of the latest season: its largest group, the most active player and lists of all games."""
+    season = Season.objects.latest("number")
+    group = season.groups.annotate(members_count=Count("members")).order_by("-members_count", "name").first()
+    player = Player.objects.annotate(seasons=Count("memberships")).order_by("-seasons", "nick").first()
+    pages = [
+        ("season-detail", reverse("season-detail", kwargs={"number": season.number})),
+        ("player-detail", reverse("player-detail", kwargs={"slug": player.nick})),
+        ("games-list", reverse("games-list")),
+        ("api-igor-matches-list", reverse("api-igor-matches-list")),
+    ]
+    if group:
+        group_kwargs = {"season_number": season.number, "group_name": group.name}
+        pages += [
+            ("group-detail", reverse("group-detail", kwargs=group_kwargs)),
+            ("group-games", reverse("group-games", kwargs=group_kwargs)),
+            (
+                "api-groups-member-list",
+                reverse(
+                    "api-groups-member-list",
+                    kwargs={
+                        "parent_lookup_group__season__number": season.number,
+                        "parent_lookup_group__name": group.name,
+                    },
+                ),
+            ),
+        ]
+    return pages
+
+
+def benchmark_page(client: Client, name: str, url: str, repeat: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        client.get(url)
+    latencies = []
+    queries = []
+    status_codes = set()
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = client.get(url)
+            latencies.append(time.perf_counter() - start)
+        queries.append(len(context.captured_queries))
+        status_codes.add(response.status_code)
+    _, measurement = measure(client.get, url)
+    return {
+        "page": name,
+        "url": url,
+        "status_codes": sorted(status_codes),
+        "latency": {
+            "p50": percentile(latencies, 0.5),
+            "p95": percentile(latencies, 0.95),
+            "mean": statistics.mean(latencies) if latencies else None,
+            "max": max(latencies, default=None),
+        },
+        "queries": {"min": min(queries, default=None), "max": max(queries, default=None)},
+        "memory": {"peak": measurement.peak_memory, "retained": measurement.retained_bytes},
+    }
@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from league.tasks import fetch_pending_sgfs
+
+
+class Command(BaseCommand):
+    help = "fetch SGF files of games with OGS links"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--game", type=int, nargs="+", help="fetch only games with given ids")
+
+    def handle(self, *args, **options):
+        result = fetch_pending_sgfs(game_ids=options["game"])
+        self.stdout.write(f"Fetched {result['fetched']} SGF files, {result['failed']} failed")
@@ -1,18 +1,18 @@
 import datetime
-import pickle
 import re
 from dataclasses import dataclass
 from typing import Optional
 
-import requests
 from bs4 import BeautifulSoup
+from django.conf import settings
 from django.core.files.base import ContentFile
 from django.core.management import BaseCommand
 
 from league.models import Game, GameServer
+from league.utils.http import RateLimiter, create_session, map_concurrently
+from league.utils.http_cache import get_http_cache
 
 KGS_ARCHIVE_URL = "https://www.gokgs.com/gameArchives.jsp"
-CACHE_DB = "kgs_cache.db"
 
 
 @dataclass(frozen=True)
@@ -57,106 +57,129 @@ def get_months(start_date: datetime.date, end_date: datetime.date) -> list[(int,
 class Command(BaseCommand):
     help = "Fill details for KGS games"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=settings.KGS_SCRAPE_WORKERS, help="number of concurrent requests to KGS"
+        )
+
     def handle(self, *args, **options):
-        games_query = Game.objects.filter(server=GameServer.KGS, link=None)
-        games_count = games_query.count()
-        print(f"Games to update: {games_count}")
-        games_updated = 0
-        for game in games_query:
-            first_player_name = game.black.player.nick
-            kgs_games = []
-            for year, month in get_months(
-                game.group.season.start_date, game.group.season.end_date
-            ):
-                kgs_games.extend(
-                    self._get_games(user=first_player_name, year=year, month=month)
-                )
-            print(
-                f"- B: {game.black.player.nick} vs W: {game.white.player.nick} - {game.date} - {game.result}"
+        workers = options["workers"]
+        # Archive pages and SGF files are cached on disk, so repeated runs do not download them again
+        self.session = create_session(
+            pool_size=workers, rate_limiter=RateLimiter(rate=settings.KGS_RATE_LIMIT), cache=get_http_cache()
+        )
+        games = list(
+            Game.objects.filter(server=GameServer.KGS, link=None).select_related(
+                "group__season", "black__player", "white__player", "winner__player"
             )
+        )
+        print(f"Games to update: {len(games)}")
+
+        # Every archive page is fetched once, even if its player played many league games in the season
+        pages = {}
+        for game in games:
+            for year, month in get_months(game.group.season.start_date, game.group.season.end_date):
+                pages.setdefault((game.black.player.nick.lower(), year, month), (game.black.player.nick, year, month))
+        print(f"Archive pages to fetch: {len(pages)}")
+        archive = {}
+        for (key, _), kgs_games, error in map_concurrently(
+            lambda page: self._get_games(*page[1]), pages.items(), workers=workers
+        ):
+            if error:
+                print(f"- failed to fetch archive page {key}: {error}")
+            archive[key] = kgs_games or []
+
+        # SGF files are needed only to tell league games apart, so they are fetched just for candidate games
+        candidates = {game.id: self._get_archived_games(game, archive) for game in games}
+        links = {kgs_game.link for kgs_games in candidates.values() for kgs_game in kgs_games if kgs_game.link}
+        print(f"SGF files to fetch: {len(links)}")
+        sgfs = {}
+        for link, sgf, error in map_concurrently(self._get_sgf, links, workers=workers):
+            if error:
+                print(f"- failed to fetch SGF {link}: {error}")
+            sgfs[link] = sgf
+        for kgs_games in candidates.values():
             for kgs_game in kgs_games:
-                if (
-                    kgs_game.is_league
-                    and game.group.season.start_date
-                    <= kgs_game.date.date()
-                    <= game.group.season.end_date
-                    and kgs_game.winner.name.lower() == game.winner.player.nick.lower()
-                    and {kgs_game.black.name.lower(), kgs_game.white.name.lower()}
-                    == {game.black.player.nick.lower(), game.white.player.nick.lower()}
-                ):
-                    name_to_player = {
-                        game.white.player.nick.lower(): game.white,
-                        game.black.player.nick.lower(): game.black,
-                    }
-                    game.black = name_to_player[kgs_game.black.name.lower()]
-                    game.white = name_to_player[kgs_game.white.name.lower()]
-                    game.black.save()
-                    game.white.save()
-                    game.link = kgs_game.link
-                    game.date = kgs_game.date
-                    # TODO: parse result
-                    # game.result = kgs_game.result
-                    game.sgf.save(f"game-{game.id}.sgf", ContentFile(kgs_game.sgf))
-                    game.save()
-                    print("  > updated")
-                    games_updated += 1
-                    break
-            else:
+                kgs_game.sgf = sgfs.get(kgs_game.link)
+
+        games_updated = 0
+        for game in games:
+            print(f"- B: {game.black.player.nick} vs W: {game.white.player.nick} - {game.date} - {game.win_type}")
+            kgs_game = next((kgs_game for kgs_game in candidates[game.id] if kgs_game.is_league), None)
+            if not kgs_game:
                 print("  > not found")
-        print(f"Updated games: {games_updated}/{games_count}")
+                continue
+            name_to_player = {
+                game.white.player.nick.lower(): game.white,
+                game.black.player.nick.lower(): game.black,
+            }
+            game.black = name_to_player[kgs_game.black.name.lower()]
+            game.white = name_to_player[kgs_game.white.name.lower()]
+            game.black.save()
+            game.white.save()
+            game.link = kgs_game.link
+            game.date = kgs_game.date
+            # TODO: parse result
+            # game.result = kgs_game.result
+            game.sgf.save(f"game-{game.id}.sgf", ContentFile(kgs_game.sgf))
+            game.save()
+            print("  > updated")
+            games_updated += 1
+        print(f"Updated games: {games_updated}/{len(games)}")
+
+    def _get_archived_games(self, game: Game, archive: dict) -> list[KGSGame]:
+        """Games from the black player's archive which were played in the season by the same players."""
+        if not game.winner:
+            return []
+        season = game.group.season
+        players = {game.black.player.nick.lower(), game.white.player.nick.lower()}
+        return [
+            kgs_game
+            for year, month in get_months(season.start_date, season.end_date)
+            for kgs_game in archive.get((game.black.player.nick.lower(), year, month), [])
+            if season.start_date <= kgs_game.date.date() <= season.end_date
+            and kgs_game.winner.name.lower() == game.winner.player.nick.lower()
+            and {kgs_game.black.name.lower(), kgs_game.white.name.lower()} == players
+        ]
+
+    def _get_sgf(self, link: str) -> str:
+        return self.session.get(url=link).content.decode()
 
     def _get_games(self, user: str, year: int, month: int) -> list[KGSGame]:
-        try:
-            with open(CACHE_DB, "rb") as f:
-                cache = pickle.load(f)
-        except FileNotFoundError:
-            cache = {}
-        cache_key = (user, year, month)
-        try:
-            return cache[cache_key]
-        except KeyError:
-            response = requests.get(
-                url=KGS_ARCHIVE_URL,
-                params={
-                    "user": user,
-                    "year": year,
-                    "month": month,
-                },
-            )
-            bs = BeautifulSoup(response.content, "html.parser")
-            results = []
-            for tr in bs.table.find_all("tr")[1:]:
-                if len(tr.find_all("td")) != 7:
-                    continue
-                link, white, black, config, date, type, result = tr.find_all("td")
-                player_pattern = "(\w+) \[([\w\-\?]+)\]"
-                white_name, white_rank = re.match(player_pattern, white.text).groups()
-                black_name, black_rank = re.match(player_pattern, black.text).groups()
-                link = link.a["href"] if link.text == "Yes" else None
-                if link:
-                    sgf_response = requests.get(url=link)
-                    sgf_content = sgf_response.content.decode()
-                else:
-                    sgf_content = None
-                results.append(
-                    KGSGame(
-                        link=link,
-                        white=KGSPlayer(
-                            name=white_name,
-                            rank=white_rank if white_rank not in ["-", "?"] else None,
-                        ),
-                        black=KGSPlayer(
-                            name=black_name,
-                            rank=black_rank if black_rank not in ["-", "?"] else None,
-                        ),
-                        config=config.text,
-                        date=datetime.datetime.strptime(date.text, "%m/%d/%y %I:%M %p"),
-                        type=type.text,
-                        result=result.text,
-                        sgf=sgf_content,
-                    )
+        response = self.session.get(
+            url=KGS_ARCHIVE_URL,
+            params={
+                "user": user,
+                "year": year,
+                "month": month,
+            },
+        )
+        bs = BeautifulSoup(response.content, "html.parser")
+        results = []
+        for tr in bs.table.find_all("tr")[1:]:
+            if len(tr.find_all("td")) != 7:
+                continue
+            link, white, black, config, date, type, result = tr.find_all("td")
+            player_pattern = "(\w+) \[([\w\-\?]+)\]"
+            white_name, white_rank = re.match(player_pattern, white.text).groups()
+            black_name, black_rank = re.match(player_pattern, black.text).groups()
+            link = link.a["href"] if link.text == "Yes" else None
+            results.append(
+                KGSGame(
+                    link=link,
+                    white=KGSPlayer(
+                        name=white_name,
+                        rank=white_rank if white_rank not in ["-", "?"] else None,
+                    ),
+                    black=KGSPlayer(
+                        name=black_name,
+                        rank=black_rank if black_rank not in ["-", "?"] else None,
+                    ),
+                    config=config.text,
+                    date=datetime.datetime.strptime(date.text, "%m/%d/%y %I:%M %p"),
+                    type=type.text,
+                    result=result.text,
+                    sgf=None,
                 )
-            cache[cache_key] = results
-            with open(CACHE_DB, "wb") as f:
-                pickle.dump(cache, f)
-            return results
+            )
+        return results
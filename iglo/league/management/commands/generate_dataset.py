@@ -0,0 +1,282 @@
+import datetime
+import decimal
+import math
+import random
+import time
+from collections import defaultdict
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from league.models import (
+    DAYS_PER_GAME,
+    Game,
+    GameServer,
+    Group,
+    GroupType,
+    Member,
+    Player,
+    Season,
+    SeasonState,
+    WinType,
+    game_upload_to,
+)
+
+FIRST_NAMES = ["Anna", "Jan", "Maria", "Piotr", "Ewa", "Tomasz", "Kasia", "Marek", "Ola", "Paweł"]
+LAST_NAMES = ["Kowalski", "Nowak", "Wiśniewski", "Wójcik", "Kamiński", "Lewandowski", "Zieliński", "Szymański"]
+# Shares of finished games by win type, close to the production data
+WIN_TYPES = [(WinType.RESIGN, 0.55), (WinType.POINTS, 0.3), (WinType.TIME, 0.05), (WinType.NOT_PLAYED, 0.1)]
+# Rating difference for 2:1 odds of the stronger player, as in EGD
+RATING_SCALE = 100
+REVIEW_SHARE = 0.15
+SGF_COORDINATES = "abcdefghijklmnopqrs"
+
+
+class Command(BaseCommand):
+    help = (
+        "generate an anonymized league shaped like the production data: finished seasons and one in progress, "
+        "round robin, banded and McMahon groups, results drawn by rating, SGF files and IGoR history"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seasons", type=int, default=20)
+        parser.add_argument("--groups", type=int, default=8, help="number of groups in every season")
+        parser.add_argument("--players-per-group", type=int, default=8)
+        parser.add_argument("--mcmahon-groups", type=int, default=1, help="number of last groups played as McMahon")
+        parser.add_argument("--banded-groups", type=int, default=0, help="number of groups before McMahon groups")
+        parser.add_argument("--sgf-moves", type=int, default=200, help="number of moves in SGF files, 0 disables them")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if Season.objects.exists():
+            raise CommandError("Database already contains seasons, the dataset should be generated in an empty one")
+        if options["mcmahon_groups"] + options["banded_groups"] > options["groups"]:
+            raise CommandError("There are more McMahon and banded groups than groups")
+        start = time.perf_counter()
+        generator = DatasetGenerator(
+            groups_count=options["groups"],
+            players_per_group=options["players_per_group"],
+            mcmahon_groups=options["mcmahon_groups"],
+            banded_groups=options["banded_groups"],
+            sgf_moves=options["sgf_moves"],
+            seed=options["seed"],
+        )
+        counts = generator.generate(seasons_count=options["seasons"])
+        duration = time.perf_counter() - start
+        self.stdout.write(
+            f"Generated {counts['seasons']} seasons, {counts['players']} players and {counts['games']} games "
+            f"in {duration:.1f}s"
+        )
+
+
+class DatasetGenerator:
+    """
+    Builds the league season by season with the same methods as the application: seasons are started with
+    `Season.start`, McMahon rounds are paired with `Group.start_macmahon_round` and finished seasons are closed
+    with `Season.finish`. Results are written in bulk.
+    """
+
+    def __init__(
+        self,
+        groups_count: int,
+        players_per_group: int,
+        mcmahon_groups: int,
+        banded_groups: int,
+        sgf_moves: int,
+        seed: int,
+    ):
+        self.groups_count = groups_count
+        self.players_per_group = players_per_group
+        self.mcmahon_groups = mcmahon_groups
+        self.banded_groups = banded_groups
+        self.sgf_moves = sgf_moves
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.ratings = {}
+        # IGoR rating of every player by season number
+        self.igor_history = defaultdict(dict)
+        self.game_number = 0
+
+    def generate(self, seasons_count: int) -> dict[str, int]:
+        # Pairing engines and color shuffling use global random, it is seeded only for the run
+        state = random.getstate()
+        random.seed(self.seed)
+        try:
+            return self._generate(seasons_count)
+        finally:
+            random.setstate(state)
+
+    def _generate(self, seasons_count: int) -> dict[str, int]:
+        # Some players leave the league and new ones join, so the pool is larger than a season
+        players = self._create_players(count=math.ceil(self.groups_count * self.players_per_group * 1.5))
+        season_length = datetime.timedelta(days=self.players_per_group * DAYS_PER_GAME)
+        first_start_date = datetime.date.today() - season_length * (seasons_count - 1) - season_length // 2
+        for number in range(1, seasons_count + 1):
+            with transaction.atomic():
+                self._generate_season(
+                    number=number,
+                    start_date=first_start_date + season_length * (number - 1),
+                    players=players,
+                    in_progress=number == seasons_count,
+                )
+        self._save_igor(players, seasons_count)
+        return {
+            "seasons": seasons_count,
+            "players": len(players),
+            "games": Game.objects.count(),
+        }
+
+    def _create_players(self, count: int) -> list[Player]:
+        players = []
+        for index in range(1, count + 1):
+            rating = min(2700, max(100, int(self.rng.gauss(1500, 450))))
+            players.append(
+                Player(
+                    nick=f"player{index:04d}",
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                    rank=rating,
+                    kgs_username=f"player{index:04d}" if self.rng.random() < 0.3 else None,
+                    ogs_username=f"player{index:04d}",
+                    igor_history=[],
+                )
+            )
+        players = Player.objects.bulk_create(players)
+        self.ratings = {player.id: float(player.rank) for player in players}
+        return players
+
+    def _generate_season(self, number: int, start_date: datetime.date, players: list[Player], in_progress: bool):
+        season = Season.objects.create(
+            number=number,
+            start_date=start_date,
+            end_date=start_date + datetime.timedelta(days=(self.players_per_group - 1) * DAYS_PER_GAME - 1),
+            promotion_count=2,
+            players_per_group=self.players_per_group,
+            state=SeasonState.DRAFT,
+        )
+        season_players = self.rng.sample(players, self.groups_count * self.players_per_group)
+        season_players.sort(key=lambda player: -self.ratings[player.id])
+        groups = Group.objects.bulk_create(
+            [
+                Group(
+                    season=season,
+                    name=chr(ord("A") + index),
+                    type=self._get_group_type(index),
+                    band_size=2 if self._get_group_type(index) == GroupType.BANDED else None,
+                )
+                for index in range(self.groups_count)
+            ]
+        )
+        Member.objects.bulk_create(
+            [
+                Member(
+                    group=group,
+                    player=player,
+                    order=order,
+                    rank=player.rank,
+                )
+                for index, group in enumerate(groups)
+                for order, player in enumerate(
+                    season_players[index * self.players_per_group : (index + 1) * self.players_per_group], start=1
+                )
+            ]
+        )
+        season.start()
+
+        rounds_count = self.players_per_group - 1
+        # In the season in progress only first half of rounds is played
+        played_rounds = rounds_count // 2 if in_progress else rounds_count
+        for group in groups:
+            if group.type != GroupType.MCMAHON:
+                self._play_games(Game.objects.filter(group=group, round__number__lte=played_rounds))
+                continue
+            # McMahon groups play half as many rounds as round robin ones, so that pairing never runs out of
+            # opponents. Rounds are paired after results of the previous one, so the next round is the last one.
+            mcmahon_rounds = max(rounds_count // 2, 1)
+            mcmahon_played_rounds = mcmahon_rounds // 2 if in_progress else mcmahon_rounds
+            for round_number in range(1, min(mcmahon_played_rounds + 1, mcmahon_rounds) + 1):
+                group.__dict__.pop("latest_round", None)
+                group.start_macmahon_round()
+                if round_number <= mcmahon_played_rounds:
+                    self._play_games(Game.objects.filter(group=group, round__number=round_number))
+
+        for group in groups:
+            group.update_standings()
+        if not in_progress:
+            season.finish()
+        for player in season_players:
+            # Ratings drift between seasons, so groups change from season to season
+            self.ratings[player.id] += self.rng.gauss(0, 40)
+            self.igor_history[player.id][number] = int(self.ratings[player.id])
+
+    def _get_group_type(self, index: int) -> GroupType:
+        if index >= self.groups_count - self.mcmahon_groups:
+            return GroupType.MCMAHON
+        if index >= self.groups_count - self.mcmahon_groups - self.banded_groups:
+            return GroupType.BANDED
+        return GroupType.ROUND_ROBIN
+
+    def _play_games(self, games_query) -> None:
+        games = list(
+            games_query.exclude(win_type=WinType.BYE).select_related(
+                "group__season", "black__player", "white__player"
+            )
+        )
+        for game in games:
+            win_type = self.rng.choices([win_type for win_type, _ in WIN_TYPES], [share for _, share in WIN_TYPES])[0]
+            game.win_type = win_type
+            if win_type == WinType.NOT_PLAYED:
+                continue
+            rating_difference = self.ratings[game.black.player_id] - self.ratings[game.white.player_id]
+            black_win_probability = 1 / (1 + 2 ** (-rating_difference / RATING_SCALE))
+            game.winner = game.black if self.rng.random() < black_win_probability else game.white
+            if win_type == WinType.POINTS:
+                game.points_difference = decimal.Decimal(self.rng.randint(0, 30)) + decimal.Decimal("0.5")
+            self.game_number += 1
+            game.server = GameServer.OGS
+            game.link = f"https://online-go.com/game/{self.game_number}"
+            if self.sgf_moves:
+                game.sgf.name = default_storage.save(
+                    game_upload_to(game, "game.sgf"), ContentFile(self._get_sgf(game).encode())
+                )
+                game.sgf_updated = game.date
+                game.ai_analyse_link = f"https://ai-sensei.com/game/{self.game_number}"
+            if self.rng.random() < REVIEW_SHARE:
+                game.review_video_link = f"https://www.youtube.com/watch?v={self.game_number}"
+                game.review_updated = game.date
+        Game.objects.bulk_update(
+            games,
+            [
+                "win_type",
+                "winner",
+                "points_difference",
+                "server",
+                "link",
+                "sgf",
+                "sgf_updated",
+                "ai_analyse_link",
+                "review_video_link",
+                "review_updated",
+            ],
+        )
+
+    def _get_sgf(self, game: Game) -> str:
+        winner_color = "B" if game.winner_id == game.black_id else "W"
+        result = f"{winner_color}+{game.points_difference}" if game.win_type == WinType.POINTS else f"{winner_color}+R"
+        moves = "".join(
+            f";{'B' if index % 2 == 0 else 'W'}[{self.rng.choice(SGF_COORDINATES)}{self.rng.choice(SGF_COORDINATES)}]"
+            for index in range(self.sgf_moves)
+        )
+        return (
+            f"(;GM[1]FF[4]SZ[19]KM[6.5]GN[IGLO]PB[{game.black.player.nick}]PW[{game.white.player.nick}]"
+            f"RE[{result}]{moves})"
+        )
+
+    def _save_igor(self, players: list[Player], seasons_count: int) -> None:
+        for player in players:
+            history = self.igor_history[player.id]
+            player.igor_history = [history.get(number) for number in range(1, seasons_count + 1)]
+            player.igor = history[max(history)] if history else None
+        Player.objects.bulk_update(players, ["igor_history", "igor"])
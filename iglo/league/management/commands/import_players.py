@@ -1,19 +1,30 @@
 import csv
+from collections import defaultdict
 from itertools import islice
 from pathlib import Path
 
 from django.contrib.auth.hashers import make_password
 from django.core.management import BaseCommand, CommandParser, CommandError
+from django.db import transaction
+from django.db.models.functions import Lower
 
 from accounts.models import User
 from league.models import Player, Member, Season
 
+PLAYER_FIELDS = ["nick", "first_name", "last_name", "user", "rank", "auto_join"]
+
+
+def format_value(value) -> str:
+    return value.email if isinstance(value, User) else str(value)
+
 
 class Command(BaseCommand):
     help = "Fills DB with users and rankings"
 
     def add_arguments(self, parser: CommandParser):
         parser.add_argument("csv_file", type=Path, help="Path to csv file")
+        parser.add_argument("--chunk-size", type=int, default=500, help="number of rows imported at once")
+        parser.add_argument("--dry-run", action="store_true", help="only print changes, without saving them")
 
     def handle(self, *args, **options):
         file_path = options["csv_file"]
@@ -21,39 +32,112 @@ class Command(BaseCommand):
         if not file_path.is_file():
             raise CommandError(f"File {file_path} not found")
 
+        last_season = Season.objects.latest("number")
+        # Lowercase nicks of players who played in the last season
+        self.last_season_nicks = {
+            nick.lower()
+            for nick in Member.objects.filter(group__season=last_season).values_list("player__nick", flat=True)
+        }
+        self.dry_run = options["dry_run"]
+        self.counts = defaultdict(int)
+        # Dry run saves nothing, so users and players planned in earlier chunks are kept to be found by later ones
+        self.planned_users = {}
+        self.planned_players = {}
+
         with file_path.open(encoding="utf8") as csv_file:
             reader = csv.DictReader(
                 csv_file, fieldnames=("full_name", "email", "nick", "rank", "group")
             )
+            rows = islice(reader, 1, None)
+            while chunk := list(islice(rows, options["chunk_size"])):
+                with transaction.atomic():
+                    self._import_chunk(chunk)
 
-            for player_info in islice(reader, 1, None):
-                print(player_info)
-                try:
-                    first_name, last_name = player_info["full_name"].split(maxsplit=1)
-                except ValueError:
-                    first_name, last_name = player_info["full_name"], ""
-
-                user, _ = User.objects.get_or_create(
-                    email__iexact=player_info["email"],
-                    defaults={
-                        "email": player_info["email"],
-                        "password": make_password(None),
-                    },
-                )
-                rank = player_info["rank"] or 100
-                last_season = Season.objects.latest("number")
-                player, _ = Player.objects.update_or_create(
-                    nick__iexact=player_info["nick"],
-                    defaults={
-                        "nick": player_info["nick"],
-                        "first_name": first_name,
-                        "last_name": last_name,
-                        "user": user,
-                        "rank": rank,
-                        "auto_join": Member.objects.filter(
-                            group__season=last_season,
-                            player__nick__iexact=player_info["nick"],
-                        ).exists(),
-                    },
+        self.stdout.write(
+            f"{'Would create' if self.dry_run else 'Created'} {self.counts['users']} users, "
+            f"{self.counts['created']} players, {'would update' if self.dry_run else 'updated'} "
+            f"{self.counts['updated']} players, {self.counts['unchanged']} players unchanged"
+        )
+
+    def _import_chunk(self, rows: list[dict]) -> None:
+        # Later rows of the same player or user take precedence, like when rows were imported one by one
+        players_info = {row["nick"].lower(): row for row in rows}
+        emails = {row["email"].lower(): row["email"] for row in players_info.values()}
+
+        users = {
+            user.email.lower(): user
+            for user in User.objects.annotate(email_lower=Lower("email")).filter(email_lower__in=emails)
+        }
+        users.update({email: user for email, user in self.planned_users.items() if email in emails})
+        new_users = [
+            User(email=email, password=make_password(None))
+            for email_lower, email in emails.items()
+            if email_lower not in users
+        ]
+        for user in new_users:
+            self.stdout.write(f"+ user {user.email}")
+        if self.dry_run:
+            self.planned_users.update({user.email.lower(): user for user in new_users})
+        else:
+            User.objects.bulk_create(new_users)
+        users.update({user.email.lower(): user for user in new_users})
+        self.counts["users"] += len(new_users)
+
+        players = {
+            player.nick.lower(): player
+            for player in Player.objects.select_related("user")
+            .annotate(nick_lower=Lower("nick"))
+            .filter(nick_lower__in=players_info)
+        }
+        players.update({nick: player for nick, player in self.planned_players.items() if nick in players_info})
+        new_players = []
+        updated_players = []
+        for nick, player_info in players_info.items():
+            try:
+                first_name, last_name = player_info["full_name"].split(maxsplit=1)
+            except ValueError:
+                first_name, last_name = player_info["full_name"], ""
+            values = {
+                "nick": player_info["nick"],
+                "first_name": first_name,
+                "last_name": last_name,
+                "user": users[player_info["email"].lower()],
+                "rank": int(player_info["rank"] or 100),
+                "auto_join": nick in self.last_season_nicks,
+            }
+            player = players.get(nick)
+            if player is None:
+                new_players.append(Player(**values))
+                self.stdout.write(f"+ player {values['nick']}: " + ", ".join(f"{k}={format_value(v)}" for k, v in values.items()))
+                continue
+            changes = {
+                field: (getattr(player, field), value)
+                for field, value in values.items()
+                if getattr(player, field) != value
+            }
+            if not changes:
+                self.counts["unchanged"] += 1
+                continue
+            for field, (_, value) in changes.items():
+                setattr(player, field, value)
+            updated_players.append(player)
+            self.stdout.write(
+                f"~ player {player.nick}: " + ", ".join(
+                    f"{k}: {format_value(old)} -> {format_value(new)}" for k, (old, new) in changes.items()
                 )
-                Member.objects.filter(player=player).update(rank=rank)
+            )
+        self.counts["created"] += len(new_players)
+        self.counts["updated"] += len(updated_players)
+        if self.dry_run:
+            self.planned_players.update({player.nick.lower(): player for player in new_players + updated_players})
+            return
+
+        Player.objects.bulk_create(new_players)
+        Player.objects.bulk_update(updated_players, PLAYER_FIELDS)
+
+        # Memberships of existing players get their rank, one update per distinct rank
+        players_by_rank = defaultdict(list)
+        for player in players.values():
+            players_by_rank[player.rank].append(player.id)
+        for rank, player_ids in players_by_rank.items():
+            Member.objects.filter(player_id__in=player_ids).update(rank=rank)
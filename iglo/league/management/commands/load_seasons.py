@@ -1,15 +1,21 @@
 import datetime
 import json
+import time
+from typing import Optional
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.functions import Lower
 
 from league.models import (
     Season,
     Group,
     Player,
     Game,
+    GameAIAnalyseUpload,
     GameServer,
     Member,
+    MemberStanding,
     Round,
     SeasonState,
     WinType,
@@ -70,25 +76,74 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("seasons_file", type=str)
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="load again seasons which already exist instead of skipping them, so the file can be reimported",
+        )
 
     def handle(self, *args, **options):
-        loaded_seasons = 0
+        start = time.perf_counter()
         with open(options["seasons_file"], "r") as f:
             data = json.load(f)
-            for season_number, season_data in enumerate(reversed(data), start=1):
-                start_date = datetime.datetime.fromtimestamp(
-                    season_data["startDate"] / 1000
-                ).date()
-                end_date = datetime.datetime.fromtimestamp(
-                    season_data["endDate"] / 1000
-                ).date()
-                if Season.objects.filter(
-                    start_date=start_date, end_date=end_date
-                ).exists():
-                    continue
-                loaded_seasons += 1
-                is_last_season = season_number == len(data)
-                season = Season.objects.create(
+        seasons_data = [
+            (
+                season_number,
+                datetime.datetime.fromtimestamp(season_data["startDate"] / 1000).date(),
+                datetime.datetime.fromtimestamp(season_data["endDate"] / 1000).date(),
+                season_data,
+            )
+            for season_number, season_data in enumerate(reversed(data), start=1)
+        ]
+        dates = {(start_date, end_date) for _, start_date, end_date, _ in seasons_data}
+        existing_seasons = [
+            season
+            for season in Season.objects.filter(start_date__in=[start_date for start_date, _ in dates])
+            if (season.start_date, season.end_date) in dates
+        ]
+        if not options["replace"]:
+            existing_dates = {(season.start_date, season.end_date) for season in existing_seasons}
+            seasons_data = [season for season in seasons_data if (season[1], season[2]) not in existing_dates]
+
+        with transaction.atomic():
+            if options["replace"]:
+                self._delete_seasons(existing_seasons)
+            rows = self._load(seasons_data, last_season_number=len(data))
+
+        duration = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully loaded {len(seasons_data)} seasons: {rows} rows in {duration:.1f}s "
+                f"({rows / duration if duration else 0:.0f} rows/s)"
+            )
+        )
+
+    def _delete_seasons(self, seasons: list[Season]) -> None:
+        """
+        Deletes seasons with all their rows, with one query per table. Cascading deletes would load every row and
+        send its signals, so instead rows are deleted raw and pages of deleted groups are invalidated once.
+        """
+        groups = list(Group.objects.filter(season__in=seasons).select_related("season"))
+        for queryset in [
+            GameAIAnalyseUpload.objects.filter(game__group__in=groups),
+            MemberStanding.objects.filter(member__group__in=groups),
+            Game.objects.filter(group__in=groups),
+            Round.objects.filter(group__in=groups),
+            Member.objects.filter(group__in=groups),
+            Group.objects.filter(id__in=[group.id for group in groups]),
+            Season.objects.filter(id__in=[season.id for season in seasons]),
+        ]:
+            queryset._raw_delete(queryset.db)
+        for group in groups:
+            group.invalidate_page_cache()
+
+    def _load(self, seasons_data: list[tuple], last_season_number: int) -> int:
+        """Creates all seasons with bulk inserts, one per table. Returns number of created rows."""
+        players = self._get_players(seasons_data, last_season_number)
+
+        seasons = Season.objects.bulk_create(
+            [
+                Season(
                     number=season_number,
                     start_date=start_date,
                     end_date=end_date,
@@ -96,98 +151,150 @@ class Command(BaseCommand):
                     players_per_group=len(season_data["tables"][0]["players"]),
                     state=SeasonState.FINISHED,
                 )
-                for group_data in season_data["tables"]:
-                    group_type = GroupType.MCMAHON if group_data.get("type") == "MCMAHON" else GroupType.ROUND_ROBIN
-                    group_name = group_data["name"][-1]
-                    group = Group.objects.create(
-                        name=group_name,
-                        season=season,
-                        type=group_type,
-                    )
-                    players = []
-                    for player_order, player_name in enumerate(
-                        group_data["players"], start=1
-                    ):
-                        if not player_name:
-                            players.append(None)
-                            continue
-                        try:
-                            player = Player.objects.get(nick__iexact=player_name)
-                            player.auto_join = is_last_season
-                            player.save()
-                        except Player.DoesNotExist:
-                            player = Player.objects.create(
-                                nick=player_name,
-                                kgs_username=player_name,
-                                auto_join=is_last_season,
-                            )
-                        member = Member.objects.create(
-                            player=player,
-                            group=group,
-                            order=player_order,
-                            rank=None,
-                            egd_approval=player.egd_approval,  # Copy EGD approval from player
-                        )
-                        players.append(member)
-                    if group_type == GroupType.MCMAHON:
-                        for number, round_data in enumerate(group_data["rounds"], start=1):
-                            round = Round.objects.create(
-                                group=group,
-                                number=number,
-                            )
-                            for game_data in round_data["games"]:
-                                Game.objects.create(
-                                    round=round,
-                                    group=group,
-                                    black=group.members.get(player__nick=game_data["black"]),
-                                    white=group.members.get(player__nick=game_data["white"]),
-                                    winner=group.members.get(player__nick=game_data["winner"]) if game_data["winner"] else None,
-                                    win_type=WinType.POINTS if game_data["winner"] else WinType.NOT_PLAYED,
-                                )
-                    else:
-                        paring_system = (
-                            PARING_SYSTEM_6
-                            if len(group_data["players"]) == 6
-                            else PARING_SYSTEM_8
-                        )
-                        rounds = [
-                            Round.objects.create(
-                                group=group,
-                                number=number,
-                            )
-                            for number in range(1, len(group_data["players"]))
-                        ]
-                        for player_index, result_row in enumerate(group_data["results"]):
-                            for other_player_index, result in enumerate(result_row):
-                                if (
-                                    player_index <= other_player_index
-                                    or not players[player_index]
-                                    or not players[other_player_index]
-                                ):
-                                    continue
-                                Game.objects.create(
-                                    group=group,
-                                    round=rounds[
-                                        paring_system[
-                                            frozenset(
-                                                {player_index + 1, other_player_index + 1}
-                                            )
-                                        ]
-                                        - 1
-                                    ],
-                                    black=players[player_index],
-                                    white=players[other_player_index],
-                                    winner=players[player_index]
-                                    if result == 1
-                                    else players[other_player_index],
-                                    server=GameServer.KGS,
-                                    win_type=WinType.POINTS,
-                                    date=datetime.datetime.combine(
-                                        season.start_date, datetime.datetime.min.time()
-                                    ),
-                                    link=None,
-                                )
+                for season_number, start_date, end_date, season_data in seasons_data
+            ]
+        )
+        groups_data = [
+            (season, group_data) for season, (_, _, _, season_data) in zip(seasons, seasons_data)
+            for group_data in season_data["tables"]
+        ]
+        groups = Group.objects.bulk_create(
+            [
+                Group(
+                    name=group_data["name"][-1],
+                    season=season,
+                    type=GroupType.MCMAHON if group_data.get("type") == "MCMAHON" else GroupType.ROUND_ROBIN,
+                )
+                for season, group_data in groups_data
+            ]
+        )
 
-        self.stdout.write(
-            self.style.SUCCESS(f"Successfully loaded {loaded_seasons} seasons")
+        # Members of every group by order in the group, empty places are kept as None
+        group_members = [
+            [
+                Member(
+                    player=players[player_name.lower()],
+                    group=group,
+                    order=player_order,
+                    rank=None,
+                    egd_approval=players[player_name.lower()].egd_approval,  # Copy EGD approval from player
+                )
+                if player_name
+                else None
+                for player_order, player_name in enumerate(group_data["players"], start=1)
+            ]
+            for group, (_, group_data) in zip(groups, groups_data)
+        ]
+        members = Member.objects.bulk_create(
+            [member for members in group_members for member in members if member]
         )
+
+        rounds = []
+        group_rounds = []
+        for group, (_, group_data) in zip(groups, groups_data):
+            if group.type == GroupType.MCMAHON:
+                round_count = len(group_data["rounds"])
+            else:
+                round_count = len(group_data["players"]) - 1
+            group_rounds.append([Round(group=group, number=number) for number in range(1, round_count + 1)])
+            rounds.extend(group_rounds[-1])
+        Round.objects.bulk_create(rounds)
+
+        games = []
+        for group, (season, group_data), members_by_order, round_list in zip(
+            groups, groups_data, group_members, group_rounds
+        ):
+            if group.type == GroupType.MCMAHON:
+                games.extend(self._get_mcmahon_games(group, group_data, members_by_order, round_list))
+            else:
+                games.extend(self._get_round_robin_games(season, group, group_data, members_by_order, round_list))
+        Game.objects.bulk_create(games)
+
+        # Bulk inserts bypass model signals, so standings are computed once per group
+        for group in groups:
+            group.update_standings()
+
+        return len(players) + len(seasons) + len(groups) + len(members) + len(rounds) + len(games)
+
+    def _get_players(self, seasons_data: list[tuple], last_season_number: int) -> dict[str, Player]:
+        """
+        Players by lowercase nick. Missing players are created, players of the last season are set to auto join
+        and players of earlier seasons are not.
+        """
+        names = {}
+        last_season_names = set()
+        for season_number, _, _, season_data in seasons_data:
+            for group_data in season_data["tables"]:
+                for player_name in group_data["players"]:
+                    if not player_name:
+                        continue
+                    names.setdefault(player_name.lower(), player_name)
+                    if season_number == last_season_number:
+                        last_season_names.add(player_name.lower())
+
+        players = {
+            player.nick.lower(): player
+            for player in Player.objects.annotate(nick_lower=Lower("nick")).filter(nick_lower__in=names)
+        }
+        for player in players.values():
+            player.auto_join = player.nick.lower() in last_season_names
+        Player.objects.bulk_update(players.values(), ["auto_join"])
+        new_players = Player.objects.bulk_create(
+            [
+                Player(nick=player_name, kgs_username=player_name, auto_join=name in last_season_names)
+                for name, player_name in names.items()
+                if name not in players
+            ]
+        )
+        players.update({player.nick.lower(): player for player in new_players})
+        return players
+
+    def _get_mcmahon_games(
+        self, group: Group, group_data: dict, members_by_order: list[Optional[Member]], rounds: list[Round]
+    ) -> list[Game]:
+        members = {member.player.nick.lower(): member for member in members_by_order if member}
+        return [
+            Game(
+                round=round,
+                group=group,
+                black=members[game_data["black"].lower()],
+                white=members[game_data["white"].lower()],
+                winner=members[game_data["winner"].lower()] if game_data["winner"] else None,
+                win_type=WinType.POINTS if game_data["winner"] else WinType.NOT_PLAYED,
+            )
+            for round, round_data in zip(rounds, group_data["rounds"])
+            for game_data in round_data["games"]
+        ]
+
+    def _get_round_robin_games(
+        self,
+        season: Season,
+        group: Group,
+        group_data: dict,
+        members_by_order: list[Optional[Member]],
+        rounds: list[Round],
+    ) -> list[Game]:
+        paring_system = PARING_SYSTEM_6 if len(group_data["players"]) == 6 else PARING_SYSTEM_8
+        games = []
+        for player_index, result_row in enumerate(group_data["results"]):
+            for other_player_index, result in enumerate(result_row):
+                if (
+                    player_index <= other_player_index
+                    or not members_by_order[player_index]
+                    or not members_by_order[other_player_index]
+                ):
+                    continue
+                games.append(
+                    Game(
+                        group=group,
+                        round=rounds[paring_system[frozenset({player_index + 1, other_player_index + 1})] - 1],
+                        black=members_by_order[player_index],
+                        white=members_by_order[other_player_index],
+                        winner=members_by_order[player_index] if result == 1 else members_by_order[other_player_index],
+                        server=GameServer.KGS,
+                        win_type=WinType.POINTS,
+                        date=datetime.datetime.combine(season.start_date, datetime.datetime.min.time()),
+                        link=None,
+                    )
+                )
+        return games
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from league.models import Group, MemberStanding
+
+
+class Command(BaseCommand):
+    help = "rebuild materialized member standings from games"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--season", type=int, help="rebuild only groups of the season with given number")
+
+    def handle(self, *args, **options):
+        groups = Group.objects.all()
+        standings = MemberStanding.objects.all()
+        if options["season"] is not None:
+            groups = groups.filter(season__number=options["season"])
+            standings = standings.filter(member__group__season__number=options["season"])
+        with transaction.atomic():
+            standings.delete()
+            for group in groups:
+                group.update_standings()
+        self.stdout.write(f"Rebuilt standings of {len(groups)} groups")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from league import igor
+from league.models import IgorFit
+
+
+class Command(BaseCommand):
+    help = "list stored IGoR fits or save ratings of the given one to players"
+
+    def add_arguments(self, parser):
+        parser.add_argument("fit_id", type=int, nargs="?", help="id of the stored fit to roll back to")
+
+    def handle(self, *args, **options):
+        if options["fit_id"] is None:
+            for fit in IgorFit.objects.order_by("-last_used", "-id"):
+                self.stdout.write(
+                    f"{fit.id}: created {fit.created:%Y-%m-%d %H:%M}, last used {fit.last_used:%Y-%m-%d %H:%M}, "
+                    f"fitted from season index {fit.first_fitted_season}"
+                )
+            return
+        try:
+            fit = IgorFit.objects.get(id=options["fit_id"])
+        except IgorFit.DoesNotExist:
+            raise CommandError(f"IGoR fit {options['fit_id']} does not exist")
+        igor.apply_fit(fit)
+        self.stdout.write(f"Rolled back IGoR to fit {fit.id}")
@@ -6,5 +6,10 @@ from league.tasks import update_gor
 class Command(BaseCommand):
     help = "update gor"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="update also players synced recently, bypassing the HTTP cache"
+        )
+
     def handle(self, *args, **options):
-        update_gor()
+        update_gor(force=options["force"])
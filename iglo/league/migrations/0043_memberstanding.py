@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0042_game_assigned_teacher'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points', models.SmallIntegerField(default=0)),
+                ('score', models.FloatField(default=0.0)),
+                ('sodos', models.SmallIntegerField(default=0)),
+                ('sos', models.FloatField(default=0.0)),
+                ('sosos', models.FloatField(default=0.0)),
+                ('walkovers', models.SmallIntegerField(default=0)),
+                ('position', models.SmallIntegerField()),
+                ('member', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='standing', to='league.member')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0043_memberstanding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='pairing_engine',
+            field=models.CharField(choices=[('greedy', 'Zachłanny'), ('optimal', 'Optymalny')], default='greedy', help_text='McMahon pairing engine: greedy (pair by pair) or optimal (whole round at once)', max_length=16),
+        ),
+    ]
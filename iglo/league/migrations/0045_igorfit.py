@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0044_group_pairing_engine'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IgorFit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('config', models.JSONField()),
+                ('season_digests', models.JSONField(default=list)),
+                ('ratings', models.JSONField(default=dict)),
+                ('learning_rate', models.FloatField()),
+                ('first_fitted_season', models.SmallIntegerField(default=0)),
+                ('steps', models.IntegerField(null=True)),
+                ('duration', models.FloatField(default=0.0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:19
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0045_igorfit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='igorfit',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='igorfit',
+            name='last_used',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
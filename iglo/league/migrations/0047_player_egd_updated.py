@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0046_igorfit_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='egd_updated',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0047_player_egd_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gameaianalyseupload',
+            name='attempts',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='gameaianalyseupload',
+            name='duration',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gameaianalyseupload',
+            name='next_attempt',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='gameaianalyseupload',
+            name='status',
+            field=models.CharField(choices=[('queued', 'queued'), ('in_progress', 'in_progress'), ('done', 'done'), ('failed', 'failed')], max_length=16),
+        ),
+    ]
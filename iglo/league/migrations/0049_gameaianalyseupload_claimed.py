@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 10:12
+
+from django.apps.registry import Apps
+from django.db import migrations, models
+
+
+def fail_uploads_left_in_progress(apps: Apps, schema_editor):
+    # Uploads left in progress by the previous upload task were never finished, they would be uploaded again by
+    # the queue otherwise
+    GameAIAnalyseUpload = apps.get_model("league", "GameAIAnalyseUpload")
+    GameAIAnalyseUpload.objects.filter(status="in_progress").update(
+        status="failed", error="upload left in progress before the upload queue"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0048_ai_analyse_upload_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gameaianalyseupload',
+            name='claimed',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(code=fail_uploads_left_in_progress, reverse_code=migrations.RunPython.noop),
+    ]
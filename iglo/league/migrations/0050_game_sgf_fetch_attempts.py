@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0049_gameaianalyseupload_claimed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='sgf_fetch_attempts',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='sgf_fetch_next_attempt',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 09:24
+
+from django.apps.registry import Apps
+from django.db import migrations, models
+
+
+def clear_learning_rate_of_full_fits(apps: Apps, schema_editor):
+    # Full fits stored the initial learning rate from the config, which is not a state of the optimizer
+    IgorFit = apps.get_model("league", "IgorFit")
+    IgorFit.objects.filter(first_fitted_season=0).update(learning_rate=None)
+
+
+def restore_learning_rate_of_full_fits(apps: Apps, schema_editor):
+    IgorFit = apps.get_model("league", "IgorFit")
+    for fit in IgorFit.objects.filter(learning_rate__isnull=True):
+        fit.learning_rate = fit.config.get("initial_lr", 1.0)
+        fit.save(update_fields=["learning_rate"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0050_game_sgf_fetch_attempts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='igorfit',
+            name='learning_rate',
+            field=models.FloatField(null=True),
+        ),
+        migrations.RunPython(code=clear_learning_rate_of_full_fits, reverse_code=restore_learning_rate_of_full_fits),
+    ]
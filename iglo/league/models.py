@@ -1,33 +1,44 @@
 import datetime
 import decimal
+import logging
 import math
 import re
 import string
+import time
 from collections import defaultdict
+from dataclasses import asdict
 from enum import Enum
 from statistics import mean
 from typing import Optional
+from urllib.parse import quote
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MinLengthValidator
 from django.contrib.postgres.fields import ArrayField
-from django.db import models
+from django.db import models, transaction
 from django.db.models import F, Q, TextChoices, QuerySet, Avg, Count, Sum
 from django.db.models.functions import Round as DjangoRound
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.urls import reverse
 from django.utils.functional import cached_property
+from django.utils import timezone
+from django.utils.http import RFC3986_SUBDELIMS
 from django.utils.translation import gettext_lazy as _
 from django_countries.fields import CountryField
 
 from league import texts
+from league.cache import invalidate_group_page
 from league.utils.paring import round_robin, shuffle_colors, banded_round_robin, Bye
+from league.utils.standings import compute_standings, Standing
 from macmahon import macmahon as mm
 
 DAYS_PER_GAME = 7
 NUMBER_OF_BARS = 2
+URL_SAFE_CHARS = RFC3986_SUBDELIMS + "/~:@"  # same as used by `reverse()` for path arguments
+
+logger = logging.getLogger("league")
 
 
 class SeasonState(TextChoices):
@@ -91,23 +102,36 @@ class Season(models.Model):
     def get_absolute_url(self):
         return reverse("season-detail", kwargs={"number": self.number})
 
-    def start(self) -> None:
+    def start(self) -> dict[str, float]:
+        """
+        Starts the season: calculates initial scores and plans all rounds and games in memory, then saves them
+        in bulk within a single transaction. Returns duration of each phase in seconds.
+        """
         self.validate_state(state=SeasonState.DRAFT)
-        # First, calculate initial scores for each group based on its type
-        for group in self.groups.all():
+        timings = {}
+
+        # Planning phase - nothing is saved to the database yet
+        phase_start = time.perf_counter()
+        groups = list(self.groups.prefetch_related("members__player"))
+        members_to_update = []
+        rounds_to_create = []
+        games_to_create = []
+        for group in groups:
+            members = list(group.members.all())
+            # First, calculate initial scores for each group based on its type
             if group.type == GroupType.MCMAHON:
                 # McMahon groups - Use the MacMahon algorithm
-                members = group.members.all()
                 registered_players = [(member.player.nick, member.rank) for member in members]
                 initial_ordering = mm.BasicInitialOrdering(number_of_bars=NUMBER_OF_BARS).order(registered_players)
                 initial_ordering = {p.name: p for p in initial_ordering}
                 for member in members:
                     ordered_player = initial_ordering[member.player.nick]
                     member.initial_score = ordered_player.initial_score
-                Member.objects.bulk_update(members, ["initial_score"])
+                members_to_update.extend(members)
+                # McMahon rounds are paired one by one during the season
+                continue
             elif group.type == GroupType.BANDED:
                 # Banded group - Set scores based on position and point difference
-                members = list(group.members.all())
                 total_players = len(members)
                 for member in members:
                     # Calculate points using the provided point difference
@@ -115,75 +139,123 @@ class Season(models.Model):
                     # Last player gets 0 points
                     base_points = (total_players - member.order) * group.point_difference
                     member.initial_score = base_points
-                Member.objects.bulk_update(members, ["initial_score"])
+                members_to_update.extend(members)
             # Round Robin groups have default initial_score = 0, no need to set it
 
-        # Now update the state and generate the pairings
-        self.state = SeasonState.IN_PROGRESS
-        self.save()
-
-        for group in self.groups.all():
-            members = list(group.members.all())
-            current_date = self.start_date
-
-            if group.type == GroupType.BANDED:
-                pairing = banded_round_robin(player_count=len(members), band_size=group.band_size, add_byes=True)
-            elif group.type == GroupType.MCMAHON:
-                continue
-            elif group.type == GroupType.ROUND_ROBIN:
-                pairing = round_robin(n=len(members))
-            else:
-                raise ValueError(f"Unhandled group type: {group.type} - this should not happen")
+            rounds, games = self._plan_group_games(group=group, members=members)
+            rounds_to_create.extend(rounds)
+            games_to_create.extend(games)
+        timings["planning"] = time.perf_counter() - phase_start
+
+        # Commit phase
+        phase_start = time.perf_counter()
+        with transaction.atomic():
+            Member.objects.bulk_update(members_to_update, ["initial_score"])
+            self.state = SeasonState.IN_PROGRESS
+            self.save()
+            Round.objects.bulk_create(rounds_to_create)
+            Game.objects.bulk_create(games_to_create)
+            timings["commit"] = time.perf_counter() - phase_start
+
+            # Bulk inserts do not send signals, so standings have to be updated explicitly
+            phase_start = time.perf_counter()
+            for group in groups:
+                group.update_standings()
+            timings["standings"] = time.perf_counter() - phase_start
+
+        logger.info(
+            f"Season {self.number} started with {len(rounds_to_create)} rounds and {len(games_to_create)} games: "
+            + ", ".join(f"{phase} {duration:.3f}s" for phase, duration in timings.items())
+        )
+        return timings
 
-            for round_number, round_pairs in enumerate(shuffle_colors(paring=pairing), start=1):
-                round = Round.objects.create(
-                    number=round_number,
-                    group=group,
-                    start_date=current_date,
-                    end_date=current_date + datetime.timedelta(days=DAYS_PER_GAME - 1),
-                )
-                current_date += datetime.timedelta(days=DAYS_PER_GAME)
-
-                for pair in round_pairs:
-                    if isinstance(pair[0], Bye):
-                        # We could implement it but it is not needed in Banded, because it always assigns player as black and shuffle skips byes.
-                        raise ValueError("not implemented, should not happen.")
-                    if group.type == GroupType.BANDED and isinstance(pair[1], Bye):
-                        # Special player-with-result pair (player, bye_result) typically for the top and bottom players.
-                        player = members[pair[0]]
-                        bye_result = pair[1]
-
-                        # Design choice: Create a BYE game with player as black and winner based on bye result.
-                        # Note that this game will typically  provide a point depending whether ByeWin/ByeLoss.
-                        Game.objects.create(
+    def _plan_group_games(self, group: "Group", members: list["Member"]) -> tuple[list["Round"], list["Game"]]:
+        if group.type == GroupType.BANDED:
+            pairing = banded_round_robin(player_count=len(members), band_size=group.band_size, add_byes=True)
+        elif group.type == GroupType.ROUND_ROBIN:
+            pairing = round_robin(n=len(members))
+        else:
+            raise ValueError(f"Unhandled group type: {group.type} - this should not happen")
+
+        rounds = []
+        games = []
+        current_date = self.start_date
+        for round_number, round_pairs in enumerate(shuffle_colors(paring=pairing), start=1):
+            round = Round(
+                number=round_number,
+                group=group,
+                start_date=current_date,
+                end_date=current_date + datetime.timedelta(days=DAYS_PER_GAME - 1),
+            )
+            rounds.append(round)
+            current_date += datetime.timedelta(days=DAYS_PER_GAME)
+            game_date = datetime.datetime.combine(round.end_date, settings.DEFAULT_GAME_TIME)
+
+            for pair in round_pairs:
+                if isinstance(pair[0], Bye):
+                    # We could implement it but it is not needed in Banded, because it always assigns player as black and shuffle skips byes.
+                    raise ValueError("not implemented, should not happen.")
+                if group.type == GroupType.BANDED and isinstance(pair[1], Bye):
+                    # Special player-with-result pair (player, bye_result) typically for the top and bottom players.
+                    player = members[pair[0]]
+                    bye_result = pair[1]
+
+                    # Design choice: Create a BYE game with player as black and winner based on bye result.
+                    # Note that this game will typically  provide a point depending whether ByeWin/ByeLoss.
+                    games.append(
+                        Game(
                             group=group,
                             round=round,
                             black=player,
                             white=None,
                             winner=player if bye_result == Bye.ByeWin else None,
                             win_type=WinType.BYE,
-                            date=datetime.datetime.combine(round.end_date, settings.DEFAULT_GAME_TIME),
+                            date=game_date,
                         )
-                    else:
-                        game_members = [members[pair[0]], members[pair[1]]]
-                        Game.objects.create(
+                    )
+                else:
+                    games.append(
+                        Game(
                             group=group,
                             round=round,
-                            black=game_members[0],
-                            white=game_members[1],
-                            date=datetime.datetime.combine(round.end_date, settings.DEFAULT_GAME_TIME),
+                            black=members[pair[0]],
+                            white=members[pair[1]],
+                            date=game_date,
                         )
+                    )
+        return rounds, games
 
     def finish(self) -> None:
         self.validate_state(state=SeasonState.IN_PROGRESS)
-        if Game.objects.filter(group__season=self, win_type__isnull=True).exists():
+        with transaction.atomic():
             Game.objects.filter(group__season=self, win_type__isnull=True).update(win_type=WinType.NOT_PLAYED)
-        for group in self.groups.all():
-            for position, member in enumerate(group.members_qualification, start=1):
-                member.final_order = position
-                member.save()
-        self.state = SeasonState.FINISHED
-        self.save()
+            groups = list(self.groups.all())
+            game_rows = defaultdict(list)
+            for group_id, *game_row in (
+                Game.objects.filter(group__season=self)
+                .order_by("round__number")
+                .values_list("group_id", "black_id", "white_id", "winner_id", "win_type")
+            ):
+                game_rows[group_id].append(tuple(game_row))
+            group_members = defaultdict(list)
+            for member in Member.objects.filter(group__season=self).select_related("standing"):
+                group_members[member.group_id].append(member)
+
+            members_to_update = []
+            standings_to_update = []
+            for group in groups:
+                group._game_rows = game_rows[group.id]
+                members = group_members[group.id]
+                standings_to_update.extend(group._rank_members(members))
+                for position, member in enumerate(members, start=1):
+                    member.final_order = position
+                members_to_update.extend(members)
+            Member.objects.bulk_update(members_to_update, ["final_order"])
+            MemberStanding.objects.bulk_upsert(standings_to_update)
+            self.state = SeasonState.FINISHED
+            self.save()
+        for group in groups:
+            group.invalidate_page_cache()
 
     def validate_state(self, state: SeasonState) -> None:
         if self.state != state:
@@ -203,12 +275,16 @@ class Season(models.Model):
             raise GamesWithoutResultError("Cannot revert season with played games")
             
         # Delete all games and rounds
-        for group in self.groups.all():
+        groups = list(self.groups.all())
+        for group in groups:
             group.games.all().delete()
             group.rounds.all().delete()
             
         # Reset member initial scores that were calculated during start()
         Member.objects.filter(group__season=self).update(initial_score=0.0)
+        # Queryset deletes and updates don't update standings, so each group is updated once
+        for group in groups:
+            group.update_standings()
             
         # Update season state
         self.state = SeasonState.DRAFT
@@ -360,9 +436,10 @@ class Season(models.Model):
             return game_count
             
         # Fall back to original formula for tests or when no games exist yet
-        return self.groups.annotate(games_per_round=(Count("members") / 2),).aggregate(
+        games_per_round = self.groups.annotate(games_per_round=(Count("members") / 2),).aggregate(
             games_to_play=Sum("games_per_round")
-        )["games_to_play"] * (self.players_per_group - 1)
+        )["games_to_play"]
+        return (games_per_round or 0) * (self.players_per_group - 1)
 
     @cached_property
     def played_games(self) -> int:
@@ -390,6 +467,11 @@ class GroupType(models.TextChoices):
     BANDED = "banded", _("Banded Round Robin")
 
 
+class McMahonPairingEngine(models.TextChoices):
+    GREEDY = mm.PairingEngine.GREEDY.value, _("Zachłanny")
+    OPTIMAL = mm.PairingEngine.OPTIMAL.value, _("Optymalny")
+
+
 class NotMcmahonGroupError(Exception):
     pass
 
@@ -404,6 +486,17 @@ class ResultSymbol(str, Enum):
         return str(self.value)
 
 
+class GroupManager(models.Manager):
+    def invalidate_page_cache_of_players(self, player_ids: list[int]) -> None:
+        """Clears cached pages of groups showing given players, after their ratings or ranks were updated in bulk."""
+        if not player_ids:
+            return
+        for season_number, group_name in (
+            self.filter(members__player_id__in=player_ids).order_by().values_list("season__number", "name").distinct()
+        ):
+            invalidate_group_page(season_number=season_number, group_name=group_name)
+
+
 class Group(models.Model):
     name = models.CharField(max_length=1)
     season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name="groups")
@@ -411,10 +504,18 @@ class Group(models.Model):
     is_egd = models.BooleanField(default=False, help_text="Deprecated. Games are now eligible for EGD export based on individual player approvals.")
     band_size = models.IntegerField(null=True, blank=True, help_text="Band size for banded round robin pairing")
     point_difference = models.FloatField(null=True, blank=True, help_text="Points difference between consecutive players in ranking", default=1.0)
+    pairing_engine = models.CharField(
+        choices=McMahonPairingEngine.choices,
+        max_length=16,
+        default=McMahonPairingEngine.GREEDY,
+        help_text="McMahon pairing engine: greedy (pair by pair) or optimal (whole round at once)",
+    )
     teacher = models.ForeignKey(
         "review.Teacher", null=True, on_delete=models.SET_NULL, related_name="groups", blank=True
     )
 
+    objects = GroupManager()
+
     class Meta:
         ordering = ["-season__number", "name"]
 
@@ -430,26 +531,39 @@ class Group(models.Model):
     @cached_property
     def results_table(self) -> list[tuple[int, "Member", list[tuple[str, str]]]]:
         members = self.members_qualification
-        player_position = {member.player.nick: idx for idx, member in enumerate(members, start=1)}
+        member_position = {member.id: idx for idx, member in enumerate(members, start=1)}
+        member_nick = {member.id: quote(member.player.nick, safe=URL_SAFE_CHARS) for member in members}
+        games_url_prefix = reverse(
+            "group-games",
+            kwargs={"season_number": self.season.number, "group_name": self.name},
+        )
+        member_games = defaultdict(list)
+        for game_row in self._game_rows:
+            black_id, white_id, winner_id, _ = game_row
+            for member_id in {black_id, white_id, winner_id} - {None}:
+                member_games[member_id].append(game_row)
+
         table = []
         for position, member in enumerate(members, start=1):
-            games = Game.objects.get_for_member(member)
             records = []
-            for game in games:
-                opponent = game.get_opponent(member)
-                if opponent:
-                    opponent_position = player_position[opponent.player.nick]
-                    if not game.is_played:
-                        result_symbol = ResultSymbol.not_played
-                    elif game.winner == member:
-                        result_symbol = ResultSymbol.win
-                    elif game.winner == opponent:
-                        result_symbol = ResultSymbol.lose
-                    else:
-                        result_symbol = ResultSymbol.no_result
-                    records.append((f"{opponent_position}{result_symbol}", game.get_absolute_url()))
+            for black_id, white_id, winner_id, win_type in member_games[member.id]:
+                if win_type == WinType.BYE:
+                    records.append(("0=", f"{games_url_prefix}/{member_nick.get(winner_id)}"))
+                    continue
+                game_url = f"{games_url_prefix}/{member_nick[black_id]}-{member_nick[white_id]}"
+                opponent_id = white_id if member.id == black_id else black_id
+                if opponent_id is None:
+                    records.append(("0=", game_url))
+                    continue
+                if not win_type:
+                    result_symbol = ResultSymbol.not_played
+                elif winner_id == member.id:
+                    result_symbol = ResultSymbol.win
+                elif winner_id == opponent_id:
+                    result_symbol = ResultSymbol.lose
                 else:
-                    records.append((f"0=", game.get_absolute_url()))
+                    result_symbol = ResultSymbol.no_result
+                records.append((f"{member_position[opponent_id]}{result_symbol}", game_url))
             table.append((position, member, records))
         return table
 
@@ -471,12 +585,72 @@ class Group(models.Model):
     def latest_round(self) -> "Round":
         return self.rounds.order_by("-number").first()
 
+    @cached_property
+    def _game_rows(self) -> list[tuple[Optional[int], Optional[int], Optional[int], Optional[str]]]:
+        return list(
+            Game.objects.filter(group=self)
+            .order_by("round__number")
+            .values_list("black_id", "white_id", "winner_id", "win_type")
+        )
+
     @cached_property
     def members_qualification(self) -> list["Member"]:
-        members = list(self.members.select_related("player")
-                       .prefetch_related("won_games__black", "won_games__white", "games_as_black", "games_as_white")
-                       .all())
+        members = list(self.members.select_related("player", "standing").all())
+        try:
+            standings = [member.standing.as_standing() for member in members]
+        except MemberStanding.DoesNotExist:
+            # Standings are not materialized yet (e.g. member added after the last update), calculate them from games.
+            standings = self._compute_standings(members)
+        for member, standing in zip(members, standings):
+            member.set_standing(standing)
+            member.group = self
+        self._sort_by_qualification(members)
+        return members
 
+    def update_standings(self) -> None:
+        """Recalculate standings of the group and persist only those which have changed."""
+        self.__dict__.pop("_game_rows", None)  # games might have changed since they were cached
+        members = list(self.members.select_related("standing").all())
+        MemberStanding.objects.bulk_upsert(self._rank_members(members))
+        # Standings are also updated after bulk game updates which bypass model signals.
+        self.invalidate_page_cache()
+
+    def _rank_members(self, members: list["Member"]) -> list["MemberStanding"]:
+        """Sorts members in qualification order and returns standings which differ from the persisted ones."""
+        standings = {member.id: standing for member, standing in zip(members, self._compute_standings(members))}
+        for member in members:
+            member.set_standing(standings[member.id])
+        self._sort_by_qualification(members)
+
+        changed_standings = []
+        for position, member in enumerate(members, start=1):
+            try:
+                current_standing = member.standing
+            except MemberStanding.DoesNotExist:
+                current_standing = None
+            member_standing = MemberStanding(member=member, position=position, **asdict(standings[member.id]))
+            if current_standing is None or not current_standing.has_same_values(member_standing):
+                changed_standings.append(member_standing)
+        return changed_standings
+
+    def invalidate_page_cache(self) -> None:
+        invalidate_group_page(season_number=self.season.number, group_name=self.name)
+
+    def _compute_standings(self, members: list["Member"]) -> list[Standing]:
+        member_index = {member.id: idx for idx, member in enumerate(members)}
+        games = [
+            (
+                member_index.get(black_id),
+                member_index.get(white_id),
+                member_index.get(winner_id),
+                win_type == WinType.BYE,
+                win_type == WinType.NOT_PLAYED,
+            )
+            for black_id, white_id, winner_id, win_type in self._game_rows
+        ]
+        return compute_standings(initial_scores=[member.initial_score for member in members], games=games)
+
+    def _sort_by_qualification(self, members: list["Member"]) -> None:
         # Note different sorting based on group type.
         if self.type == GroupType.ROUND_ROBIN:
             members.sort(key=lambda member: (
@@ -499,8 +673,6 @@ class Group(models.Model):
                 -member.sosos
             ))
 
-        return members
-
     def delete_member(self, member_id: int) -> None:
         self.season.validate_state(state=SeasonState.DRAFT)
         member_to_remove = self.members.get(id=member_id)
@@ -605,6 +777,7 @@ class Group(models.Model):
         member_to_remove.games_as_white.update(white=new_member)
         member_to_remove.games_as_black.update(black=new_member)
         member_to_remove.delete()
+        self.update_standings()
 
     def validate_type(self, group_type: GroupType):
         if self.type != group_type:
@@ -625,7 +798,7 @@ class Group(models.Model):
         new_round = Round.objects.create(group=self, number=number, start_date=start_date, end_date=end_date)
 
         players = self.get_macmahon_players()
-        pairs, bye = mm.prepare_next_round(players)
+        pairs, bye = mm.prepare_next_round(players, engine=mm.PairingEngine(self.pairing_engine))
 
         for pair in pairs:
             black = Member.objects.get(player__nick=pair.black.name, group=self)
@@ -681,6 +854,7 @@ class Player(models.Model):
     auto_join = models.BooleanField(default=True)
     egd_pin = models.CharField(max_length=8, null=True, blank=True, validators=[MinLengthValidator(8)])
     egd_approval = models.BooleanField(default=False)
+    egd_updated = models.DateTimeField(null=True, blank=True)  # last successful rank sync with EGD
     availability = models.TextField(blank=True)
     is_supporter = models.BooleanField(default=False)
     country = CountryField()
@@ -752,6 +926,15 @@ class Member(models.Model):
     def __str__(self) -> str:
         return self.player.nick
 
+    def set_standing(self, standing: Standing) -> None:
+        """Fill the cached points and tiebreakers with values precomputed for the whole group."""
+        self.points = standing.points
+        self.score = standing.score
+        self.sodos = standing.sodos
+        self.sos = standing.sos
+        self.sosos = standing.sosos
+        self.total_walkovers = standing.walkovers
+
     @cached_property
     def points(self) -> int:
         result = 0
@@ -835,6 +1018,7 @@ class Member(models.Model):
         )
         self.group.members.filter(order__gt=self.order).update(order=F("order") - 1)
         self.delete()
+        self.group.update_standings()
 
     @cached_property
     def membership_history(self) -> MembershipHistory:
@@ -872,6 +1056,49 @@ class Member(models.Model):
         return self.lost_unplayed_games + self.mutual_unplayed_games
 
 
+class MemberStandingManager(models.Manager):
+    def bulk_upsert(self, standings: list["MemberStanding"]) -> None:
+        self.bulk_create(
+            standings,
+            update_conflicts=True,
+            unique_fields=["member"],
+            update_fields=MemberStanding.VALUE_FIELDS,
+        )
+
+
+class MemberStanding(models.Model):
+    """Materialized points, tiebreakers and position of a member, kept up to date by `Group.update_standings()`."""
+
+    VALUE_FIELDS = ["points", "score", "sodos", "sos", "sosos", "walkovers", "position"]
+
+    member = models.OneToOneField(Member, on_delete=models.CASCADE, related_name="standing")
+    points = models.SmallIntegerField(default=0)
+    score = models.FloatField(default=0.0)
+    sodos = models.SmallIntegerField(default=0)
+    sos = models.FloatField(default=0.0)
+    sosos = models.FloatField(default=0.0)
+    walkovers = models.SmallIntegerField(default=0)
+    position = models.SmallIntegerField()
+
+    objects = MemberStandingManager()
+
+    def __str__(self) -> str:
+        return f"{self.member_id} - position: {self.position}"
+
+    def as_standing(self) -> Standing:
+        return Standing(
+            points=self.points,
+            score=self.score,
+            sodos=self.sodos,
+            sos=self.sos,
+            sosos=self.sosos,
+            walkovers=self.walkovers,
+        )
+
+    def has_same_values(self, other: "MemberStanding") -> bool:
+        return all(getattr(self, field) == getattr(other, field) for field in self.VALUE_FIELDS)
+
+
 def game_upload_to(instance, filename) -> str:
     return f"games/season-{instance.group.season.number}-group-{instance.group.name}-game-{instance.black.player.nick}-{instance.white.player.nick}.sgf"
 
@@ -977,7 +1204,7 @@ class GameManager(models.Manager):
 
     def get_latest_finished(self, current_season=False) -> QuerySet:
         queryset = (
-            self.prefetch_related("group", "black__player", "white__player", "group__season")
+            self.select_related("group__season", "black__player", "white__player")
             .order_by("-sgf_updated")
             .filter(sgf_updated__isnull=False)
         )
@@ -987,9 +1214,8 @@ class GameManager(models.Manager):
 
     def get_latest_reviews(self, current_season=False) -> QuerySet:
         queryset = (
-            self.prefetch_related(
-                "group", "black__player", "white__player", 
-                "group__teacher", "group__season", "assigned_teacher"
+            self.select_related(
+                "group__season", "group__teacher", "black__player", "white__player", "assigned_teacher"
             )
             .order_by("-review_updated")
             .filter(review_updated__isnull=False)
@@ -1002,7 +1228,7 @@ class GameManager(models.Manager):
         now = datetime.datetime.now()
         one_hour_ago = now - datetime.timedelta(hours=1)
         return (
-            self.prefetch_related("group", "black__player", "white__player", "group__season")
+            self.select_related("group__season", "black__player", "white__player")
             .filter(win_type=WinType.NOT_PLAYED, date__gt=one_hour_ago)
             .order_by("date")
         )
@@ -1072,6 +1298,10 @@ class Game(models.Model):
 
     sgf_updated = models.DateTimeField(null=True)
     review_updated = models.DateTimeField(null=True)
+    # Failed fetches of the SGF file from the game link are retried with backoff, and after claiming by a fetch task
+    # the next attempt is postponed until its time limit
+    sgf_fetch_attempts = models.SmallIntegerField(default=0)
+    sgf_fetch_next_attempt = models.DateTimeField(null=True, blank=True)
 
     objects = GameManager()
 
@@ -1174,6 +1404,7 @@ class Game(models.Model):
 
 
 class GameAIAnalyseUploadStatus(TextChoices):
+    QUEUED = "queued", "queued"
     IN_PROGRESS = "in_progress", "in_progress"
     DONE = "done", "done"
     FAILED = "failed", "failed"
@@ -1187,6 +1418,56 @@ class GameAIAnalyseUpload(models.Model):
     updated = models.DateTimeField(auto_now=True)
     error = models.TextField()
     result = models.URLField(null=True)
+    attempts = models.SmallIntegerField(default=0)
+    next_attempt = models.DateTimeField(null=True, blank=True)  # set when a failed upload waits for a retry
+    duration = models.FloatField(null=True, blank=True)  # of the successful upload request, in seconds
+    claimed = models.DateTimeField(null=True, blank=True)  # when an upload task took the upload in progress
+
+
+class IgorFitManager(models.Manager):
+    def get_last(self) -> Optional["IgorFit"]:
+        return self.order_by("-last_used", "-id").first()
+
+    def get_by_content_hash(self, content_hash: str, full: bool = False) -> Optional["IgorFit"]:
+        fits = self.filter(content_hash=content_hash)
+        if full:
+            fits = fits.filter(first_fitted_season=0)
+        return fits.order_by("-last_used", "-id").first()
+
+    def delete_least_recently_used(self, keep: int) -> None:
+        self.filter(id__in=self.order_by("-last_used", "-id").values_list("id", flat=True)[keep:]).delete()
+
+
+class IgorFit(models.Model):
+    """Result of an IGoR fit, kept to warm-start the next (incremental) recalculation or to be reused or rolled back."""
+
+    created = models.DateTimeField(auto_now_add=True)
+    last_used = models.DateTimeField(default=timezone.now)
+    content_hash = models.CharField(max_length=64, db_index=True, blank=True)  # hash of config and all matches
+    config = models.JSONField()
+    season_digests = models.JSONField(default=list)  # digest of matches of every season, indexed from 0
+    ratings = models.JSONField(default=dict)  # player nick -> rating in every season, indexed from 0
+    learning_rate = models.FloatField(null=True)  # final one of incremental fits, not reported by `accurating.fit`
+    first_fitted_season = models.SmallIntegerField(default=0)  # 0 for a full refit
+    steps = models.IntegerField(null=True)  # not reported by `accurating.fit` for full refits
+    duration = models.FloatField(default=0.0)
+
+    objects = IgorFitManager()
+
+    def __str__(self) -> str:
+        return f"{self.created} - from season: {self.first_fitted_season}"
+
+    def mark_used(self) -> None:
+        self.last_used = timezone.now()
+        self.save(update_fields=["last_used"])
+
+
+GAME_RESULT_FIELDS = ["winner", "win_type", "points_difference"]
+
+
+def get_game_result(game: Game) -> tuple:
+    points_difference = Game._meta.get_field("points_difference").to_python(game.points_difference)
+    return game.winner_id, game.win_type, points_difference
 
 
 @receiver(signal=pre_save, sender=Game)
@@ -1194,19 +1475,97 @@ def update_game_timestamps(sender, instance: Game, raw, using, update_fields, **
     try:
         db_game: Game = sender.objects.get(pk=instance.pk)
     except sender.DoesNotExist:
-        pass
+        instance._result_changed = True
     else:
+        instance._result_changed = get_game_result(db_game) != get_game_result(instance)
         if db_game.review_updated is None and instance.review_video_link and len(str(instance.review_video_link)) > 0:
             instance.review_updated = datetime.datetime.now()
         if db_game.sgf_updated is None and instance.sgf and len(str(instance.sgf)) > 0:
             instance.sgf_updated = datetime.datetime.now()
+        if db_game.link != instance.link:
+            instance.sgf_fetch_attempts = 0
+            instance.sgf_fetch_next_attempt = None
 
 
 @receiver(signal=post_save, sender=Game)
 def game_updated(instance, raw, **kwargs):
-    from league.tasks import game_ai_analyse_upload_task, game_sgf_fetch_task
+    from league.tasks import game_ai_analyse_upload_task, schedule_sgf_fetch
 
     if instance.sgf and not instance.ai_analyse_link:
         game_ai_analyse_upload_task.delay(game_id=instance.id)
     if instance.link and not instance.sgf:
-        game_sgf_fetch_task.delay(game_id=instance.id)
+        schedule_sgf_fetch(game_id=instance.id)
+
+
+@receiver(signal=post_save, sender=Game)
+def game_standings_updated(instance, raw, update_fields, **kwargs):
+    # Saves of SGF files, links, reviews or reminders don't change standings
+    if raw or not getattr(instance, "_result_changed", True):
+        return
+    if update_fields is not None and not {*GAME_RESULT_FIELDS, "winner_id"} & set(update_fields):
+        return
+    instance.group.update_standings()
+
+
+# Member fields which change standings or positions in the group
+MEMBER_STANDING_FIELDS = ["group", "order", "final_order", "initial_score"]
+
+
+def get_member_standing_values(member: Member) -> tuple:
+    initial_score = Member._meta.get_field("initial_score").to_python(member.initial_score)
+    return member.group_id, member.order, member.final_order, initial_score
+
+
+@receiver(signal=pre_save, sender=Member)
+def member_standing_values_changed(sender, instance: Member, raw, **kwargs):
+    # Standings of new members are calculated from games until the next update of the group
+    instance._standing_changed = False
+    instance._previous_group_id = instance.group_id
+    if instance.pk is None:
+        return
+    db_member = sender.objects.filter(pk=instance.pk).first()
+    if db_member is not None:
+        instance._standing_changed = get_member_standing_values(db_member) != get_member_standing_values(instance)
+        instance._previous_group_id = db_member.group_id
+
+
+@receiver(signal=post_save, sender=Member)
+def member_standings_updated(instance, raw, update_fields, **kwargs):
+    if raw or not getattr(instance, "_standing_changed", False):
+        return
+    if update_fields is not None and not {*MEMBER_STANDING_FIELDS, "group_id"} & set(update_fields):
+        return
+    instance.group.update_standings()
+    if instance._previous_group_id != instance.group_id:
+        Group.objects.get(id=instance._previous_group_id).update_standings()
+
+
+@receiver(signal=post_delete, sender=Game)
+@receiver(signal=post_delete, sender=Member)
+def group_member_or_game_deleted(sender, instance, origin=None, **kwargs):
+    # Only deletes of a single object are handled. Queryset deletes would update the whole group once per row,
+    # so their callers update standings of the groups afterwards. Deletions cascading from a member are handled
+    # once it is deleted, and from a group or a season there is nothing left to update.
+    if isinstance(origin, sender):
+        instance.group.update_standings()
+
+
+@receiver(signal=post_save, sender=Game)
+@receiver(signal=post_save, sender=Member)
+@receiver(signal=post_save, sender=Round)
+def group_page_changed(instance, **kwargs):
+    instance.group.invalidate_page_cache()
+
+
+@receiver(signal=post_delete, sender=Game)
+@receiver(signal=post_delete, sender=Member)
+@receiver(signal=post_delete, sender=Round)
+def group_page_object_deleted(sender, instance, origin=None, **kwargs):
+    # Like standings, pages are invalidated by callers of queryset deletes and once per group for deleted groups
+    if isinstance(origin, sender):
+        instance.group.invalidate_page_cache()
+
+
+@receiver(signal=post_delete, sender=Group)
+def group_deleted(instance, **kwargs):
+    instance.invalidate_page_cache()
@@ -2,63 +2,28 @@ import datetime
 import hashlib
 import logging
 import time
-from typing import Optional, Dict, List, Tuple, Any, Callable
+from typing import Optional, Dict, List
 
 from celery import shared_task
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.base import ContentFile
 from django.core.mail import send_mail
-from django.db import models
-from requests.exceptions import HTTPError
+from django.db import models, transaction
+from django.utils import timezone
 
 from league import texts
-from league.models import Game, GameAIAnalyseUpload, GameAIAnalyseUploadStatus, Player, WinType
+from league.models import Game, GameAIAnalyseUpload, GameAIAnalyseUploadStatus, Group, Player, WinType
 from league.utils.aisensei import upload_sgf, AISenseiConfig, AISenseiException
 from league.utils.egd import get_gor_by_pin, EGDException
+from league.utils.http import RateLimiter, create_session, map_concurrently
+from league.utils.http_cache import get_http_cache
 from league.utils.ogs import fetch_sgf, OGSException, get_player_data
 from utils.emails import send_email
 from league import igor
 
 logger = logging.getLogger("league")
 
-# Common retry logic for API rate limits
-def retry_on_rate_limit(func: Callable, *args, **kwargs) -> Tuple[bool, Any, str]:
-    """
-    Execute a function with exponential backoff retry on rate limit (HTTP 429).
-    
-    Args:
-        func: The function to execute
-        *args: Arguments to pass to the function
-        **kwargs: Keyword arguments to pass to the function
-        
-    Returns:
-        Tuple of (success: bool, result: Any, error_message: str)
-    """
-    retry_delays = [5, 10, 20, 40, 60, 100]  # Seconds to wait between retries
-    last_error = None
-    
-    for attempt, delay in enumerate(retry_delays + [0]):  # +[0] for one more attempt after last delay
-        try:
-            result = func(*args, **kwargs)
-            return True, result, ""
-        except (HTTPError, OGSException, EGDException) as err:
-            last_error = err
-            error_str = str(err)
-            
-            # Check if it's a rate limit error (HTTP 429)
-            error_str_lower = error_str.lower()
-            if "429" in error_str_lower or "too many requests" in error_str_lower or "rate limit" in error_str_lower:
-                if attempt < len(retry_delays):  # If we have retries left
-                    logger.info(f"Rate limited. Retrying in {delay} seconds (attempt {attempt+1}/{len(retry_delays)})...")
-                    time.sleep(delay)
-                    continue
-            
-            # If it's not a rate limit error or we're out of retries, stop trying
-            return False, None, str(err)
-    
-    # This should never happen, but just in case
-    return False, None, str(last_error) if last_error else "Unknown error"
-
 # Common function to generate error report
 def format_error_report(failed_updates: List[Dict]) -> str:
     """
@@ -93,12 +58,18 @@ def format_error_report(failed_updates: List[Dict]) -> str:
     return report
 
 
+AI_ANALYSE_UPLOAD_TIME_LIMIT = 300
+AI_ANALYSE_UPLOAD_PENDING_KEY = "league:ai-analyse-upload:pending"
+AI_ANALYSE_UPLOAD_MAX_ATTEMPTS = 5
+AI_ANALYSE_UPLOAD_RETRY_DELAY = 60  # doubled after every failed attempt, in seconds
+
+
 @shared_task(time_limit=20)
 def game_ai_analyse_upload_task(game_id: int) -> None:
     if not settings.ENABLE_AI_ANALYSE_UPLOAD:
         logger.info("AI analyse upload skipped for game %d - this feature is disabled", game_id)
         return
-    logger.info("AI analyse upload started for game %d", game_id)
+    logger.info("AI analyse upload queued for game %d", game_id)
     game = Game.objects.get(id=game_id)
     if not game.sgf:
         logger.info("AI analyse upload skipped for game %d - no SGF data", game_id)
@@ -112,7 +83,7 @@ def game_ai_analyse_upload_task(game_id: int) -> None:
         game=game,
         sgf_hash=hashlib.md5(sgf_data.encode()).hexdigest(),
         defaults={
-            "status": GameAIAnalyseUploadStatus.IN_PROGRESS,
+            "status": GameAIAnalyseUploadStatus.QUEUED,
         },
     )
     if not created:
@@ -121,100 +92,316 @@ def game_ai_analyse_upload_task(game_id: int) -> None:
             game.ai_analyse_link = upload.result
             game.save()
             return
-        elif upload.status == GameAIAnalyseUploadStatus.IN_PROGRESS:
+        elif upload.status in [GameAIAnalyseUploadStatus.QUEUED, GameAIAnalyseUploadStatus.IN_PROGRESS]:
             logger.info("AI analyse already in progress for game %d", game_id)
-    try:
-        result = upload_sgf(
-            config=AISenseiConfig(
-                auth_url=settings.AI_SENSEI["AUTH_URL"],
-                service_url=settings.AI_SENSEI["SERVICE_URL"],
-                email=settings.AI_SENSEI["EMAIL"],
-                password=settings.AI_SENSEI["PASSWORD"],
-            ),
-            sgf_data=sgf_data,
-            tags=[f"IGLO - Grupa {game.group.name}"],
+        else:
+            upload.status = GameAIAnalyseUploadStatus.QUEUED
+            upload.attempts = 0
+            upload.next_attempt = None
+            upload.save()
+    schedule_ai_analyse_uploads()
+
+
+def schedule_ai_analyse_uploads(countdown: int = 0) -> bool:
+    """
+    Schedules draining of the upload queue, unless it is already scheduled - which is known only through a shared
+    cache. Returns True if it was scheduled.
+    """
+    if settings.SHARED_CACHE and not cache.add(
+        AI_ANALYSE_UPLOAD_PENDING_KEY, True, timeout=countdown + AI_ANALYSE_UPLOAD_TIME_LIMIT
+    ):
+        return False
+    upload_ai_analyses.apply_async(countdown=countdown)
+    return True
+
+
+def claim_ai_analyse_uploads() -> List[GameAIAnalyseUpload]:
+    """
+    Takes due uploads in progress. Uploads are claimed in the database, so that concurrent tasks skip them, and
+    uploads claimed longer than the task time limit ago were left by a killed task, so they are taken again.
+    """
+    now = datetime.datetime.now()
+    with transaction.atomic():
+        uploads = list(
+            GameAIAnalyseUpload.objects.filter(
+                models.Q(status=GameAIAnalyseUploadStatus.QUEUED)
+                | models.Q(
+                    status=GameAIAnalyseUploadStatus.IN_PROGRESS,
+                    claimed__lte=now - datetime.timedelta(seconds=AI_ANALYSE_UPLOAD_TIME_LIMIT),
+                )
+            )
+            .filter(models.Q(next_attempt__isnull=True) | models.Q(next_attempt__lte=now))
+            .select_related("game__group__season")
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("created")
         )
-        upload.result = result
-        upload.status = GameAIAnalyseUploadStatus.DONE
-        upload.save()
-        game.ai_analyse_link = result
-        game.save()
-        logger.info("AI analyse uploaded successfully for game %d", game_id)
-    except AISenseiException as err:
-        upload.error = str(err)
+        GameAIAnalyseUpload.objects.filter(id__in=[upload.id for upload in uploads]).update(
+            status=GameAIAnalyseUploadStatus.IN_PROGRESS, claimed=now
+        )
+    return uploads
+
+
+@shared_task(time_limit=AI_ANALYSE_UPLOAD_TIME_LIMIT)
+def upload_ai_analyses() -> Dict[str, int]:
+    """
+    Uploads queued SGF files to AI Sensei with bounded parallelism. Failed uploads which may pass later are retried
+    with exponential backoff, up to `AI_ANALYSE_UPLOAD_MAX_ATTEMPTS` times. Games which got an AI analyse link
+    in the meantime are skipped and their links are never overwritten.
+    """
+    if settings.SHARED_CACHE:
+        cache.delete(AI_ANALYSE_UPLOAD_PENDING_KEY)
+    claimed = claim_ai_analyse_uploads()
+    skipped = [upload for upload in claimed if upload.game.ai_analyse_link]
+    uploads = [upload for upload in claimed if not upload.game.ai_analyse_link]
+    logger.info("AI analyse upload started for %d games, %d skipped", len(uploads), len(skipped))
+    config = AISenseiConfig(
+        auth_url=settings.AI_SENSEI["AUTH_URL"],
+        service_url=settings.AI_SENSEI["SERVICE_URL"],
+        email=settings.AI_SENSEI["EMAIL"],
+        password=settings.AI_SENSEI["PASSWORD"],
+    )
+
+    def upload_game(upload: GameAIAnalyseUpload) -> tuple[str, float]:
+        try:
+            with upload.game.sgf.open("r") as file:
+                sgf_data = file.read()
+        except (OSError, ValueError) as e:
+            raise AISenseiException(f"can not read SGF file: {str(e)}")
+        start = time.perf_counter()
+        result = upload_sgf(config=config, sgf_data=sgf_data, tags=[f"IGLO - Grupa {upload.game.group.name}"])
+        return result, time.perf_counter() - start
+
+    # Unexpected errors are recorded as failures of their uploads, so that they don't lose results of other uploads
+    results = map_concurrently(upload_game, uploads, workers=settings.AI_SENSEI_UPLOAD_WORKERS)
+    uploaded_games = []
+    retry_delays = []
+    for upload in skipped:
+        upload.error = "AI analyse already defined"
         upload.status = GameAIAnalyseUploadStatus.FAILED
-        upload.save()
-        logger.info("AI analyse upload failed for game %d - %s", game_id, str(err))
+        logger.info("AI analyse upload skipped for game %d - AI analyse already defined", upload.game.id)
+    for upload, result, error in results:
+        upload.attempts += 1
+        if error is None:
+            upload.result, upload.duration = result
+            upload.status = GameAIAnalyseUploadStatus.DONE
+            upload.next_attempt = None
+            # Link might have been entered by a referee during the upload
+            if (
+                Game.objects.filter(id=upload.game.id)
+                .filter(models.Q(ai_analyse_link__isnull=True) | models.Q(ai_analyse_link=""))
+                .update(ai_analyse_link=upload.result)
+            ):
+                uploaded_games.append(upload.game)
+            logger.info(
+                "AI analyse uploaded successfully for game %d in %.3fs, %.1fs after queueing",
+                upload.game.id,
+                upload.duration,
+                (datetime.datetime.now() - upload.created).total_seconds(),
+            )
+        elif getattr(error, "retryable", False) and upload.attempts < AI_ANALYSE_UPLOAD_MAX_ATTEMPTS:
+            retry_delay = AI_ANALYSE_UPLOAD_RETRY_DELAY * 2 ** (upload.attempts - 1)
+            upload.error = str(error)
+            upload.status = GameAIAnalyseUploadStatus.QUEUED
+            upload.next_attempt = datetime.datetime.now() + datetime.timedelta(seconds=retry_delay)
+            retry_delays.append(retry_delay)
+            logger.info("AI analyse upload failed for game %d - %s, retry in %ds", upload.game.id, error, retry_delay)
+        else:
+            upload.error = str(error)
+            upload.status = GameAIAnalyseUploadStatus.FAILED
+            logger.info("AI analyse upload failed for game %d - %s", upload.game.id, str(error))
+    GameAIAnalyseUpload.objects.bulk_update(
+        claimed, ["status", "result", "error", "attempts", "next_attempt", "duration"]
+    )
+
+    for group in {game.group for game in uploaded_games}:
+        group.invalidate_page_cache()
+    if retry_delays:
+        schedule_ai_analyse_uploads(countdown=min(retry_delays))
+    done = sum(upload.status == GameAIAnalyseUploadStatus.DONE for upload in uploads)
+    return {
+        "uploaded": done,
+        "retried": len(retry_delays),
+        "failed": len(uploads) - done - len(retry_delays),
+        "skipped": len(skipped),
+    }
+
+
+SGF_FETCH_TIME_LIMIT = 120
+SGF_FETCH_PENDING_KEY = "league:sgf-fetch:pending"
+SGF_FETCH_MAX_ATTEMPTS = 5
+SGF_FETCH_RETRY_DELAY = 3600  # doubled after every failed attempt, in seconds
 
 
-@shared_task(time_limit=10)
+def schedule_sgf_fetch(game_id: int) -> bool:
+    """
+    Schedules fetching of all pending SGF files after `SGF_FETCH_DELAY` seconds, unless it is already scheduled, so
+    links entered for a whole round are fetched in one batch. Eager tasks ignore the delay and would fetch the batch
+    in the request saving the game, so then only the SGF file of that game is fetched.
+    Returns True if a new fetch was scheduled.
+    """
+    if settings.CELERY_TASK_ALWAYS_EAGER:
+        game_sgf_fetch_task.delay(game_id=game_id)
+        return True
+    if settings.SHARED_CACHE and not cache.add(
+        SGF_FETCH_PENDING_KEY, True, timeout=settings.SGF_FETCH_DELAY + SGF_FETCH_TIME_LIMIT
+    ):
+        return False
+    fetch_pending_sgfs.apply_async(countdown=settings.SGF_FETCH_DELAY)
+    return True
+
+
+@shared_task(time_limit=SGF_FETCH_TIME_LIMIT)
 def game_sgf_fetch_task(game_id: int) -> None:
-    logger.info("SGF fetch started for game %d", game_id)
-    game = Game.objects.get(id=game_id)
-    if game.external_sgf_link and not game.sgf:
-        try:
-            sgf_data = fetch_sgf(sgf_url=game.external_sgf_link)
-            game.sgf.save(f"game-{game.id}.sgf", ContentFile(sgf_data))
-            logger.info("SGF fetched successfully for game %d", game_id)
-        except OGSException as err:
-            logger.info("SGF fetch fail for game %d - %s", game_id, str(err))
+    fetch_pending_sgfs(game_ids=[game_id])
+
+
+def claim_pending_sgf_fetches(game_ids: Optional[List[int]] = None) -> List[Game]:
+    """
+    Takes a batch of games with OGS link and without SGF which are due to be fetched. Claimed games have their next
+    attempt postponed until the end of the task time limit, so that concurrent tasks skip them. Given games are taken
+    regardless of the limit of attempts.
+    """
+    now = datetime.datetime.now()
+    games = (
+        Game.objects.filter(link__regex=f"^{settings.OGS_GAME_LINK_REGEX}")
+        .filter(models.Q(sgf__isnull=True) | models.Q(sgf=""))
+        .filter(models.Q(sgf_fetch_next_attempt__isnull=True) | models.Q(sgf_fetch_next_attempt__lte=now))
+    )
+    if game_ids is not None:
+        games = games.filter(id__in=game_ids)
     else:
-        logger.info("SGF fetch skipped for game %d - SGF already exists", game_id)
+        games = games.filter(sgf_fetch_attempts__lt=SGF_FETCH_MAX_ATTEMPTS)
+    with transaction.atomic():
+        games = list(
+            games.select_related("group__season", "black__player", "white__player")
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("sgf_fetch_attempts", "id")[: settings.SGF_FETCH_BATCH_SIZE]
+        )
+        Game.objects.filter(id__in=[game.id for game in games]).update(
+            sgf_fetch_next_attempt=now + datetime.timedelta(seconds=SGF_FETCH_TIME_LIMIT)
+        )
+    return games
+
+
+@shared_task(time_limit=SGF_FETCH_TIME_LIMIT)
+def fetch_pending_sgfs(game_ids: Optional[List[int]] = None) -> Dict[str, int]:
+    """
+    Fetches SGF files of games with OGS link and without SGF, concurrently and with the OGS rate limit. Failed fetches
+    are retried with exponential backoff, up to `SGF_FETCH_MAX_ATTEMPTS` times.
+    """
+    if settings.SHARED_CACHE:
+        cache.delete(SGF_FETCH_PENDING_KEY)
+    games = claim_pending_sgf_fetches(game_ids=game_ids)
+    logger.info("SGF fetch started for %d games", len(games))
+
+    session = create_session(
+        pool_size=settings.OGS_SYNC_WORKERS,
+        rate_limiter=RateLimiter(rate=settings.OGS_RATE_LIMIT, burst=settings.OGS_SYNC_WORKERS),
+        cache=get_http_cache(),
+    )
+    results = map_concurrently(
+        lambda game: fetch_sgf(sgf_url=game.external_sgf_link, session=session),
+        games,
+        workers=settings.OGS_SYNC_WORKERS,
+        exceptions=(OGSException,),
+    )
+    now = datetime.datetime.now()
+    fetched = []
+    for game, sgf_data, error in results:
+        game.sgf_fetch_attempts += 1
+        if error is not None:
+            retry_delay = SGF_FETCH_RETRY_DELAY * 2 ** (game.sgf_fetch_attempts - 1)
+            game.sgf_fetch_next_attempt = now + datetime.timedelta(seconds=retry_delay)
+            logger.info("SGF fetch fail for game %d - %s, attempt %d", game.id, str(error), game.sgf_fetch_attempts)
+            continue
+        game.sgf.save(f"game-{game.id}.sgf", ContentFile(sgf_data), save=False)
+        if game.sgf_updated is None:
+            game.sgf_updated = now
+        game.sgf_fetch_next_attempt = None
+        fetched.append(game)
+    # Bulk update does not send signals, so side effects of saving SGF are triggered explicitly
+    Game.objects.bulk_update(games, ["sgf", "sgf_updated", "sgf_fetch_attempts", "sgf_fetch_next_attempt"])
+
+    for group in {game.group for game in fetched}:
+        group.invalidate_page_cache()
+    for game in fetched:
+        if not game.ai_analyse_link:
+            game_ai_analyse_upload_task.delay(game_id=game.id)
+    logger.info("SGF fetched successfully for %d out of %d games", len(fetched), len(games))
+    return {"fetched": len(fetched), "failed": len(games) - len(fetched)}
 
 
-@shared_task(time_limit=1200)  # Increased time limit to allow for retries
-def update_gor(triggering_user_email: Optional[str] = None):
+@shared_task(time_limit=1200)
+def update_gor(triggering_user_email: Optional[str] = None, force: bool = False):
+    """
+    Updates ranks of players from EGD. Players synced within `EGD_SYNC_MAX_AGE` hours are skipped, unless the update
+    is forced - then all players are fetched, bypassing the HTTP cache as well.
+    """
     logger.info("Updating players ranks from EGD")
-    players = Player.objects.filter(egd_pin__isnull=False).all()
+    players = Player.objects.filter(egd_pin__isnull=False)
+    skipped_players = 0
+    if not force:
+        fresh_since = timezone.now() - datetime.timedelta(hours=settings.EGD_SYNC_MAX_AGE)
+        skipped_players = players.filter(egd_updated__gte=fresh_since).count()
+        players = players.exclude(egd_updated__gte=fresh_since)
+    players = list(players[:15] if settings.DEBUG else players)
     total_players = len(players)
-    
+
     # In DEBUG mode, limit to 15 players to avoid rate limits during development
     if settings.DEBUG:
-        players = players[:15]
-        logger.info(f"DEBUG mode: limiting update to 15 players (out of {total_players})")
-        total_players = len(players)
-    
-    logger.info(f"Found {total_players} players to update")
-    
+        logger.info("DEBUG mode: limiting update to 15 players")
+
+    logger.info(f"Found {total_players} players to update, {skipped_players} players synced recently skipped")
+
+    # All workers share connections and the rate limit, so EGD is not flooded and there is no need for long sleeps
+    session = create_session(
+        pool_size=settings.EGD_SYNC_WORKERS,
+        rate_limiter=RateLimiter(rate=settings.EGD_RATE_LIMIT, burst=settings.EGD_SYNC_WORKERS),
+        cache=None if force else get_http_cache(),
+    )
+    results = map_concurrently(
+        lambda player: get_gor_by_pin(player.egd_pin, session=session),
+        players,
+        workers=settings.EGD_SYNC_WORKERS,
+        exceptions=(EGDException,),
+    )
+
     # Track successes and failures for reporting
-    updated_count = 0
+    updated = []
     failed_updates = []
-    
-    # Update player ranks from EGD
-    for idx, player in enumerate(players, start=1):
-        # Wrap the EGD API call with retry logic
-        def fetch_gor():
-            return get_gor_by_pin(player.egd_pin)
-        
-        success, result, error_message = retry_on_rate_limit(fetch_gor)
-        
-        if success:
-            # Update was successful
-            player.rank = result
-            player.save()
-            updated_count += 1
-            logger.info(f"{idx}/{total_players} Updated {player.nick} [{player.egd_pin}] EGD rank: {result}")
+    now = timezone.now()
+    for idx, (player, gor, error) in enumerate(results, start=1):
+        if error is None:
+            player.rank = gor
+            player.egd_updated = now
+            updated.append(player)
+            logger.info(f"{idx}/{total_players} Updated {player.nick} [{player.egd_pin}] EGD rank: {gor}")
         else:
-            # Update failed
             failed_updates.append({
                 'name': player.nick,
                 'id': player.egd_pin,
-                'error': error_message
+                'error': str(error)
             })
-            logger.info(f"{idx}/{total_players} Failed to update {player.nick} [{player.egd_pin}] EGD rank - {error_message}")
-    
+            logger.info(f"{idx}/{total_players} Failed to update {player.nick} [{player.egd_pin}] EGD rank - {error}")
+    Player.objects.bulk_update(updated, ["rank", "egd_updated"])
+    Group.objects.invalidate_page_cache_of_players([player.id for player in updated])
+
     # Generate report
-    success_message = f"{updated_count} out of {total_players} players successfully updated."
-    
+    success_message = f"{len(updated)} out of {total_players} players successfully updated."
+    if skipped_players:
+        success_message += (
+            f" {skipped_players} players synced in the last {settings.EGD_SYNC_MAX_AGE} hours were skipped."
+        )
+
     # Add debug mode notice to email if applicable
     if settings.DEBUG:
         success_message += " [DEBUG MODE: Limited to 15 players]"
-        
+
     error_report = format_error_report(failed_updates)
     full_report = f"{success_message}\n\n{error_report}"
-    
+
     logger.info(f"EGD update completed. {success_message}")
-    
+
     # Send notification email if requested
     if triggering_user_email and triggering_user_email.strip():
         send_mail(
@@ -232,66 +419,75 @@ def update_ogs_data(triggering_user_email: Optional[str] = None):
     logger.info("Updating players data from OGS")
     
     # Get all players for reporting
-    all_players = Player.objects.all()
+    all_players = Player.objects.select_related("user")
     ogs_players = all_players.filter(ogs_username__isnull=False).exclude(ogs_username='')
     missing_ogs_players = all_players.filter(models.Q(ogs_username__isnull=True) | models.Q(ogs_username=''))
-    
+
     total_players = len(ogs_players)
-    
+
     # In DEBUG mode, limit to 15 players to avoid rate limits during development
     if settings.DEBUG:
         original_count = total_players
         ogs_players = ogs_players[:15]
         total_players = len(ogs_players)
         logger.info(f"DEBUG mode: limiting update to 15 players (out of {original_count})")
-        
+
         # Also limit the missing players count for report brevity in debug mode
         missing_ogs_players = missing_ogs_players[:15]
         logger.info(f"DEBUG mode: limiting missing players report to 15 players")
-    
+
     logger.info(f"Found {total_players} players with OGS usernames to update")
     logger.info(f"Found {len(missing_ogs_players)} players without OGS usernames")
-    
+
     # Track successes and failures for reporting
-    updated_count = 0
+    updated = []
     failed_updates = []
     missing_ogs_list = []
-    
+
+    # Players are resolved by cached OGS IDs, the username search is needed only for new or stale IDs
+    session = create_session(
+        pool_size=settings.OGS_SYNC_WORKERS,
+        rate_limiter=RateLimiter(rate=settings.OGS_RATE_LIMIT, burst=settings.OGS_SYNC_WORKERS),
+        cache=get_http_cache(),
+    )
+    results = map_concurrently(
+        lambda player: get_player_data(player.ogs_username, player_id=player.ogs_id, session=session),
+        ogs_players,
+        workers=settings.OGS_SYNC_WORKERS,
+        exceptions=(OGSException,),
+    )
+
     # Process players with OGS usernames
-    for idx, player in enumerate(ogs_players, start=1):
-        # Get player email for reporting
-        player_email = player.user.email if hasattr(player, 'user') and player.user else "No email"
-        ogs_link = f"https://online-go.com/player/{player.ogs_id}" if player.ogs_id else "No OGS link"
-        
-        # Wrap the OGS API call with retry logic
-        def fetch_ogs_data():
-            return get_player_data(player.ogs_username)
-        
-        success, player_data, error_message = retry_on_rate_limit(fetch_ogs_data)
-        
-        if success:
-            # Update was successful
-            player.ogs_id = player_data['id']
-            player.ogs_rating = player_data['rating']
-            player.ogs_deviation = player_data['deviation']
-            player.save()
-            updated_count += 1
+    for idx, (player, player_data, error) in enumerate(results, start=1):
+        if error is None:
+            if (player.ogs_id, player.ogs_rating, player.ogs_deviation) != (
+                player_data['id'],
+                player_data['rating'],
+                player_data['deviation'],
+            ):
+                player.ogs_id = player_data['id']
+                player.ogs_rating = player_data['rating']
+                player.ogs_deviation = player_data['deviation']
+                updated.append(player)
             rating_str = f"{player.ogs_rating}±{player.ogs_deviation}" if player.ogs_rating is not None and player.ogs_deviation is not None else "Not available"
             logger.info(f"{idx}/{total_players} Updated {player.nick} [{player.ogs_username}] OGS data: ID={player.ogs_id}, rating={rating_str}")
         else:
             # Update failed
             failed_updates.append({
                 'name': player.nick,
-                'email': player_email,
+                'email': player.user.email if player.user else "No email",
                 'id': player.ogs_username,
-                'ogs_link': ogs_link,
-                'error': error_message
+                'ogs_link': f"https://online-go.com/player/{player.ogs_id}" if player.ogs_id else "No OGS link",
+                'error': str(error)
             })
-            logger.info(f"{idx}/{total_players} Failed to update {player.nick} [{player.ogs_username}] OGS data - {error_message}")
-    
+            logger.info(f"{idx}/{total_players} Failed to update {player.nick} [{player.ogs_username}] OGS data - {error}")
+    Player.objects.bulk_update(updated, ["ogs_id", "ogs_rating", "ogs_deviation"])
+    Group.objects.invalidate_page_cache_of_players([player.id for player in updated])
+    updated_count = total_players - len(failed_updates)
+
     # Track players without OGS usernames
     for player in missing_ogs_players:
-        player_email = player.user.email if hasattr(player, 'user') and player.user else "No email"
+        player_email = player.user.email if player.user else "No email"
         missing_ogs_list.append({
             'name': player.nick,
             'email': player_email,
@@ -344,11 +540,62 @@ def update_ogs_data(triggering_user_email: Optional[str] = None):
             recipient_list=[triggering_user_email],
         )
 
-@shared_task(time_limit=1200)
-def recalculate_igor():
-    logger.info("Recalculating IGoR")
-    igor.recalculate_igor()
-    logger.info("Recalculating IGoR: success")
+IGOR_TIME_LIMIT = 1200
+IGOR_LOCK_KEY = "league:igor:lock"
+IGOR_PENDING_KEY = "league:igor:pending"
+IGOR_TRIGGERS_KEY = "league:igor:triggers"
+
+
+def schedule_igor_recalculation() -> bool:
+    """
+    Schedules IGoR recalculation after `IGOR_RECALCULATION_DELAY` seconds, unless one is already pending - then
+    the trigger is merged into it. Triggers can be merged only through a cache shared by web and worker processes,
+    without it every trigger schedules its own recalculation. Returns True if a new recalculation was scheduled.
+    """
+    if not settings.SHARED_CACHE:
+        recalculate_igor.apply_async(countdown=settings.IGOR_RECALCULATION_DELAY)
+        return True
+    try:
+        cache.incr(IGOR_TRIGGERS_KEY)
+    except ValueError:
+        cache.set(IGOR_TRIGGERS_KEY, 1, timeout=None)
+    # Pending marker expires in case the scheduled task got lost, so that recalculations are not blocked forever
+    if not cache.add(IGOR_PENDING_KEY, time.time(), timeout=settings.IGOR_RECALCULATION_DELAY + 2 * IGOR_TIME_LIMIT):
+        return False
+    recalculate_igor.apply_async(countdown=settings.IGOR_RECALCULATION_DELAY)
+    return True
+
+
+@shared_task(bind=True, time_limit=IGOR_TIME_LIMIT, max_retries=None)
+def recalculate_igor(self, full: bool = False):
+    if not settings.SHARED_CACHE:
+        logger.info("Recalculating IGoR")
+        _, timings = igor.recalculate_igor(full=full)
+        logger.info(f"Recalculating IGoR: success, {timings}")
+        return timings
+
+    # At most one recalculation runs at a time
+    if not cache.add(IGOR_LOCK_KEY, True, timeout=IGOR_TIME_LIMIT):
+        logger.info("Recalculating IGoR: already running, postponed")
+        raise self.retry(countdown=settings.IGOR_RECALCULATION_DELAY)
+    try:
+        scheduled_at = cache.get(IGOR_PENDING_KEY)
+        triggers = cache.get(IGOR_TRIGGERS_KEY, 0)
+        logger.info("Recalculating IGoR")
+        fit, timings = igor.recalculate_igor(full=full)
+    finally:
+        cache.delete_many([IGOR_PENDING_KEY, IGOR_TRIGGERS_KEY, IGOR_LOCK_KEY])
+    # Triggers coming during the run were merged into it, but their results may have been saved after matches were
+    # loaded. They are detected by comparing the content hash, a changed one schedules the next recalculation.
+    rescheduled = igor.get_current_content_hash() != fit.content_hash and schedule_igor_recalculation()
+    metrics = {
+        **timings,
+        "merged_triggers": triggers,
+        "latency": time.time() - scheduled_at if scheduled_at is not None else None,
+        "rescheduled": rescheduled,
+    }
+    logger.info(f"Recalculating IGoR: success, {metrics}")
+    return metrics
 
 def emails(game):
     return [player.user.email for player in [game.white.player, game.black.player] if player.user]
@@ -405,8 +652,11 @@ def mark_overdue_games_as_unplayed():
     logger.info(f"Marking {game_count} overdue games as unplayed")
     
     if game_count > 0:
+        groups = list(Group.objects.filter(id__in=games.values("group_id")))
         games.update(
             win_type=WinType.NOT_PLAYED, 
             winner=None
         )
+        for group in groups:
+            group.update_standings()
         logger.info(f"Successfully marked {game_count} overdue games as unplayed")
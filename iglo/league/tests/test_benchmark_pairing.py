@@ -0,0 +1,34 @@
+import io
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from league.management.commands.benchmark_pairing import benchmark_mcmahon, benchmark_schedule
+from misc.benchmark import measure
+
+
+class BenchmarkPairingTestCase(SimpleTestCase):
+    def test_quality_does_not_depend_on_number_of_repeats(self):
+        for engine in ["mcmahon-greedy", "mcmahon-optimal"]:
+            with self.subTest(engine=engine):
+                results = [
+                    benchmark_mcmahon(engine=engine, players_count=12, rounds_count=4, repeat=repeat, seed=1)
+                    for repeat in [1, 3]
+                ]
+
+                self.assertEqual(results[0]["quality"], results[1]["quality"])
+                self.assertEqual(results[0]["rounds_paired"], results[1]["rounds_paired"])
+
+    def test_schedule_quality_does_not_depend_on_number_of_repeats(self):
+        results = [
+            benchmark_schedule(engine="round-robin", players_count=8, band_size=2, repeat=repeat, seed=1)
+            for repeat in [1, 3]
+        ]
+
+        self.assertEqual(results[0]["quality"], results[1]["quality"])
+
+    def test_repeat_has_to_be_positive(self):
+        with self.assertRaises(CommandError):
+            call_command("benchmark_pairing", "--repeat", "0", stdout=io.StringIO())
+        with self.assertRaises(ValueError):
+            measure(sum, [1, 2], repeat=0)
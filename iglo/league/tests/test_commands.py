@@ -0,0 +1,167 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.factories import UserFactory
+from accounts.models import User
+from league.models import Game, Member, MemberStanding, Player, Season
+from league.tests.factories import MemberFactory, PlayerFactory, SeasonFactory
+
+
+def get_season_data(start_date: int, end_date: int, players: list[str]) -> dict:
+    # Lower player on the list wins every game
+    return {
+        "startDate": start_date,
+        "endDate": end_date,
+        "tables": [
+            {
+                "name": "Grupa A",
+                "players": players,
+                "results": [
+                    ["" if index == other_index else int(index < other_index) for other_index in range(len(players))]
+                    for index in range(len(players))
+                ],
+            }
+        ],
+    }
+
+
+class LoadSeasonsTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.seasons_file = Path(directory.name) / "seasons.json"
+        # Seasons are listed from the latest one
+        self.seasons_file.write_text(
+            json.dumps(
+                [
+                    get_season_data(1640995200000, 1643673600000, ["p1", "p2", "p3", "p4", "p5", "p6"]),
+                    get_season_data(1632009600000, 1634947200000, ["p1", "Old", "p3", "p4", "p5", "p7"]),
+                ]
+            )
+        )
+
+    def _load(self, **options):
+        call_command("load_seasons", str(self.seasons_file), stdout=io.StringIO(), **options)
+
+    def assert_loaded(self):
+        self.assertEqual(list(Season.objects.order_by("number").values_list("number", flat=True)), [1, 2])
+        self.assertEqual(Member.objects.count(), 12)
+        self.assertEqual(Game.objects.count(), 30)
+        self.assertEqual(Player.objects.count(), 8)
+        self.assertEqual(
+            set(Player.objects.filter(auto_join=True).values_list("nick", flat=True)),
+            {"p1", "p2", "p3", "p4", "p5", "p6"},
+        )
+
+    def test_load_twice(self):
+        old_player = PlayerFactory(nick="old", auto_join=True)
+
+        self._load()
+        self._load()
+
+        self.assert_loaded()
+        old_player.refresh_from_db()
+        self.assertFalse(old_player.auto_join)
+        self.assertEqual(Member.objects.get(group__season__number=1, order=2).player, old_player)
+        self.assertEqual(Member.objects.get(group__season__number=1, order=1).score, 5)
+
+    def test_load_with_replace(self):
+        self._load()
+        season_ids = set(Season.objects.values_list("id", flat=True))
+        Player.objects.update(auto_join=False)
+        Game.objects.filter(group__season__number=2).delete()
+
+        with CaptureQueriesContext(connection) as context:
+            self._load(replace=True)
+
+        self.assert_loaded()
+        self.assertFalse(season_ids & set(Season.objects.values_list("id", flat=True)))
+        self.assertEqual(MemberStanding.objects.count(), 12)
+        # One delete per table, independent of the number of deleted rows
+        deletes = [query for query in context.captured_queries if query["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 7)
+
+
+class ImportPlayersTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.csv_file = Path(directory.name) / "players.csv"
+        self.csv_file.write_text(
+            "full_name,email,nick,rank,group\n"
+            "Alice Smith,ALICE@email.com,ALICE,1500,A\n"
+            "Bob Brown,bob@email.com,bob,1200,B\n"
+            "Bobby Brown,BOB@Email.com,BOB,1300,B\n"
+            "Carol,carol@email.com,carol,,C\n"
+        )
+        SeasonFactory(number=1)
+        self.alice = PlayerFactory(nick="alice", rank=1000, user=UserFactory(email="alice@email.com"))
+        self.alice_member = MemberFactory(player=self.alice, group__season=SeasonFactory(number=2), rank=1000)
+
+    def _import(self, **options):
+        call_command("import_players", self.csv_file, stdout=io.StringIO(), **options)
+
+    def test_dry_run(self):
+        self._import(dry_run=True, chunk_size=2)
+
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(Player.objects.count(), 1)
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.nick, "alice")
+        self.assertEqual(self.alice.rank, 1000)
+        self.alice_member.refresh_from_db()
+        self.assertEqual(self.alice_member.rank, 1000)
+
+    def test_dry_run_prints_changes_of_real_run(self):
+        # Rows of bob are in separate chunks
+        dry_run_stdout = io.StringIO()
+        call_command("import_players", self.csv_file, dry_run=True, chunk_size=2, stdout=dry_run_stdout)
+        stdout = io.StringIO()
+        call_command("import_players", self.csv_file, chunk_size=2, stdout=stdout)
+
+        self.assertEqual(
+            dry_run_stdout.getvalue().replace("Would create", "Created").replace("would update", "updated"),
+            stdout.getvalue(),
+        )
+        self.assertIn("Created 2 users, 2 players, updated 2 players, 0 players unchanged", stdout.getvalue())
+
+    def test_import(self):
+        self._import()
+
+        # Last row of a nick or email in the same chunk takes precedence
+        self.assertEqual(
+            set(User.objects.values_list("email", flat=True)),
+            {"alice@email.com", "BOB@Email.com", "carol@email.com"},
+        )
+        bob = Player.objects.get(nick__iexact="bob")
+        self.assertEqual(
+            (bob.nick, bob.first_name, bob.last_name, bob.rank, bob.user.email, bob.auto_join),
+            ("BOB", "Bobby", "Brown", 1300, "BOB@Email.com", False),
+        )
+        carol = Player.objects.get(nick="carol")
+        self.assertEqual((carol.first_name, carol.last_name, carol.rank), ("Carol", "", 100))
+
+        self.alice.refresh_from_db()
+        self.assertEqual(
+            (self.alice.nick, self.alice.first_name, self.alice.last_name, self.alice.rank, self.alice.user.email),
+            ("ALICE", "Alice", "Smith", 1500, "alice@email.com"),
+        )
+        self.assertTrue(self.alice.auto_join)
+        self.alice_member.refresh_from_db()
+        self.assertEqual(self.alice_member.rank, 1500)
+
+    def test_import_again(self):
+        self._import(chunk_size=2)
+        stdout = io.StringIO()
+
+        call_command("import_players", self.csv_file, stdout=stdout)
+
+        self.assertEqual(Player.objects.count(), 3)
+        self.assertIn("Created 0 users, 0 players, updated 0 players, 3 players unchanged", stdout.getvalue())
@@ -0,0 +1,77 @@
+import io
+import json
+import random
+import tempfile
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from league.models import Game, GroupType, Player, Season, SeasonState, WinType
+
+
+class GenerateDatasetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        media_root = override_settings(MEDIA_ROOT=self.directory.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+    def _generate(self, **options):
+        call_command(
+            "generate_dataset", seasons=3, groups=3, players_per_group=4, sgf_moves=10, stdout=io.StringIO(), **options
+        )
+
+    def test_global_random_is_restored(self):
+        state = random.getstate()
+
+        self._generate()
+
+        self.assertEqual(random.getstate(), state)
+
+    def test_seasons_are_played(self):
+        self._generate(mcmahon_groups=1, banded_groups=1)
+
+        self.assertEqual(
+            list(Season.objects.order_by("number").values_list("state", flat=True)),
+            [SeasonState.FINISHED, SeasonState.FINISHED, SeasonState.IN_PROGRESS],
+        )
+        last_season = Season.objects.get(number=3)
+        self.assertEqual(
+            sorted(last_season.groups.values_list("type", flat=True)),
+            sorted([GroupType.BANDED, GroupType.MCMAHON, GroupType.ROUND_ROBIN]),
+        )
+        self.assertFalse(Game.objects.filter(group__season__number=1, win_type__isnull=True).exists())
+        self.assertTrue(Game.objects.filter(group__season=last_season, win_type__isnull=True).exists())
+        played_game = Game.objects.filter(win_type=WinType.RESIGN).first()
+        self.assertIn("RE[", played_game.sgf.read().decode())
+        player = Player.objects.filter(memberships__group__season=last_season).first()
+        self.assertEqual(len(player.igor_history), 3)
+        self.assertEqual(player.igor, player.igor_history[-1])
+
+    def test_benchmark_views(self):
+        self._generate()
+        output = Path(self.directory.name) / "report.json"
+
+        call_command("benchmark_views", repeat=2, warmup=0, output=str(output))
+
+        report = json.loads(output.read_text())
+        self.assertEqual(report["dataset"]["seasons"], 3)
+        self.assertEqual(
+            {result["page"] for result in report["results"]},
+            {
+                "season-detail",
+                "player-detail",
+                "games-list",
+                "api-igor-matches-list",
+                "group-detail",
+                "group-games",
+                "api-groups-member-list",
+            },
+        )
+        for result in report["results"]:
+            self.assertEqual(result["status_codes"], [200])
+            self.assertLessEqual(result["latency"]["p50"], result["latency"]["p95"])
@@ -0,0 +1,167 @@
+from django.test import TestCase, override_settings
+
+from league import igor
+from league.management.commands.benchmark_igor import backtest
+from league.models import IgorFit, WinType
+from league.tests.factories import GameFactory, GroupFactory, MemberFactory, PlayerFactory, SeasonFactory
+
+IGOR_CONFIG = {
+    "season_rating_stability": 0.5,
+    "smoothing": 0.25,
+    "initial_lr": 1.0,
+    "do_log": False,
+    "max_steps": 200,
+    "winner_prior_rating": 2000.0,
+    "loser_prior_rating": 2000.0,
+    "winner_prior_match_count": 0.0,
+    "loser_prior_match_count": 0.0,
+}
+
+
+@override_settings(IGOR_CONFIG=IGOR_CONFIG, IGOR_REFIT_TRAILING_SEASONS=0)
+class RecalculateIgorTestCase(TestCase):
+    def setUp(self):
+        self.players = [PlayerFactory() for _ in range(3)]
+        self.groups = []
+        self.members = []
+        for _ in range(2):
+            self._add_season()
+
+    def _add_season(self):
+        group = GroupFactory(season=SeasonFactory(number=len(self.groups) + 1))
+        self.groups.append(group)
+        self.members.append([MemberFactory(group=group, player=player) for player in self.players])
+        self._play(len(self.groups) - 1, 0, 1, winner=0)
+        self._play(len(self.groups) - 1, 1, 2, winner=1)
+
+    def _play(self, season_idx, black, white, winner):
+        members = self.members[season_idx]
+        return GameFactory(
+            group=self.groups[season_idx],
+            black=members[black],
+            white=members[white],
+            winner=members[winner],
+            win_type=WinType.POINTS,
+        )
+
+    def test_first_recalculation_is_full(self):
+        fit, timings = igor.recalculate_igor()
+
+        self.assertEqual(fit.first_fitted_season, 0)
+        self.assertIsNone(fit.learning_rate)
+        self.assertEqual(len(fit.season_digests), 2)
+        for player in self.players:
+            player.refresh_from_db()
+            self.assertEqual(len(player.igor_history), 2)
+        self.assertGreater(self.players[0].igor, self.players[2].igor)
+        self.assertEqual(set(timings), {"load", "fit", "persist"})
+
+    def test_unchanged_matches_reuse_last_fit(self):
+        fit, _ = igor.recalculate_igor()
+
+        self.assertEqual(igor.recalculate_igor()[0], fit)
+        self.assertEqual(IgorFit.objects.count(), 1)
+
+    def test_refits_only_affected_seasons(self):
+        full_fit, _ = igor.recalculate_igor()
+        self._play(1, 2, 0, winner=2)
+
+        fit, _ = igor.recalculate_igor()
+
+        self.assertEqual(fit.first_fitted_season, 1)
+        self.assertIsNotNone(fit.steps)
+        for nick, history in full_fit.ratings.items():
+            self.assertEqual(fit.ratings[nick][0], history[0])
+        self.assertGreater(fit.ratings[self.players[2].nick][1], full_fit.ratings[self.players[2].nick][1])
+        self.players[2].refresh_from_db()
+        self.assertEqual(self.players[2].igor, round(fit.ratings[self.players[2].nick][1]))
+
+    @override_settings(IGOR_REFIT_TRAILING_SEASONS=3)
+    def test_refits_trailing_seasons_close_to_full_refit(self):
+        for _ in range(3):
+            self._add_season()
+        igor.recalculate_igor()
+        self._play(4, 2, 0, winner=2)
+
+        fit, _ = igor.recalculate_igor()
+        full_fit, _ = igor.recalculate_igor(full=True)
+
+        # Refitting only the last season would move ratings by over 100 points less than the full refit
+        self.assertEqual(fit.first_fitted_season, 1)
+        for nick, history in full_fit.ratings.items():
+            self.assertAlmostEqual(fit.ratings[nick][4], history[4], delta=30)
+
+    def test_full_refit_on_demand(self):
+        igor.recalculate_igor()
+        self._play(1, 2, 0, winner=2)
+        incremental_fit, _ = igor.recalculate_igor()
+
+        fit, _ = igor.recalculate_igor(full=True)
+
+        self.assertNotEqual(fit, incremental_fit)
+        self.assertEqual(fit.content_hash, incremental_fit.content_hash)
+        self.assertEqual(fit.first_fitted_season, 0)
+
+    def test_reverted_matches_reuse_stored_fit(self):
+        first_fit, _ = igor.recalculate_igor()
+        game = self._play(1, 2, 0, winner=2)
+        igor.recalculate_igor()
+        game.delete()
+
+        fit, _ = igor.recalculate_igor()
+
+        self.assertEqual(fit, first_fit)
+        self.assertEqual(IgorFit.objects.count(), 2)
+        self.assertEqual(IgorFit.objects.get_last(), first_fit)
+
+    @override_settings(IGOR_FIT_RETENTION=2)
+    def test_least_recently_used_fits_are_deleted(self):
+        first_fit, _ = igor.recalculate_igor()
+        self._play(1, 2, 0, winner=2)
+        second_fit, _ = igor.recalculate_igor()
+        self._play(1, 0, 2, winner=2)
+        third_fit, _ = igor.recalculate_igor()
+
+        self.assertEqual(set(IgorFit.objects.all()), {second_fit, third_fit})
+
+    def test_apply_fit_rolls_back_ratings(self):
+        first_fit, _ = igor.recalculate_igor()
+        self._play(1, 2, 0, winner=2)
+        igor.recalculate_igor()
+
+        igor.apply_fit(first_fit)
+
+        self.players[2].refresh_from_db()
+        self.assertEqual(self.players[2].igor, round(first_fit.ratings[self.players[2].nick][1]))
+        self.assertEqual(IgorFit.objects.get_last(), first_fit)
+
+    def test_config_change_triggers_full_refit(self):
+        igor.recalculate_igor()
+        self._play(1, 2, 0, winner=2)
+
+        with override_settings(IGOR_CONFIG={**IGOR_CONFIG, "smoothing": 0.5}):
+            fit, _ = igor.recalculate_igor()
+
+        self.assertEqual(fit.first_fitted_season, 0)
+
+    def test_participation_is_loaded_in_one_query(self):
+        fit, _ = igor.recalculate_igor()
+        MemberFactory(group=GroupFactory(season=SeasonFactory(number=3)), player=self.players[0])
+
+        # players, memberships, bulk update, groups of players to clear cached pages
+        with self.assertNumQueries(4):
+            igor._save_player_ratings(fit.ratings)
+
+        self.players[0].refresh_from_db()
+        self.assertEqual(len(self.players[0].igor_history), 2)
+        self.players[1].refresh_from_db()
+        self.assertEqual(self.players[1].igor, round(fit.ratings[self.players[1].nick][1]))
+
+    def test_backtest_predicts_next_season(self):
+        result = backtest({**IGOR_CONFIG, "max_steps": 50}, igor.load_matches(), min_train_seasons=1)
+
+        self.assertEqual(result["matches"], 2)
+        self.assertEqual([season["season"] for season in result["seasons"]], [2])
+        self.assertEqual(result["accuracy"], 1.0)
+        self.assertGreater(result["log_loss"], 0.0)
+        self.assertLessEqual(result["steps"], 50)
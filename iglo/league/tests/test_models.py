@@ -1,17 +1,23 @@
 import datetime
+from unittest import mock
 
 from django.conf import settings
+from django.db import connection
 from django.db.models import Q
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from league.models import (
     MemberResult,
+    Group,
     Season,
     SeasonState,
     Game,
     Round,
     Member,
+    MemberStanding,
     GroupType,
+    McMahonPairingEngine,
     GamesWithoutResultError,
     WinType,
 )
@@ -21,6 +27,7 @@ from league.tests.factories import (
     GameFactory,
     SeasonFactory,
     PlayerFactory,
+    RoundFactory,
 )
 
 
@@ -348,6 +355,40 @@ class SeasonTestCase(TestCase):
         season.refresh_from_db()
         self.assertEqual(season.state, SeasonState.FINISHED)
         
+    def test_finish_sets_final_order(self):
+        season = SeasonFactory(state=SeasonState.IN_PROGRESS)
+        group = GroupFactory(season=season, type=GroupType.ROUND_ROBIN)
+        member_1 = MemberFactory(group=group, order=1)
+        member_2 = MemberFactory(group=group, order=2)
+        member_3 = MemberFactory(group=group, order=3)
+        GameFactory(group=group, black=member_1, white=member_2, winner=member_2, win_type=WinType.RESIGN)
+        GameFactory(group=group, black=member_2, white=member_3, winner=member_2, win_type=WinType.POINTS)
+        unplayed_game = GameFactory(group=group, black=member_3, white=member_1, winner=None, win_type=None)
+
+        season.finish()
+
+        unplayed_game.refresh_from_db()
+        self.assertEqual(unplayed_game.win_type, WinType.NOT_PLAYED)
+        self.assertEqual(
+            list(group.members.order_by("final_order").values_list("id", "final_order", "standing__position")),
+            [(member_2.id, 1, 1), (member_1.id, 2, 2), (member_3.id, 3, 3)],
+        )
+
+    def test_finish_number_of_queries_does_not_depend_on_number_of_groups(self):
+        query_counts = []
+        for groups_number in (1, 3):
+            season = SeasonFactory(state=SeasonState.IN_PROGRESS)
+            for group_name in "ABC"[:groups_number]:
+                group = GroupFactory(season=season, name=group_name, type=GroupType.ROUND_ROBIN)
+                member_1 = MemberFactory(group=group, order=1)
+                member_2 = MemberFactory(group=group, order=2)
+                GameFactory(group=group, black=member_1, white=member_2, winner=member_1, win_type=WinType.RESIGN)
+            with CaptureQueriesContext(connection) as context:
+                season.finish()
+            query_counts.append(len(context.captured_queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
     def test_revert_to_draft(self):
         season = SeasonFactory(state=SeasonState.IN_PROGRESS, start_date=datetime.date(2021, 1, 1))
         group = GroupFactory(season=season, type=GroupType.ROUND_ROBIN)
@@ -375,6 +416,20 @@ class SeasonTestCase(TestCase):
         self.assertEqual(member_1.initial_score, 0.0)
         self.assertEqual(member_2.initial_score, 0.0)
         
+    def test_revert_to_draft_updates_standings_once_per_group(self):
+        season = SeasonFactory(state=SeasonState.IN_PROGRESS)
+        group = GroupFactory(season=season, type=GroupType.MCMAHON)
+        members = [MemberFactory(group=group, initial_score=1.0) for _ in range(4)]
+        GameFactory(group=group, black=members[0], white=members[1], winner=None, win_type=None)
+        GameFactory(group=group, black=members[2], white=members[3], winner=None, win_type=None)
+        group.update_standings()
+
+        with mock.patch.object(Group, "update_standings", autospec=True, side_effect=Group.update_standings) as update:
+            season.revert_to_draft()
+
+        update.assert_called_once()
+        self.assertEqual(set(MemberStanding.objects.values_list("score", flat=True)), {0.0})
+
     def test_revert_to_draft_with_played_games(self):
         season = SeasonFactory(state=SeasonState.IN_PROGRESS, start_date=datetime.date(2021, 1, 1))
         group = GroupFactory(season=season, type=GroupType.ROUND_ROBIN)
@@ -390,6 +445,21 @@ class SeasonTestCase(TestCase):
         with self.assertRaises(GamesWithoutResultError):
             season.revert_to_draft()
 
+    def test_start_number_of_queries_does_not_depend_on_number_of_players(self):
+        query_counts = []
+        for players_per_group in (4, 8):
+            season = SeasonFactory(state=SeasonState.DRAFT, players_per_group=players_per_group)
+            group = GroupFactory(season=season, type=GroupType.ROUND_ROBIN)
+            for order in range(1, players_per_group + 1):
+                MemberFactory(group=group, order=order)
+            with CaptureQueriesContext(connection) as context:
+                timings = season.start()
+            query_counts.append(len(context.captured_queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+        self.assertEqual(set(timings), {"planning", "commit", "standings"})
+        self.assertEqual(group.games.count(), 8 * 7 // 2)
+
     def test_start_with_mcmahon_group(self):
         season = SeasonFactory(state=SeasonState.DRAFT, start_date=datetime.date(2021, 1, 1))
         group = GroupFactory(season=season, type=GroupType.MCMAHON)
@@ -562,6 +632,192 @@ class GroupTestCase(TestCase):
         self.assertEqual(game_1.black, new_member)
         self.assertEqual(game_2.white, new_member)
 
+    def test_results_table(self):
+        group = GroupFactory(type=GroupType.MCMAHON, season__number=7, name="B")
+        member_1 = MemberFactory(group=group, order=1, player__nick="Alice")
+        member_2 = MemberFactory(group=group, order=2, player__nick="Bob")
+        member_3 = MemberFactory(group=group, order=3, player__nick="Cindy")
+        round_1 = RoundFactory(group=group, number=1)
+        round_2 = RoundFactory(group=group, number=2)
+        game_1 = GameFactory(group=group, round=round_1, black=member_1, white=member_2, winner=member_1,
+                             win_type=WinType.POINTS)
+        bye_game = GameFactory(group=group, round=round_1, black=None, white=None, winner=member_3,
+                               win_type=WinType.BYE, sgf=None)
+        game_2 = GameFactory(group=group, round=round_2, black=member_3, white=member_1, winner=None,
+                             win_type=WinType.NOT_PLAYED)
+        game_3 = GameFactory(group=group, round=round_2, black=member_2, white=None, winner=None,
+                             win_type=WinType.BYE, sgf=None)
+        group = Group.objects.get(id=group.id)
+
+        with self.assertNumQueries(3):
+            result = group.results_table
+
+        self.assertEqual(
+            result,
+            [
+                (1, member_1, [("3+", game_1.get_absolute_url()), ("2X", game_2.get_absolute_url())]),
+                (2, member_3, [("0=", bye_game.get_absolute_url()), ("1X", game_2.get_absolute_url())]),
+                (3, member_2, [("1-", game_1.get_absolute_url()), ("0=", game_3.get_absolute_url())]),
+            ],
+        )
+        self.assertEqual([member.total_walkovers for _, member, _ in result], [1, 1, 0])
+
+    def test_members_qualification_for_mcmahon_group(self):
+        group = GroupFactory(type=GroupType.MCMAHON)
+        member_1 = MemberFactory(group=group, order=1, initial_score=0)
+        member_2 = MemberFactory(group=group, order=2, initial_score=0)
+        member_3 = MemberFactory(group=group, order=3, initial_score=-1)
+        member_4 = MemberFactory(group=group, order=4, initial_score=-1)
+        GameFactory(group=group, black=member_1, white=member_3, winner=member_3, win_type=WinType.RESIGN)
+        GameFactory(group=group, black=member_2, white=member_4, winner=member_2, win_type=WinType.POINTS)
+        GameFactory(group=group, black=member_3, white=member_2, winner=member_2, win_type=WinType.TIME)
+        GameFactory(group=group, black=member_4, white=member_1, winner=None, win_type=None)
+
+        with self.assertNumQueries(2):
+            result = group.members_qualification
+
+        self.assertEqual(result, [member_2, member_3, member_1, member_4])
+        for member in result:
+            expected = Member.objects.get(id=member.id)
+            self.assertEqual(
+                (member.points, member.score, member.sodos, member.sos, member.sosos),
+                (expected.points, expected.score, expected.sodos, expected.sos, expected.sosos),
+            )
+
+    def test_start_macmahon_round_with_optimal_pairing_engine(self):
+        season = SeasonFactory(state=SeasonState.IN_PROGRESS, start_date=datetime.date(2021, 1, 1))
+        group = GroupFactory(season=season, type=GroupType.MCMAHON, pairing_engine=McMahonPairingEngine.OPTIMAL)
+        for order in range(1, 6):
+            MemberFactory(group=group, order=order)
+
+        group.start_macmahon_round()
+
+        round_1 = group.rounds.get()
+        self.assertEqual(round_1.games.exclude(win_type=WinType.BYE).count(), 2)
+        self.assertEqual(round_1.games.filter(win_type=WinType.BYE).count(), 1)
+
+    def test_update_standings(self):
+        group = GroupFactory(type=GroupType.ROUND_ROBIN)
+        member_1 = MemberFactory(group=group, order=1)
+        member_2 = MemberFactory(group=group, order=2)
+        member_3 = MemberFactory(group=group, order=3)
+        GameFactory(group=group, black=member_1, white=member_2, winner=member_2, win_type=WinType.RESIGN)
+        GameFactory(group=group, black=member_2, white=member_3, winner=member_3, win_type=WinType.NOT_PLAYED)
+        GameFactory(group=group, black=member_3, white=member_1, winner=None, win_type=None)
+
+        group.update_standings()
+
+        self.assertEqual(
+            list(MemberStanding.objects.order_by("position").values_list("member", "points", "walkovers", "position")),
+            [(member_3.id, 1, 0, 1), (member_2.id, 1, 1, 2), (member_1.id, 0, 0, 3)],
+        )
+
+    def test_update_standings_after_game_result(self):
+        group = GroupFactory(type=GroupType.ROUND_ROBIN)
+        member_1 = MemberFactory(group=group, order=1)
+        member_2 = MemberFactory(group=group, order=2)
+        game = GameFactory(group=group, black=member_1, white=member_2, winner=None, win_type=None)
+        group.update_standings()
+
+        game.winner = member_2
+        game.win_type = WinType.RESIGN
+        game.save()
+
+        self.assertEqual(member_2.standing.position, 1)
+        self.assertEqual(member_2.standing.points, 1)
+
+    def test_update_standings_after_game_deleted(self):
+        group = GroupFactory(type=GroupType.ROUND_ROBIN)
+        member_1 = MemberFactory(group=group, order=1)
+        member_2 = MemberFactory(group=group, order=2)
+        game = GameFactory(group=group, black=member_1, white=member_2, winner=member_2, win_type=WinType.RESIGN)
+        group.update_standings()
+
+        game.delete()
+
+        self.assertEqual(MemberStanding.objects.get(member=member_2).points, 0)
+
+    def test_update_standings_after_member_deleted(self):
+        group = GroupFactory(type=GroupType.ROUND_ROBIN)
+        member_1 = MemberFactory(group=group, order=1)
+        member_2 = MemberFactory(group=group, order=2)
+        member_3 = MemberFactory(group=group, order=3)
+        GameFactory(group=group, black=member_1, white=member_3, winner=member_3, win_type=WinType.RESIGN)
+        GameFactory(group=group, black=member_2, white=member_3, winner=member_3, win_type=WinType.RESIGN)
+        GameFactory(group=group, black=member_1, white=member_2, winner=member_1, win_type=WinType.RESIGN)
+        group.update_standings()
+
+        member_3.delete()
+
+        self.assertEqual(
+            list(MemberStanding.objects.order_by("position").values_list("member", "points", "position")),
+            [(member_1.id, 1, 1), (member_2.id, 0, 2)],
+        )
+
+    def test_update_standings_after_initial_score_changed(self):
+        group = GroupFactory(type=GroupType.MCMAHON)
+        member_1 = MemberFactory(group=group, order=1)
+        member_2 = MemberFactory(group=group, order=2)
+        group.update_standings()
+
+        member_2.initial_score = 10
+        member_2.save()
+
+        self.assertEqual(
+            list(MemberStanding.objects.order_by("position").values_list("member", "score", "position")),
+            [(member_2.id, 10.0, 1), (member_1.id, 0.0, 2)],
+        )
+        self.assertEqual(Group.objects.get(id=group.id).members_qualification, [member_2, member_1])
+
+    def test_update_standings_after_member_moved_to_other_group(self):
+        group = GroupFactory(type=GroupType.ROUND_ROBIN)
+        other_group = GroupFactory(type=GroupType.ROUND_ROBIN, season=group.season)
+        member_1 = MemberFactory(group=group, order=1)
+        member_2 = MemberFactory(group=group, order=2)
+        member_3 = MemberFactory(group=other_group, order=1)
+        GameFactory(group=group, black=member_1, white=member_2, winner=member_2, win_type=WinType.RESIGN)
+        group.update_standings()
+        other_group.update_standings()
+
+        member_2.group = other_group
+        member_2.order = 2
+        member_2.save()
+
+        self.assertEqual(
+            list(MemberStanding.objects.order_by("member_id").values_list("member", "position")),
+            [(member_1.id, 1), (member_2.id, 2), (member_3.id, 1)],
+        )
+
+    def test_standings_not_updated_when_result_did_not_change(self):
+        group = GroupFactory(type=GroupType.ROUND_ROBIN)
+        member_1 = MemberFactory(group=group, order=1)
+        member_2 = MemberFactory(group=group, order=2)
+        game = GameFactory(group=group, black=member_1, white=member_2, winner=member_2, win_type=WinType.RESIGN)
+
+        with mock.patch.object(Group, "update_standings") as update_standings_mock:
+            game.date = datetime.datetime.now()
+            game.save()
+            game.review_video_link = "https://youtube.com/watch"
+            game.save(update_fields=["review_video_link"])
+            game.winner = member_1
+            game.save(update_fields=["winner"])
+
+        update_standings_mock.assert_called_once()
+
+    def test_members_qualification_reads_materialized_standings(self):
+        group = GroupFactory(type=GroupType.ROUND_ROBIN)
+        member_1 = MemberFactory(group=group, order=1)
+        member_2 = MemberFactory(group=group, order=2)
+        GameFactory(group=group, black=member_1, white=member_2, winner=member_2, win_type=WinType.NOT_PLAYED)
+        group.update_standings()
+        group = Group.objects.get(id=group.id)
+
+        with self.assertNumQueries(1):
+            result = group.members_qualification
+
+        self.assertEqual(result, [member_2, member_1])
+        self.assertEqual(result[1].total_walkovers, 1)
+
 
 class GameTestCase(TestCase):
     def test_is_delayed_when_not_delayed(self):
@@ -0,0 +1,195 @@
+import datetime
+import string
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import league.urls
+import misc.urls
+import review.urls
+from accounts.models import User, UserRole
+from league.api import router
+from league.models import Group, GroupType, Season, SeasonState, WinType
+from league.tests.factories import GameFactory, GroupFactory, MemberFactory, PlayerFactory, RoundFactory, SeasonFactory
+from review.models import Teacher
+
+# Pages rendered by the suite: URL name, function returning URL kwargs for the league and the query budget.
+# Query count of every page must be within the budget and must not grow with the size of the league. Budgets
+# include two queries of the logged-in user session.
+PAGES = [
+    ("home", lambda league: {}, 11),
+    ("rules", lambda league: {}, 3),
+    ("contact", lambda league: {}, 3),
+    ("seasons-list", lambda league: {}, 6),
+    ("seasons-prepare", lambda league: {}, 3),
+    ("season-detail", lambda league: {"number": league.season.number}, 11),
+    ("season-delete", lambda league: {"number": league.draft_season.number}, 4),
+    ("season-export", lambda league: {"number": league.season.number}, 3),
+    ("group-detail", lambda league: league.group_kwargs, 20),
+    ("group-games", lambda league: league.group_kwargs, 18),
+    ("group-all-games", lambda league: league.group_kwargs, 20),
+    ("group-egd-export", lambda league: league.group_kwargs, 17),
+    ("game-detail", lambda league: league.game_kwargs, 6),
+    ("game-update", lambda league: league.game_kwargs, 10),
+    ("players-list", lambda league: {}, 5),
+    ("player-detail", lambda league: {"slug": league.player.nick}, 10),
+    ("player-settings", lambda league: {"slug": league.player.nick}, 4),
+    ("league-admin-view", lambda league: {}, 3),
+    ("games-list", lambda league: {}, 5),
+    ("upcoming-games-list", lambda league: {}, 5),
+    ("teacher-list", lambda league: {}, 4),
+    ("teacher-detail", lambda league: {"slug": league.teacher.slug}, 6),
+    ("reviews-list", lambda league: {}, 5),
+    ("api-season-list", lambda league: {}, 4),
+    ("api-season-detail", lambda league: {"number": league.season.number}, 3),
+    ("api-seasons-group-list", lambda league: {"parent_lookup_season__number": league.season.number}, 4),
+    ("api-seasons-group-detail", lambda league: league.api_group_kwargs | {"name": league.group.name}, 3),
+    ("api-groups-member-list", lambda league: league.api_member_kwargs, 4),
+    ("api-groups-member-detail", lambda league: league.api_member_kwargs | {"pk": league.game.black_id}, 3),
+    ("api-groups-round-list", lambda league: league.api_member_kwargs, 4),
+    ("api-groups-round-detail", lambda league: league.api_member_kwargs | {"number": 1}, 3),
+    ("api-rounds-game-list", lambda league: league.api_game_kwargs, 4),
+    ("api-rounds-game-detail", lambda league: league.api_game_kwargs | {"pk": league.game.id}, 3),
+    ("api-igor-matches-list", lambda league: {}, 3),
+    ("api-igor-matches-detail", lambda league: {"pk": league.game.id}, 3),
+]
+# Pages which only redirect or are rendered by a view already in the budget
+PAGES_WITHOUT_BUDGET = {
+    "deprecated-group-detail",
+    "deprecated-game-detail",
+    "deprecated-bye-game-detail",
+    "bye-game-detail",
+    "api-root",
+}
+
+
+class League:
+    """
+    League with the given number of seasons, the last one in progress, followed by a draft season. All players
+    play in every season.
+    """
+
+    def __init__(self, seasons: int, groups: int, players_per_group: int):
+        self.teacher, _ = Teacher.objects.get_or_create(
+            slug="jan-nowak", defaults={"first_name": "Jan", "last_name": "Nowak", "rank": "5d"}
+        )
+        first_number = (Season.objects.order_by("-number").values_list("number", flat=True).first() or 0) + 1
+        # Game URLs join nicks with a dash, so nicks must not contain one
+        players = [PlayerFactory(nick=f"Player{first_number}x{index}") for index in range(groups * players_per_group)]
+        for number in range(first_number, first_number + seasons):
+            is_last = number == first_number + seasons - 1
+            start_date = datetime.date.today() - datetime.timedelta(days=7 * (first_number + seasons - number))
+            self.season = SeasonFactory(
+                number=number,
+                state=SeasonState.IN_PROGRESS if is_last else SeasonState.FINISHED,
+                start_date=start_date,
+                end_date=start_date + datetime.timedelta(days=7 * players_per_group),
+                players_per_group=players_per_group,
+            )
+            for group_index in range(groups):
+                group = GroupFactory(
+                    season=self.season,
+                    name=string.ascii_uppercase[group_index],
+                    type=GroupType.ROUND_ROBIN,
+                    teacher=self.teacher,
+                )
+                group_players = players[group_index * players_per_group : (group_index + 1) * players_per_group]
+                members = [
+                    MemberFactory(group=group, player=player, order=order)
+                    for order, player in enumerate(group_players, start=1)
+                ]
+                self._create_games(group, members, is_last)
+                group.update_standings()
+        # Next season is prepared, only draft seasons can be deleted
+        self.draft_season = SeasonFactory(number=first_number + seasons, state=SeasonState.DRAFT)
+        self.group = self.season.groups.get(name="A")
+        self.game = self.group.games.select_related("black__player", "white__player").order_by("id").first()
+        self.player = self.game.black.player
+
+    def _create_games(self, group: Group, members: list, in_progress: bool) -> None:
+        # Round robin by the circle method, in the season in progress half of the rounds are not played yet
+        rotation = list(members)
+        for round_number in range(1, len(members)):
+            round = RoundFactory(group=group, number=round_number)
+            played = not in_progress or round_number <= len(members) // 2
+            for index in range(len(members) // 2):
+                black, white = rotation[index], rotation[-index - 1]
+                game_date = datetime.datetime.now() + datetime.timedelta(days=round_number - len(members) // 2)
+                GameFactory(
+                    group=group,
+                    round=round,
+                    black=black,
+                    white=white,
+                    winner=black if played else None,
+                    win_type=WinType.POINTS if played else WinType.NOT_PLAYED,
+                    points_difference=0.5 if played else None,
+                    server="OGS",
+                    date=game_date,
+                    link=f"https://online-go.com/game/{group.id * 1000 + round_number * 10 + index}",
+                    sgf_updated=game_date if played else None,
+                    review_video_link="https://youtube.com/watch" if played and index == 0 else None,
+                    review_updated=game_date if played and index == 0 else None,
+                )
+            rotation.insert(1, rotation.pop())
+
+    @property
+    def group_kwargs(self) -> dict:
+        return {"season_number": self.season.number, "group_name": self.group.name}
+
+    @property
+    def game_kwargs(self) -> dict:
+        return self.group_kwargs | {
+            "black_player": self.game.black.player.nick,
+            "white_player": self.game.white.player.nick,
+        }
+
+    @property
+    def api_group_kwargs(self) -> dict:
+        return {"parent_lookup_season__number": self.season.number}
+
+    @property
+    def api_member_kwargs(self) -> dict:
+        return {"parent_lookup_group__season__number": self.season.number, "parent_lookup_group__name": self.group.name}
+
+    @property
+    def api_game_kwargs(self) -> dict:
+        return self.api_member_kwargs | {"parent_lookup_round__number": 1}
+
+
+class QueryBudgetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser(email="admin@example.com", password="password")
+        self.user.roles = [UserRole.REFEREE, UserRole.TEACHER]
+        self.user.save()
+        self.client.force_login(self.user)
+
+    def _count_queries(self, league: League) -> dict[str, int]:
+        counts = {}
+        for name, get_kwargs, _ in PAGES:
+            url = reverse(name, kwargs=get_kwargs(league))
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            counts[name] = len(context.captured_queries)
+        return counts
+
+    def test_every_page_has_budget(self):
+        url_names = {
+            pattern.name
+            for pattern in [*league.urls.urlpatterns, *review.urls.urlpatterns, *misc.urls.urlpatterns, *router.urls]
+        }
+
+        self.assertEqual(url_names - PAGES_WITHOUT_BUDGET, {name for name, _, _ in PAGES})
+
+    def test_number_of_queries_does_not_depend_on_league_size(self):
+        small_counts = self._count_queries(League(seasons=2, groups=2, players_per_group=4))
+        large_counts = self._count_queries(League(seasons=3, groups=3, players_per_group=8))
+
+        for name, _, budget in PAGES:
+            with self.subTest(page=name):
+                self.assertLessEqual(small_counts[name], budget)
+                self.assertEqual(small_counts[name], large_counts[name])
@@ -1,13 +1,32 @@
 import datetime
 from unittest import mock
 
+from celery.exceptions import Retry
 from django.core import mail
+from django.core.cache import cache
 from django.test import TestCase, override_settings
 
-from league.models import GameAIAnalyseUploadStatus, SeasonState
-from league.tasks import game_ai_analyse_upload_task, send_delayed_games_reminder, send_upcoming_games_reminder
-from league.tests.factories import GameFactory, SeasonFactory
+from league import tasks
+from league.models import Game, GameAIAnalyseUpload, GameAIAnalyseUploadStatus, Player, SeasonState
+from league.tasks import (
+    IGOR_LOCK_KEY,
+    IGOR_PENDING_KEY,
+    game_ai_analyse_upload_task,
+    recalculate_igor,
+    schedule_igor_recalculation,
+    schedule_sgf_fetch,
+    send_delayed_games_reminder,
+    send_upcoming_games_reminder,
+    fetch_pending_sgfs,
+    update_gor,
+    update_ogs_data,
+    upload_ai_analyses,
+)
+from league.tests.factories import GameFactory, PlayerFactory, SeasonFactory
 from league.utils.aisensei import AISenseiException
+from league.utils.egd import EGDException
+from league.utils.http import create_session
+from league.utils.ogs import OGSException
 
 
 @override_settings(ENABLE_AI_ANALYSE_UPLOAD=True)
@@ -27,6 +46,31 @@ class GameAIAnalyseUploadTaskTestCase(TestCase):
         self.assertEqual(upload.status, GameAIAnalyseUploadStatus.DONE)
         self.assertEqual(upload.result, "https://ai.com/123")
 
+    def test_task_retries_temporary_failure(self):
+        game = GameFactory(sgf__data="data", group__name="A")
+
+        with mock.patch("league.tasks.upload_sgf") as upload_sgf_mock:
+            upload_sgf_mock.side_effect = AISenseiException("upload error", retryable=True)
+            game_ai_analyse_upload_task(game_id=game.id)
+
+        upload = game.ai_analyse_uploads.get()
+        self.assertEqual(upload.status, GameAIAnalyseUploadStatus.QUEUED)
+        self.assertEqual(upload.attempts, 1)
+        self.assertIsNotNone(upload.next_attempt)
+
+        GameAIAnalyseUpload.objects.filter(id=upload.id).update(next_attempt=datetime.datetime.now())
+        with mock.patch("league.tasks.upload_sgf") as upload_sgf_mock:
+            upload_sgf_mock.return_value = "https://ai.com/123"
+            result = upload_ai_analyses()
+
+        self.assertEqual(result, {"uploaded": 1, "retried": 0, "failed": 0, "skipped": 0})
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, GameAIAnalyseUploadStatus.DONE)
+        self.assertEqual(upload.attempts, 2)
+        self.assertIsNotNone(upload.duration)
+        game.refresh_from_db()
+        self.assertEqual(game.ai_analyse_link, "https://ai.com/123")
+
     def test_task_failed(self):
         game = GameFactory(sgf__data="data", group__name="A")
 
@@ -43,6 +87,78 @@ class GameAIAnalyseUploadTaskTestCase(TestCase):
         self.assertEqual(upload.error, "error message")
 
 
+class UploadAIAnalysesTask(TestCase):
+    def _create_upload(self, status=GameAIAnalyseUploadStatus.QUEUED, **kwargs):
+        game = GameFactory(sgf__data="data", **{"group__name": "A", **kwargs})
+        return GameAIAnalyseUpload.objects.create(game=game, sgf_hash="hash", status=status, error="")
+
+    def test_upload_claimed_by_another_task_is_skipped(self):
+        now = datetime.datetime.now()
+        claimed_upload = self._create_upload(status=GameAIAnalyseUploadStatus.IN_PROGRESS)
+        GameAIAnalyseUpload.objects.filter(id=claimed_upload.id).update(claimed=now)
+        abandoned_upload = self._create_upload(status=GameAIAnalyseUploadStatus.IN_PROGRESS)
+        GameAIAnalyseUpload.objects.filter(id=abandoned_upload.id).update(claimed=now - datetime.timedelta(hours=1))
+
+        with mock.patch("league.tasks.upload_sgf", return_value="https://ai.com/123") as upload_sgf_mock:
+            result = upload_ai_analyses()
+
+        self.assertEqual(result["uploaded"], 1)
+        upload_sgf_mock.assert_called_once()
+        claimed_upload.refresh_from_db()
+        self.assertEqual(claimed_upload.status, GameAIAnalyseUploadStatus.IN_PROGRESS)
+        abandoned_upload.refresh_from_db()
+        self.assertEqual(abandoned_upload.status, GameAIAnalyseUploadStatus.DONE)
+
+    def test_existing_ai_analyse_link_is_not_overwritten(self):
+        linked_upload = self._create_upload(ai_analyse_link="https://ai.com/referee")
+        upload = self._create_upload()
+
+        claim = tasks.claim_ai_analyse_uploads
+
+        def claim_ai_analyse_uploads():
+            uploads = claim()
+            # Referee enters the link during the upload
+            Game.objects.filter(id=upload.game_id).update(ai_analyse_link="https://ai.com/during-upload")
+            return uploads
+
+        with mock.patch("league.tasks.upload_sgf", return_value="https://ai.com/123") as upload_sgf_mock, mock.patch(
+            "league.tasks.claim_ai_analyse_uploads", side_effect=claim_ai_analyse_uploads
+        ):
+            result = upload_ai_analyses()
+
+        self.assertEqual(result, {"uploaded": 1, "retried": 0, "failed": 0, "skipped": 1})
+        upload_sgf_mock.assert_called_once()
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, GameAIAnalyseUploadStatus.DONE)
+        self.assertEqual(Game.objects.get(id=linked_upload.game_id).ai_analyse_link, "https://ai.com/referee")
+        self.assertEqual(Game.objects.get(id=upload.game_id).ai_analyse_link, "https://ai.com/during-upload")
+        linked_upload.refresh_from_db()
+        self.assertEqual(linked_upload.status, GameAIAnalyseUploadStatus.FAILED)
+
+    def test_unexpected_error_does_not_lose_other_uploads(self):
+        missing_file_upload = self._create_upload()
+        missing_file_upload.game.sgf.storage.delete(missing_file_upload.game.sgf.name)
+        invalid_response_upload = self._create_upload(group__name="B")
+        upload = self._create_upload(group__name="C")
+
+        def upload_sgf(config, sgf_data, tags):
+            if tags == ["IGLO - Grupa B"]:
+                raise KeyError("url")
+            return "https://ai.com/123"
+
+        with mock.patch("league.tasks.upload_sgf", side_effect=upload_sgf):
+            result = upload_ai_analyses()
+
+        self.assertEqual(result, {"uploaded": 1, "retried": 0, "failed": 2, "skipped": 0})
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, GameAIAnalyseUploadStatus.DONE)
+        self.assertEqual(Game.objects.get(id=upload.game_id).ai_analyse_link, "https://ai.com/123")
+        for failed_upload in [missing_file_upload, invalid_response_upload]:
+            failed_upload.refresh_from_db()
+            self.assertEqual(failed_upload.status, GameAIAnalyseUploadStatus.FAILED)
+            self.assertNotEqual(failed_upload.error, "")
+
+
 @override_settings(ENABLE_DELAYED_GAMES_REMINDER=True)
 class SendDelayedGamesRemindersTask(TestCase):
 
@@ -125,3 +241,213 @@ class MarkOverdueGamesAsUnplayedTask(TestCase):
         # Played game should maintain its original result
         self.assertEqual(played_game.win_type, "points")
         self.assertEqual(played_game.winner, overdue_game.black)
+
+
+@override_settings(IGOR_RECALCULATION_DELAY=60, SHARED_CACHE=True)
+class RecalculateIgorTask(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_triggers_are_merged(self):
+        with mock.patch("league.tasks.recalculate_igor.apply_async") as apply_async_mock:
+            self.assertTrue(schedule_igor_recalculation())
+            self.assertFalse(schedule_igor_recalculation())
+            self.assertFalse(schedule_igor_recalculation())
+
+        apply_async_mock.assert_called_once_with(countdown=60)
+
+    def test_task_reports_merged_triggers(self):
+        with mock.patch("league.tasks.recalculate_igor.apply_async"):
+            schedule_igor_recalculation()
+            schedule_igor_recalculation()
+
+        with mock.patch("league.tasks.igor.recalculate_igor") as recalculate_igor_mock, mock.patch(
+            "league.tasks.igor.get_current_content_hash", return_value="hash"
+        ):
+            recalculate_igor_mock.return_value = (
+                mock.Mock(content_hash="hash"),
+                {"load": 1.0, "fit": 2.0, "persist": 3.0},
+            )
+            metrics = recalculate_igor.apply().get()
+
+        recalculate_igor_mock.assert_called_once_with(full=False)
+        self.assertEqual(metrics["merged_triggers"], 2)
+        self.assertFalse(metrics["rescheduled"])
+        self.assertEqual(metrics["fit"], 2.0)
+        self.assertGreaterEqual(metrics["latency"], 0)
+        self.assertIsNone(cache.get(IGOR_PENDING_KEY))
+        self.assertIsNone(cache.get(IGOR_LOCK_KEY))
+        with mock.patch("league.tasks.recalculate_igor.apply_async") as apply_async_mock:
+            self.assertTrue(schedule_igor_recalculation())
+        apply_async_mock.assert_called_once()
+
+    def test_task_reschedules_when_results_changed_during_run(self):
+        with mock.patch("league.tasks.recalculate_igor.apply_async"):
+            schedule_igor_recalculation()
+
+        def recalculate(full):
+            # Result saved during the run is merged into it
+            self.assertFalse(schedule_igor_recalculation())
+            return mock.Mock(content_hash="old-hash"), {}
+
+        with mock.patch("league.tasks.igor.recalculate_igor", side_effect=recalculate), mock.patch(
+            "league.tasks.igor.get_current_content_hash", return_value="new-hash"
+        ), mock.patch("league.tasks.recalculate_igor.apply_async") as apply_async_mock:
+            metrics = recalculate_igor.apply().get()
+
+        self.assertTrue(metrics["rescheduled"])
+        apply_async_mock.assert_called_once_with(countdown=60)
+        self.assertIsNotNone(cache.get(IGOR_PENDING_KEY))
+
+    @override_settings(SHARED_CACHE=False)
+    def test_triggers_are_not_merged_without_shared_cache(self):
+        with mock.patch("league.tasks.recalculate_igor.apply_async") as apply_async_mock:
+            self.assertTrue(schedule_igor_recalculation())
+            self.assertTrue(schedule_igor_recalculation())
+
+        self.assertEqual(apply_async_mock.call_count, 2)
+        self.assertIsNone(cache.get(IGOR_PENDING_KEY))
+
+    def test_task_postponed_when_already_running(self):
+        cache.set(IGOR_LOCK_KEY, True)
+
+        with mock.patch("league.tasks.igor.recalculate_igor") as recalculate_igor_mock, mock.patch(
+            "league.tasks.recalculate_igor.retry", side_effect=Retry
+        ) as retry_mock:
+            with self.assertRaises(Retry):
+                recalculate_igor()
+
+        recalculate_igor_mock.assert_not_called()
+        retry_mock.assert_called_once_with(countdown=60)
+
+
+class UpdateGorTask(TestCase):
+    def test_task(self):
+        updated_player = PlayerFactory(egd_pin="11111111", rank=1000)
+        failed_player = PlayerFactory(egd_pin="22222222", rank=1000)
+        fresh_player = PlayerFactory(egd_pin="33333333", rank=1000, egd_updated=datetime.datetime.now())
+        PlayerFactory(egd_pin=None)
+
+        def get_gor_by_pin(pin, session):
+            if pin == "22222222":
+                raise EGDException("EGD is responding with 500")
+            return 2100
+
+        with mock.patch("league.tasks.get_gor_by_pin", side_effect=get_gor_by_pin) as get_gor_by_pin_mock:
+            # count of skipped players, players, bulk update, groups of players to clear cached pages
+            with self.assertNumQueries(4):
+                update_gor(triggering_user_email="referee@example.com")
+
+        self.assertEqual(
+            sorted(call.args[0] for call in get_gor_by_pin_mock.call_args_list), ["11111111", "22222222"]
+        )
+        updated_player.refresh_from_db()
+        self.assertEqual(updated_player.rank, 2100)
+        self.assertIsNotNone(updated_player.egd_updated)
+        self.assertEqual(Player.objects.get(id=failed_player.id).rank, 1000)
+        self.assertEqual(Player.objects.get(id=fresh_player.id).rank, 1000)
+        self.assertIn("1 out of 2 players successfully updated", mail.outbox[0].body)
+        self.assertIn("1 players synced in the last 12 hours were skipped", mail.outbox[0].body)
+
+    def test_forced_update_includes_fresh_players_and_bypasses_http_cache(self):
+        fresh_player = PlayerFactory(egd_pin="33333333", rank=1000, egd_updated=datetime.datetime.now())
+
+        with mock.patch("league.tasks.get_gor_by_pin", return_value=2100), mock.patch(
+            "league.tasks.create_session", wraps=create_session
+        ) as create_session_mock:
+            update_gor(triggering_user_email="referee@example.com", force=True)
+
+        self.assertEqual(Player.objects.get(id=fresh_player.id).rank, 2100)
+        self.assertIsNone(create_session_mock.call_args.kwargs["cache"])
+        self.assertIn("1 out of 1 players successfully updated", mail.outbox[0].body)
+        self.assertNotIn("skipped", mail.outbox[0].body)
+
+
+class UpdateOgsDataTask(TestCase):
+    def test_task(self):
+        changed_player = PlayerFactory(ogs_username="changed", ogs_id=1, ogs_rating=1000.0, ogs_deviation=50.0)
+        unchanged_player = PlayerFactory(ogs_username="unchanged", ogs_id=2, ogs_rating=1200.0, ogs_deviation=50.0)
+        failed_player = PlayerFactory(ogs_username="failed", ogs_id=None)
+        PlayerFactory(ogs_username=None)
+
+        def get_player_data(username, player_id, session):
+            if username == "failed":
+                raise OGSException("Player 'failed' not found")
+            rating = 1100.0 if username == "changed" else 1200.0
+            return {"id": player_id, "rating": rating, "deviation": 50.0}
+
+        with mock.patch("league.tasks.get_player_data", side_effect=get_player_data) as get_player_data_mock:
+            # players, players without OGS usernames, bulk update, groups of players to clear cached pages
+            with self.assertNumQueries(4):
+                update_ogs_data()
+
+        get_player_data_mock.assert_any_call("changed", player_id=1, session=mock.ANY)
+        self.assertEqual(Player.objects.get(id=changed_player.id).ogs_rating, 1100.0)
+        self.assertEqual(Player.objects.get(id=unchanged_player.id).ogs_rating, 1200.0)
+        self.assertIsNone(Player.objects.get(id=failed_player.id).ogs_rating)
+
+
+class FetchPendingSgfsTask(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_task(self):
+        now = datetime.datetime.now()
+        pending_game = GameFactory(sgf=None, link="https://online-go.com/game/1", ai_analyse_link="https://ai.com/1")
+        failed_game = GameFactory(sgf=None, link="https://online-go.com/game/2")
+        fetched_game = GameFactory(sgf__data="data", link="https://online-go.com/game/3")
+        kgs_game = GameFactory(sgf=None, link="https://www.gokgs.com/game/4")
+        in_progress_game = GameFactory(
+            sgf=None, link="https://online-go.com/game/5", sgf_fetch_next_attempt=now + datetime.timedelta(minutes=1)
+        )
+        exhausted_game = GameFactory(sgf=None, link="https://online-go.com/game/6", sgf_fetch_attempts=5)
+
+        def fetch_sgf(sgf_url, session):
+            if sgf_url.endswith("/2/sgf"):
+                raise OGSException("can not fetch SGF file")
+            return "(;GM[1])"
+
+        with mock.patch("league.tasks.fetch_sgf", side_effect=fetch_sgf) as fetch_sgf_mock:
+            # claim of games in a savepoint, bulk update of fetched and failed games
+            with self.assertNumQueries(5):
+                result = fetch_pending_sgfs()
+
+        self.assertEqual(result, {"fetched": 1, "failed": 1})
+        self.assertEqual(fetch_sgf_mock.call_count, 2)
+        pending_game.refresh_from_db()
+        with pending_game.sgf.open("r") as file:
+            self.assertEqual(file.read(), "(;GM[1])")
+        self.assertIsNotNone(pending_game.sgf_updated)
+        self.assertIsNone(pending_game.sgf_fetch_next_attempt)
+        failed_game.refresh_from_db()
+        self.assertEqual(failed_game.sgf_fetch_attempts, 1)
+        self.assertGreater(failed_game.sgf_fetch_next_attempt, now + datetime.timedelta(minutes=30))
+        for game in [failed_game, kgs_game, in_progress_game, exhausted_game]:
+            game.refresh_from_db()
+            self.assertFalse(game.sgf)
+        fetched_updated = fetched_game.updated
+        fetched_game.refresh_from_db()
+        with fetched_game.sgf.open("r") as file:
+            self.assertEqual(file.read(), "data")
+        self.assertEqual(fetched_game.updated, fetched_updated)
+        self.assertEqual(fetched_game.sgf_fetch_attempts, 0)
+
+    @override_settings(SGF_FETCH_BATCH_SIZE=1)
+    def test_batch_size(self):
+        GameFactory(sgf=None, link="https://online-go.com/game/1")
+        GameFactory(sgf=None, link="https://online-go.com/game/2")
+
+        with mock.patch("league.tasks.fetch_sgf", return_value="(;GM[1])"):
+            self.assertEqual(fetch_pending_sgfs(), {"fetched": 1, "failed": 0})
+            self.assertEqual(fetch_pending_sgfs(), {"fetched": 1, "failed": 0})
+            self.assertEqual(fetch_pending_sgfs(), {"fetched": 0, "failed": 0})
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    def test_eager_schedule_fetches_only_saved_game(self):
+        GameFactory(sgf=None, link="https://online-go.com/game/1")
+        game = GameFactory(sgf=None, link="https://online-go.com/game/2")
+
+        with mock.patch("league.tasks.fetch_sgf", return_value="(;GM[1])") as fetch_sgf_mock:
+            schedule_sgf_fetch(game_id=game.id)
+
+        fetch_sgf_mock.assert_called_once_with(sgf_url="https://online-go.com/api/v1/games/2/sgf", session=mock.ANY)
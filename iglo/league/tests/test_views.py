@@ -1,13 +1,17 @@
 import datetime
-from django.test import TestCase, RequestFactory
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.messages.storage.fallback import FallbackStorage
 from django.contrib.sessions.middleware import SessionMiddleware
 
 from accounts.models import User, UserRole
-from league.models import Season, SeasonState, Game, WinType
+from league import igor
+from league.models import Season, SeasonState, Game, WinType, GroupType
 from league.views import SeasonDetailView
-from league.tests.factories import SeasonFactory, GroupFactory, MemberFactory
+from league.tests.factories import SeasonFactory, GroupFactory, MemberFactory, RoundFactory, GameFactory
 
 
 class SeasonViewsTestCase(TestCase):
@@ -68,4 +72,102 @@ class SeasonViewsTestCase(TestCase):
         
         # Check that season state changed to draft
         self.season.refresh_from_db()
-        self.assertEqual(self.season.state, SeasonState.DRAFT)
\ No newline at end of file
+        self.assertEqual(self.season.state, SeasonState.DRAFT)
+
+@override_settings(SHARED_CACHE=True)
+class GroupDetailViewTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def _create_group(self, season_number, size):
+        group = GroupFactory(
+            season__number=season_number, season__state=SeasonState.IN_PROGRESS, name="A", type=GroupType.ROUND_ROBIN
+        )
+        members = [MemberFactory(group=group, order=order) for order in range(1, size + 1)]
+        for round_number, (black, white) in enumerate(zip(members[::2], members[1::2]), start=1):
+            round = RoundFactory(group=group, number=round_number)
+            GameFactory(group=group, round=round, black=black, white=white, winner=black, win_type=WinType.POINTS)
+            GameFactory(group=group, round=round, black=white, white=black, winner=None, win_type=WinType.NOT_PLAYED)
+        return group
+
+    def _count_queries(self, group):
+        url = reverse("group-detail", kwargs={"season_number": group.season.number, "group_name": group.name})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_number_of_queries_does_not_depend_on_group_size(self):
+        small_group = self._create_group(season_number=1, size=4)
+        large_group = self._create_group(season_number=2, size=12)
+
+        self.assertEqual(self._count_queries(small_group), self._count_queries(large_group))
+
+    def test_anonymous_page_served_from_cache(self):
+        group = self._create_group(season_number=1, size=4)
+        self._count_queries(group)
+
+        self.assertEqual(self._count_queries(group), 0)
+
+    def test_cache_invalidated_after_game_result(self):
+        group = self._create_group(season_number=1, size=4)
+        url = reverse("group-detail", kwargs={"season_number": group.season.number, "group_name": group.name})
+        self.assertContains(self.client.get(url), 'data-result="3X"')
+        game = group.games.get(win_type=WinType.NOT_PLAYED, black=group.members.get(order=2))
+
+        game.win_type = WinType.RESIGN
+        game.winner = game.white
+        game.save()
+
+        self.assertNotContains(self.client.get(url), 'data-result="3X"')
+
+    def test_results_fragment_invalidated_for_group_name_in_lowercase(self):
+        group = self._create_group(season_number=1, size=4)
+        group.name = "a"
+        group.save()
+        url = reverse("group-detail", kwargs={"season_number": group.season.number, "group_name": group.name})
+        self.client.force_login(User.objects.create_user(email="user@example.com", password="password"))
+        self.assertContains(self.client.get(url), 'data-result="3X"')
+        game = group.games.get(win_type=WinType.NOT_PLAYED, black=group.members.get(order=2))
+
+        game.win_type = WinType.RESIGN
+        game.winner = game.white
+        game.save()
+
+        self.assertNotContains(self.client.get(url), 'data-result="3X"')
+
+    def test_page_cached_for_every_host(self):
+        group = self._create_group(season_number=1, size=4)
+        url = reverse("group-detail", kwargs={"season_number": group.season.number, "group_name": group.name})
+        self.client.get(url, HTTP_HOST="first.example.com")
+
+        response = self.client.get(url, HTTP_HOST="second.example.com")
+
+        self.assertContains(response, "http://second.example.com/")
+        self.assertNotContains(response, "first.example.com")
+
+    def test_cache_invalidated_after_player_ratings_update(self):
+        group = self._create_group(season_number=1, size=4)
+        url = reverse("group-detail", kwargs={"season_number": group.season.number, "group_name": group.name})
+        self.client.get(url)
+        player = group.members.get(order=1).player
+
+        igor._save_player_ratings({player.nick: [2345.0]})
+
+        self.assertContains(self.client.get(url), "2345")
+
+    @override_settings(SHARED_CACHE=False)
+    def test_page_not_cached_without_shared_cache(self):
+        group = self._create_group(season_number=1, size=4)
+        self._count_queries(group)
+
+        self.assertNotEqual(self._count_queries(group), 0)
+
+    def test_authenticated_user_does_not_get_anonymous_page(self):
+        group = self._create_group(season_number=1, size=4)
+        self._count_queries(group)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        self.client.force_login(user)
+
+        self.assertNotEqual(self._count_queries(group), 0)
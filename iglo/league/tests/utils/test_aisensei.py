@@ -0,0 +1,89 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from league.utils.aisensei import AISenseiClient, AISenseiConfig, AISenseiException
+
+
+class FakeAISenseiHandler(BaseHTTPRequestHandler):
+    tokens = []
+    valid_tokens = set()
+    uploads = []
+    upload_status = 200
+    upload_response = {"url": "https://ai.com/1"}
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/auth":
+            token = f"token-{len(FakeAISenseiHandler.tokens)}"
+            FakeAISenseiHandler.tokens.append(token)
+            FakeAISenseiHandler.valid_tokens.add(token)
+            self._respond(200, {"idToken": token, "expiresIn": "3600"})
+        elif json.loads(body)["token"] not in FakeAISenseiHandler.valid_tokens:
+            self._respond(401, {})
+        else:
+            FakeAISenseiHandler.uploads.append(json.loads(body))
+            self._respond(FakeAISenseiHandler.upload_status, FakeAISenseiHandler.upload_response)
+
+    def _respond(self, status: int, data: dict):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class AISenseiClientTestCase(SimpleTestCase):
+    def setUp(self):
+        FakeAISenseiHandler.tokens = []
+        FakeAISenseiHandler.valid_tokens = set()
+        FakeAISenseiHandler.uploads = []
+        FakeAISenseiHandler.upload_status = 200
+        FakeAISenseiHandler.upload_response = {"url": "https://ai.com/1"}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAISenseiHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{self.server.server_port}"
+        self.client = AISenseiClient(
+            AISenseiConfig(auth_url=f"{url}/auth", service_url=f"{url}/upload", email="a@b.pl", password="secret")
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_token_is_reused(self):
+        self.assertEqual(self.client.upload_sgf(sgf_data="(;GM[1])", tags=["IGLO"]), "https://ai.com/1")
+        self.assertEqual(self.client.upload_sgf(sgf_data="(;GM[1])", tags=["IGLO"]), "https://ai.com/1")
+
+        self.assertEqual(FakeAISenseiHandler.tokens, ["token-0"])
+        self.assertEqual(len(FakeAISenseiHandler.uploads), 2)
+
+    def test_revoked_token_is_refreshed(self):
+        self.client.upload_sgf(sgf_data="(;GM[1])", tags=["IGLO"])
+        FakeAISenseiHandler.valid_tokens.clear()
+
+        self.client.upload_sgf(sgf_data="(;GM[1])", tags=["IGLO"])
+
+        self.assertEqual(FakeAISenseiHandler.tokens, ["token-0", "token-1"])
+        self.assertEqual(FakeAISenseiHandler.uploads[-1]["token"], "token-1")
+
+    def test_server_error_is_retryable(self):
+        FakeAISenseiHandler.upload_status = 503
+
+        with self.assertRaises(AISenseiException) as context:
+            self.client.upload_sgf(sgf_data="(;GM[1])", tags=["IGLO"])
+
+        self.assertTrue(context.exception.retryable)
+
+    def test_invalid_response_raises_exception(self):
+        FakeAISenseiHandler.upload_response = {"error": "unknown"}
+
+        with self.assertRaises(AISenseiException) as context:
+            self.client.upload_sgf(sgf_data="(;GM[1])", tags=["IGLO"])
+
+        self.assertFalse(context.exception.retryable)
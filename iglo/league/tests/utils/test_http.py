@@ -0,0 +1,87 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from league.utils.http import RateLimiter, create_session, map_concurrently
+
+
+class RateLimiterTestCase(SimpleTestCase):
+    def test_burst_is_not_limited(self):
+        limiter = RateLimiter(rate=1, burst=3)
+
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_rate_is_limited(self):
+        limiter = RateLimiter(rate=20, burst=1)
+
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_pause_holds_back_requests(self):
+        limiter = RateLimiter(rate=1000, burst=10)
+
+        limiter.pause(0.2)
+        start = time.monotonic()
+        limiter.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+
+class MapConcurrentlyTestCase(SimpleTestCase):
+    def test_results_in_order_of_items(self):
+        def func(item):
+            if item == 2:
+                raise ValueError("wrong item")
+            return item * 10
+
+        results = map_concurrently(func, [1, 2, 3], workers=2, exceptions=(ValueError,))
+
+        self.assertEqual([(item, result) for item, result, _ in results], [(1, 10), (2, None), (3, 30)])
+        self.assertIsInstance(results[1][2], ValueError)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    requests_count = 0
+
+    def do_GET(self):
+        StubHandler.requests_count += 1
+        if StubHandler.requests_count == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class RateLimitedSessionTestCase(SimpleTestCase):
+    def setUp(self):
+        StubHandler.requests_count = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_too_many_requests_are_retried(self):
+        session = create_session(pool_size=2, rate_limiter=RateLimiter(rate=100, burst=2))
+
+        response = session.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(StubHandler.requests_count, 2)
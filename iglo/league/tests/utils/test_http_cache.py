@@ -0,0 +1,90 @@
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from league.utils.http import create_session
+from league.utils.http_cache import HttpCache
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        StubHandler.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = f"content of {self.path}".encode()
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        StubHandler.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.directory.name) / "cache" / "responses.sqlite3")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def _session(self, ttl: int = 60, max_size: int = 1024):
+        cache = HttpCache(path=self.path, max_size=max_size, ttls=[(r"/cached", ttl)])
+        return create_session(pool_size=1, cache=cache)
+
+    def test_fresh_response_is_served_from_cache(self):
+        self._session().get(f"{self.url}/cached", params={"page": 1})
+
+        response = self._session().get(f"{self.url}/cached", params={"page": 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, "content of /cached?page=1")
+        self.assertEqual(StubHandler.requests, [("/cached?page=1", None)])
+
+    def test_expired_response_is_revalidated(self):
+        session = self._session(ttl=0)
+        session.get(f"{self.url}/cached")
+        time.sleep(0.01)
+
+        response = session.get(f"{self.url}/cached")
+
+        self.assertEqual(response.text, "content of /cached")
+        self.assertEqual(StubHandler.requests, [("/cached", None), ("/cached", '"v1"')])
+
+    def test_url_without_ttl_is_not_cached(self):
+        session = self._session()
+        session.get(f"{self.url}/other")
+        session.get(f"{self.url}/other")
+
+        self.assertEqual(len(StubHandler.requests), 2)
+
+    def test_least_recently_used_responses_are_evicted(self):
+        # Every response has 18 bytes, so only two of them fit
+        session = self._session(max_size=45)
+        session.get(f"{self.url}/cached/1")
+        session.get(f"{self.url}/cached/2")
+        session.get(f"{self.url}/cached/1")
+        session.get(f"{self.url}/cached/3")
+
+        session.get(f"{self.url}/cached/1")
+        session.get(f"{self.url}/cached/2")
+
+        self.assertEqual(
+            [path for path, _ in StubHandler.requests], ["/cached/1", "/cached/2", "/cached/3", "/cached/2"]
+        )
@@ -0,0 +1,50 @@
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase
+
+from league.utils.ogs import get_player_data, OGSException
+
+PLAYER_DETAILS = {"id": 7, "username": "Stone", "ratings": {"overall": {"rating": 1500.0, "deviation": 60.0}}}
+
+
+def _response(status_code: int, data: dict = None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = data
+    return response
+
+
+class GetPlayerDataTestCase(SimpleTestCase):
+    def setUp(self):
+        self.session = MagicMock()
+        self.responses = {}
+        self.session.get.side_effect = lambda url: self.responses[url]
+
+    def test_cached_id_skips_search(self):
+        self.responses["https://online-go.com/api/v1/players/7"] = _response(200, PLAYER_DETAILS)
+
+        result = get_player_data("stone", player_id=7, session=self.session)
+
+        self.assertEqual(result["id"], 7)
+        self.assertEqual(result["rating"], 1500.0)
+        self.assertEqual(result["deviation"], 60.0)
+        self.assertEqual(self.session.get.call_count, 1)
+
+    def test_stale_id_falls_back_to_search(self):
+        self.responses["https://online-go.com/api/v1/players/3"] = _response(404)
+        self.responses["https://online-go.com/api/v1/players?username=Stone"] = _response(
+            200, {"count": 1, "results": [{"id": 7}]}
+        )
+        self.responses["https://online-go.com/api/v1/players/7"] = _response(200, PLAYER_DETAILS)
+
+        result = get_player_data("Stone", player_id=3, session=self.session)
+
+        self.assertEqual(result["id"], 7)
+        self.assertEqual(self.session.get.call_count, 3)
+
+    def test_renamed_player_falls_back_to_search(self):
+        self.responses["https://online-go.com/api/v1/players/7"] = _response(200, PLAYER_DETAILS)
+        self.responses["https://online-go.com/api/v1/players?username=other"] = _response(200, {"count": 0})
+
+        with self.assertRaises(OGSException):
+            get_player_data("other", player_id=7, session=self.session)
@@ -0,0 +1,61 @@
+from django.test import SimpleTestCase
+
+from league.utils.standings import compute_standings, Standing
+
+
+class ComputeStandingsTestCase(SimpleTestCase):
+    def test_round_robin(self):
+        # 0 beats 1 and 2, 1 beats 2, 2 beats 3, 3 beats 0 and 1
+        games = [
+            (0, 1, 0, False, False),
+            (2, 0, 0, False, False),
+            (1, 2, 1, False, False),
+            (2, 3, 2, False, False),
+            (3, 0, 3, False, False),
+            (1, 3, 3, False, False),
+        ]
+
+        result = compute_standings(initial_scores=[0.0, 0.0, 0.0, 0.0], games=games)
+
+        self.assertEqual([standing.points for standing in result], [2, 1, 1, 2])
+        self.assertEqual([standing.sodos for standing in result], [2, 1, 2, 3])
+        self.assertEqual([standing.sos for standing in result], [4.0, 5.0, 5.0, 4.0])
+        self.assertEqual([standing.sosos for standing in result], [14.0, 13.0, 13.0, 14.0])
+
+    def test_bye_counts_for_score_only(self):
+        games = [
+            (0, 1, 0, False, False),
+            (None, None, 1, True, False),
+        ]
+
+        result = compute_standings(initial_scores=[0.0, -1.0], games=games)
+
+        self.assertEqual(result[0], Standing(points=1, score=1.0, sodos=0, sos=0.0, sosos=1.0))
+        self.assertEqual(result[1], Standing(points=0, score=0.0, sodos=0, sos=1.0, sosos=0.0))
+
+    def test_unplayed_games_count_for_sos(self):
+        games = [
+            (0, 1, None, False, False),
+            (1, 0, 1, False, True),
+        ]
+
+        result = compute_standings(initial_scores=[2.0, 0.0], games=games)
+
+        self.assertEqual(result[0].sos, 2.0)
+        self.assertEqual(result[1].sos, 4.0)
+
+    def test_walkovers(self):
+        games = [
+            (0, 1, None, False, True),
+            (1, 2, 1, False, True),
+            (2, 0, 0, False, False),
+        ]
+
+        result = compute_standings(initial_scores=[0.0, 0.0, 0.0], games=games)
+
+        self.assertEqual([standing.walkovers for standing in result], [1, 1, 1])
+
+    def test_no_games(self):
+        result = compute_standings(initial_scores=[1.5], games=[])
+
+        self.assertEqual(result, [Standing(points=0, score=1.5, sodos=0, sos=0.0, sosos=0.0)])
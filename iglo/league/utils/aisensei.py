@@ -1,7 +1,15 @@
+import threading
+import time
 from dataclasses import dataclass
 from typing import Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+# Token is refreshed that many seconds before it expires
+TOKEN_EXPIRY_MARGIN = 60
+DEFAULT_TOKEN_LIFETIME = 3600
+TIMEOUT = 15
 
 
 @dataclass(frozen=True)
@@ -13,32 +21,98 @@ class AISenseiConfig:
 
 
 class AISenseiException(Exception):
-    pass
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable  # True for errors which may pass, like timeouts or server errors
+
+
+class AISenseiClient:
+    """
+    Uploads SGF files over a pooled session. The authentication token is shared by threads and reused until
+    it expires.
+    """
+
+    def __init__(self, config: AISenseiConfig, pool_size: int = 4):
+        self.config = config
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._lock = threading.Lock()
+
+    def get_token(self) -> str:
+        with self._lock:
+            if self._token is None or time.monotonic() >= self._token_expires:
+                response = self._post(
+                    url=self.config.auth_url,
+                    data={
+                        "email": self.config.email,
+                        "password": self.config.password,
+                        "returnSecureToken": True,
+                    },
+                )
+                if response.status_code != 200:
+                    raise AISenseiException("authentication error", retryable=response.status_code >= 500)
+                try:
+                    content = response.json()
+                    token = content["idToken"]
+                    lifetime = int(content.get("expiresIn", DEFAULT_TOKEN_LIFETIME))
+                except (ValueError, KeyError, TypeError) as e:
+                    raise AISenseiException(f"invalid authentication response: {str(e)}")
+                self._token = token
+                self._token_expires = time.monotonic() + lifetime - TOKEN_EXPIRY_MARGIN
+            return self._token
+
+    def invalidate_token(self, token: str) -> None:
+        with self._lock:
+            if self._token == token:
+                self._token = None
+
+    def upload_sgf(self, sgf_data: str, tags: list[str]) -> str:
+        for attempt in range(2):
+            token = self.get_token()
+            response = self._post(
+                url=self.config.service_url,
+                json={
+                    "token": token,
+                    "game": sgf_data,
+                    "options": {"quality": "pro"},
+                    "tags": tags
+                },
+            )
+            # Token might have been revoked before it expired, then it is refreshed once
+            if response.status_code in [401, 403] and attempt == 0:
+                self.invalidate_token(token)
+                continue
+            if response.status_code != 200:
+                raise AISenseiException(
+                    "upload error", retryable=response.status_code == 429 or response.status_code >= 500
+                )
+            try:
+                return response.json()["url"]
+            except (ValueError, KeyError, TypeError) as e:
+                raise AISenseiException(f"invalid upload response: {str(e)}")
+
+    def _post(self, **kwargs) -> requests.Response:
+        try:
+            return self.session.post(timeout=TIMEOUT, **kwargs)
+        except requests.RequestException as e:
+            raise AISenseiException(f"connection error: {str(e)}", retryable=True)
+
+
+_clients: dict[AISenseiConfig, AISenseiClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(config: AISenseiConfig) -> AISenseiClient:
+    """Client is kept for the whole process, so its connections and token are reused by subsequent tasks."""
+    with _clients_lock:
+        if config not in _clients:
+            _clients[config] = AISenseiClient(config)
+        return _clients[config]
 
 
 def upload_sgf(config: AISenseiConfig, sgf_data: str, tags: list[str]) -> str:
-    response_token = requests.post(
-        url=config.auth_url,
-        data={
-            "email": config.email,
-            "password": config.password,
-            "returnSecureToken": True,
-        },
-    )
-
-    if response_token.status_code != 200:
-        raise AISenseiException("authentication error")
-
-    response_upload = requests.post(
-        url=config.service_url,
-        json={
-            "token": response_token.json()["idToken"],
-            "game": sgf_data,
-            "options": {"quality": "pro"},
-            "tags": tags
-        },
-    )
-    if response_upload.status_code != 200:
-        raise AISenseiException("upload error")
-
-    return response_upload.json()["url"]
+    return get_client(config).upload_sgf(sgf_data=sgf_data, tags=tags)
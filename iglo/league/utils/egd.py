@@ -163,9 +163,9 @@ class EGDPlayerData:
     egf_placement: Optional[int] = None
 
 
-def get_player_data_by_pin(pin: str) -> EGDPlayerData:
+def get_player_data_by_pin(pin: str, session: Optional[requests.Session] = None) -> EGDPlayerData:
     """
-    Fetch comprehensive player data from EGD by PIN.
+    Fetch comprehensive player data from EGD by PIN. Pass a session to reuse its connections.
     
     Returns:
         EGDPlayerData object containing all relevant player information
@@ -174,7 +174,10 @@ def get_player_data_by_pin(pin: str) -> EGDPlayerData:
         EGDException: If the EGD API returns an error or player data cannot be fetched
     """
     url = f'http://www.europeangodatabase.eu/EGD/GetPlayerDataByPIN.php?pin={pin}'
-    response = requests.get(url)
+    try:
+        response = (session or requests).get(url)
+    except requests.RequestException as e:
+        raise EGDException(f'Cannot connect to EGD: {str(e)}')
     if response.status_code != 200:
         raise EGDException(f'EGD is responding with {response.status_code}')
     
@@ -204,7 +207,7 @@ def get_player_data_by_pin(pin: str) -> EGDPlayerData:
         raise EGDException(f'Cannot parse player data: {str(e)}')
 
 
-def get_gor_by_pin(pin: str) -> int:
+def get_gor_by_pin(pin: str, session: Optional[requests.Session] = None) -> int:
     """
     Fetch player's GoR (Go Rating) from EGD by PIN.
     
@@ -217,7 +220,7 @@ def get_gor_by_pin(pin: str) -> int:
         EGDException: If the player data cannot be fetched or GoR is missing
     """
     try:
-        player_data = get_player_data_by_pin(pin)
+        player_data = get_player_data_by_pin(pin, session=session)
         return player_data.gor
     except EGDException:
         raise
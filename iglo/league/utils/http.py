@@ -0,0 +1,138 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from league.utils.http_cache import HttpCache
+
+T = TypeVar("T")
+
+DEFAULT_TIMEOUT = 10
+# Longest pause after HTTP 429 - a sync should rather report a failure than hold the worker for minutes
+MAX_RATE_LIMIT_PAUSE = 30
+
+
+class RateLimiter:
+    """Token bucket shared by all threads: allows `rate` requests per second with bursts up to `burst` requests."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Holds back all threads, e.g. when the server responded with HTTP 429."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + min(seconds, MAX_RATE_LIMIT_PAUSE))
+            self._tokens = 0.0
+
+
+class RateLimitedSession(requests.Session):
+    """
+    Session which waits for the rate limiter before every request. Responses with HTTP 429 pause the limiter
+    for all threads and are retried up to `max_retries` times. GET responses are served from the cache, if given,
+    and only requests which reach the server count against the rate limit.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[HttpCache] = None,
+        max_retries: int = 3,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        super().__init__()
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+    def request(self, method, url, *args, **kwargs) -> requests.Response:
+        if not self.cache or method.upper() != "GET":
+            return self._send(method, url, *args, **kwargs)
+        cache_url = requests.Request(method, url, params=kwargs.get("params")).prepare().url
+        ttl = self.cache.get_ttl(cache_url)
+        if ttl is None:
+            return self._send(method, url, *args, **kwargs)
+
+        cached = self.cache.get(cache_url)
+        if cached and cached.expires > time.time():
+            return cached.to_response()
+        headers = dict(kwargs.pop("headers", None) or {})
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        response = self._send(method, url, *args, headers=headers, **kwargs)
+        if response.status_code == 304 and cached:
+            self.cache.refresh(cache_url, ttl)
+            return cached.to_response()
+        if response.status_code == 200:
+            self.cache.set(cache_url, response, ttl)
+        return response
+
+    def _send(self, method, url, *args, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            response = super().request(method, url, *args, **kwargs)
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+            if self.rate_limiter:
+                self.rate_limiter.pause(_get_retry_after(response, default=2 ** attempt))
+        return response
+
+
+def create_session(
+    pool_size: int, rate_limiter: Optional[RateLimiter] = None, cache: Optional[HttpCache] = None
+) -> RateLimitedSession:
+    """Session keeping up to `pool_size` connections per host alive, so concurrent requests reuse them."""
+    session = RateLimitedSession(rate_limiter=rate_limiter, cache=cache)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def map_concurrently(
+    func: Callable[[T], Any], items: Iterable[T], workers: int, exceptions: tuple = (Exception,)
+) -> list[tuple[T, Any, Optional[Exception]]]:
+    """
+    Calls the function for every item in a pool of `workers` threads. Returns (item, result, error) tuples in order
+    of items, the error is set instead of the result if the function raised one of `exceptions`.
+    """
+
+    def call(item: T) -> tuple[T, Any, Optional[Exception]]:
+        try:
+            return item, func(item), None
+        except exceptions as err:
+            return item, None, err
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(call, items))
+
+
+def _get_retry_after(response: requests.Response, default: float) -> float:
+    try:
+        return float(response.headers.get("Retry-After", default))
+    except ValueError:
+        return default
@@ -0,0 +1,138 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import requests
+from django.conf import settings
+from requests.structures import CaseInsensitiveDict
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    url: str
+    status_code: int
+    headers: dict
+    content: bytes
+    expires: float
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("ETag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("Last-Modified")
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        return response
+
+
+class HttpCache:
+    """
+    Cache of GET responses in an SQLite file, shared by processes and threads. Each URL pattern has its own time to
+    live, URLs not matching any pattern are not cached. Expired responses with ETag or Last-Modified are kept to be
+    revalidated. When the cache is larger than `max_size` bytes, least recently used responses are evicted.
+    """
+
+    def __init__(self, path: str, max_size: int, ttls: list[tuple[str, int]]):
+        self.path = path
+        self.max_size = max_size
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def get_ttl(self, url: str) -> Optional[int]:
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return None
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT status_code, headers, content, expires FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE responses SET last_used = ? WHERE url = ?", (time.time(), url))
+        status_code, headers, content, expires = row
+        return CachedResponse(
+            url=url, status_code=status_code, headers=json.loads(headers), content=content, expires=expires
+        )
+
+    def set(self, url: str, response: requests.Response, ttl: int) -> None:
+        content = response.content
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    response.status_code,
+                    json.dumps(dict(response.headers)),
+                    content,
+                    time.time() + ttl,
+                    time.time(),
+                    len(content),
+                ),
+            )
+            self._evict(connection)
+
+    def refresh(self, url: str, ttl: int) -> None:
+        """Extends life of a response revalidated by the server."""
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "UPDATE responses SET expires = ?, last_used = ? WHERE url = ?", (time.time() + ttl, time.time(), url)
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM responses")
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        (total_size,) = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if total_size <= self.max_size:
+            return
+        to_delete = []
+        for url, size in connection.execute("SELECT url, size FROM responses ORDER BY last_used"):
+            if total_size <= self.max_size:
+                break
+            to_delete.append((url,))
+            total_size -= size
+        connection.executemany("DELETE FROM responses WHERE url = ?", to_delete)
+
+    @contextmanager
+    def _connect(self):
+        # The file is created on the first use, so that merely configured cache does not touch the disk
+        if not self._initialized:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._initialized:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "url TEXT PRIMARY KEY, status_code INTEGER, headers TEXT, content BLOB, "
+                    "expires REAL, last_used REAL, size INTEGER)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+                self._initialized = True
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    if not settings.HTTP_CACHE_PATH:
+        return None
+    return HttpCache(path=settings.HTTP_CACHE_PATH, max_size=settings.HTTP_CACHE_MAX_SIZE, ttls=settings.HTTP_CACHE_TTLS)
@@ -6,19 +6,26 @@ class OGSException(Exception):
     pass
 
 
-def fetch_sgf(sgf_url: str) -> str:
-    response = requests.get(url=sgf_url)
+def fetch_sgf(sgf_url: str, session: Optional[requests.Session] = None) -> str:
+    try:
+        response = (session or requests).get(url=sgf_url)
+    except requests.RequestException as e:
+        raise OGSException(f"can not fetch SGF file: {str(e)}")
     if response.status_code != 200:
         raise OGSException("can not fetch SGF file")
     return response.content.decode()
 
 
-def get_player_data(username: str) -> Dict[str, Any]:
+def get_player_data(
+    username: str, player_id: Optional[int] = None, session: Optional[requests.Session] = None
+) -> Dict[str, Any]:
     """
     Get complete player data from OGS by username.
 
     Args:
         username: The OGS username to look up
+        player_id: Cached OGS player ID, if it is still valid the username search is skipped
+        session: Session to reuse connections
 
     Returns:
         A dictionary with player data including ID, rating, and deviation
@@ -26,26 +33,15 @@ def get_player_data(username: str) -> Dict[str, Any]:
     Raises:
         OGSException: If there's an error communicating with the OGS API
     """
+    http = session or requests
     try:
-        # First get the player ID
-        response = requests.get(f"https://online-go.com/api/v1/players?username={username}")
-        response.raise_for_status()
-
-        data = response.json()
-        if data.get('count', 0) == 0 or not data.get('results'):
-            raise OGSException(f"Player '{username}' not found")
-
-        if len(data['results']) != 1:
-            raise OGSException(f"Unexpected result from https://online-go.com/api/v1/players?username={username} :\n{data}")
-
-        player_id = data['results'][0]['id']
-
-        # Now get the detailed player data
-        response = requests.get(f"https://online-go.com/api/v1/players/{player_id}")
-        if response.status_code != 200:
-            raise OGSException(f"Failed to fetch player details: HTTP {response.status_code}")
-
-        player_data = response.json()
+        player_data = _get_player_details(http, player_id) if player_id else None
+        # The cached ID is stale if the player no longer exists or the username was changed
+        if player_data is None or player_data.get('username', '').lower() != username.lower():
+            player_id = _search_player_id(http, username)
+            player_data = _get_player_details(http, player_id)
+            if player_data is None:
+                raise OGSException("Failed to fetch player details: HTTP 404")
 
         # Extract the rating information
         result = {
@@ -66,3 +62,27 @@ def get_player_data(username: str) -> Dict[str, Any]:
         raise OGSException(f"Error communicating with OGS API: {str(e)}")
     except (ValueError, KeyError) as e:
         raise OGSException(f"Invalid response from OGS API: {str(e)}")
+
+
+def _search_player_id(http, username: str) -> int:
+    response = http.get(f"https://online-go.com/api/v1/players?username={username}")
+    response.raise_for_status()
+
+    data = response.json()
+    if data.get('count', 0) == 0 or not data.get('results'):
+        raise OGSException(f"Player '{username}' not found")
+
+    if len(data['results']) != 1:
+        raise OGSException(f"Unexpected result from https://online-go.com/api/v1/players?username={username} :\n{data}")
+
+    return data['results'][0]['id']
+
+
+def _get_player_details(http, player_id: int) -> Optional[Dict[str, Any]]:
+    """Returns None if there is no player with such ID."""
+    response = http.get(f"https://online-go.com/api/v1/players/{player_id}")
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise OGSException(f"Failed to fetch player details: HTTP {response.status_code}")
+    return response.json()
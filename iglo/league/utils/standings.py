@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+# Compact game representation: (black index, white index, winner index, is bye, is not played).
+# Indexes point into the members sequence of a single group, `None` means "no member".
+GameEntry = tuple[Optional[int], Optional[int], Optional[int], bool, bool]
+
+
+@dataclass(frozen=True)
+class Standing:
+    points: int
+    score: float
+    sodos: int
+    sos: float
+    sosos: float
+    walkovers: int = 0
+
+
+def compute_standings(initial_scores: Sequence[float], games: Iterable[GameEntry]) -> list[Standing]:
+    """
+    Calculates points, score, tiebreakers (SODOS, SOS, SOSOS) and walkovers for every member of a group in a single
+    pass over its games. Semantics are the same as `Member.points`, `score`, `sodos`, `sos`, `sosos`
+    and `total_walkovers`.
+    """
+    size = len(initial_scores)
+    points = [0] * size
+    score = [float(initial_score) for initial_score in initial_scores]
+    walkovers = [0] * size
+    beaten = [[] for _ in range(size)]
+    opponents = [[] for _ in range(size)]
+
+    for black, white, winner, is_bye, is_not_played in games:
+        if winner is not None:
+            score[winner] += 1
+            if not is_bye:
+                points[winner] += 1
+                loser = white if winner == black else black
+                if loser is not None:
+                    beaten[winner].append(loser)
+        if not is_bye and black is not None and white is not None:
+            opponents[black].append(white)
+            opponents[white].append(black)
+        if is_not_played:
+            for participant in (black, white):
+                if participant is not None and participant != winner:
+                    walkovers[participant] += 1
+
+    sodos = [sum(points[loser] for loser in beaten[idx]) for idx in range(size)]
+    sos = [sum((score[opponent] for opponent in opponents[idx]), 0.0) for idx in range(size)]
+    sosos = [sum((sos[opponent] for opponent in opponents[idx]), 0.0) for idx in range(size)]
+    return [
+        Standing(
+            points=points[idx],
+            score=score[idx],
+            sodos=sodos[idx],
+            sos=sos[idx],
+            sosos=sosos[idx],
+            walkovers=walkovers[idx],
+        )
+        for idx in range(size)
+    ]
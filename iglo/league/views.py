@@ -3,16 +3,19 @@ import datetime
 
 from django.conf import settings
 from django.contrib import messages
+from django.core.cache import cache
 from django.db.models import Count, Exists, OuterRef, Q
 from django.http import HttpResponse, Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
+from django.utils.translation import get_language
 from django.views import View
 from django.views.generic import ListView, DetailView, FormView, UpdateView, RedirectView, TemplateView
 from django.views.generic.detail import SingleObjectMixin
 
 from accounts.models import UserRole
 from league import texts, tasks
+from league.cache import ROLE_CLASS_ANONYMOUS, get_group_page_key, get_group_page_version, get_role_class
 from league.models import PairingType
 from league.forms import (
     GameResultUpdateForm,
@@ -51,7 +54,12 @@ class SeasonsListView(ListView):
         return context | {"can_prepare_season": not Season.objects.exclude(state=SeasonState.FINISHED).exists()}
 
     def get_queryset(self):
-        return super().get_queryset().annotate(number_of_players=Count("groups__members")).order_by("-number")
+        return (
+            super()
+            .get_queryset()
+            .annotate(number_of_players=Count("groups__members"), number_of_groups=Count("groups", distinct=True))
+            .order_by("-number")
+        )
 
 
 class SeasonDetailView(UserRoleRequiredForModify, DetailView):
@@ -214,10 +222,37 @@ class GroupObjectMixin(SingleObjectMixin):
 class GroupDetailView(UserRoleRequiredForModify, GroupObjectMixin, DetailView):
     model = Group
     required_roles = [UserRole.REFEREE]
-    
+
+    def get(self, request, *args, **kwargs):
+        # Anonymous visitors of a host all see the same page, so it is served without touching the database.
+        if not settings.SHARED_CACHE or request.user.is_authenticated or messages.get_messages(request):
+            return super().get(request, *args, **kwargs)
+        season_number, group_name = self.kwargs["season_number"], self.kwargs["group_name"]
+        cache_key = get_group_page_key(
+            season_number=season_number,
+            group_name=group_name,
+            version=get_group_page_version(season_number=season_number, group_name=group_name),
+            language=get_language(),
+            role_class=ROLE_CLASS_ANONYMOUS,
+            scheme=request.scheme,
+            host=request.get_host(),
+        )
+        content = cache.get(cache_key)
+        if content is None:
+            response = super().get(request, *args, **kwargs)
+            response.render()
+            cache.set(cache_key, response.content, settings.GROUP_PAGE_CACHE_TIMEOUT)
+            return response
+        return HttpResponse(content)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
+        # Timeout 0 renders the results table without caching it
+        context["cache_timeout"] = settings.GROUP_PAGE_CACHE_TIMEOUT if settings.SHARED_CACHE else 0
+        context["cache_group_name"] = self.object.name.upper()
+        context["cache_language"] = get_language()
+        context["cache_role_class"] = get_role_class(self.request.user)
+
         # If we're in the draft state, get previous positions from the last season
         if self.object.season.state == SeasonState.DRAFT:
             context['prev_positions'] = self.get_previous_positions()
@@ -319,7 +354,13 @@ class GroupAllGamesView(GroupObjectMixin, DetailView):
         context = super().get_context_data(**kwargs)
         
         # Get all games from the group and exclude byes
-        games = Game.objects.filter(group=self.object).exclude(win_type=WinType.BYE).select_related('assigned_teacher')
+        games = (
+            Game.objects.filter(group=self.object)
+            .exclude(win_type=WinType.BYE)
+            .select_related(
+                'assigned_teacher', 'round', 'group__season', 'black__player', 'white__player', 'winner__player'
+            )
+        )
         
         # Custom sort by initial order of both players, higher player first
         games = sorted(games, key=lambda game: (
@@ -613,8 +654,10 @@ class GameUpdateView(UserRoleRequired, GameDetailView, UpdateView):
             level=messages.SUCCESS,
             message="Gra została zaktualizowana pomyślnie.",
         )
-        tasks.recalculate_igor.delay()
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        # Scheduled after saving, so that a running recalculation sees the result when checking for changes
+        tasks.schedule_igor_recalculation()
+        return response
 
     def test_func(self):
         game = self.get_object()  # TODO: this is not prefect
@@ -775,7 +818,7 @@ class LeagueAdminView(TemplateView, UserRoleRequired):
         triggering_user_email = self.request.user.email if hasattr(self.request.user, 'email') else None
         
         if "action-update-gor" in request.POST:
-            tasks.update_gor.delay(triggering_user_email=triggering_user_email)
+            tasks.update_gor.delay(triggering_user_email=triggering_user_email, force=True)
             messages.add_message(
                 request=request,
                 level=messages.SUCCESS,
@@ -789,7 +832,7 @@ class LeagueAdminView(TemplateView, UserRoleRequired):
                 message=texts.UPDATE_OGS_MESSAGE,
             )
         elif "action-recalculate-igor" in request.POST:
-            tasks.recalculate_igor.delay()
+            tasks.recalculate_igor.delay(full=True)
             messages.add_message(
                 request=request,
                 level=messages.SUCCESS,
@@ -1,6 +1,9 @@
+import heapq
 import math
 import random
 
+from array import array
+from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Iterable, Optional, Iterator, Tuple
@@ -19,14 +22,14 @@ class Color(str, Enum):
     BYE = 'bye'
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class GameRecord:
     opponent: Optional[str]
     color: str
     result: ResultType
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Player:
     name: str
     rating: int
@@ -34,13 +37,13 @@ class Player:
     games: list[GameRecord] = field(default_factory=list)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Pair:
     black: Player
     white: Player
 
 
-@dataclass(order=True)
+@dataclass(order=True, slots=True)
 class Score:
     player: Player = field(compare=False)
     score: float = 0
@@ -48,7 +51,52 @@ class Score:
     sosos: float = 0
 
 
-@dataclass(frozen=True)
+RESULT_TYPES = list(ResultType)
+RESULT_CODES = {result: code for code, result in enumerate(RESULT_TYPES)}
+COLORS = list(Color)
+COLOR_CODES = {color: code for code, color in enumerate(COLORS)}
+NO_OPPONENT = -1
+
+
+class PlayerTable:
+    """
+    Compact representation of players used by scoring and pairing. Players are identified by their index and games
+    of all players are kept in flat arrays of opponent indexes, color and result codes. Games of player `idx` are
+    stored at positions from `game_offsets[idx]` to `game_offsets[idx + 1]`.
+    """
+
+    __slots__ = ("players", "index", "initial_scores", "game_offsets", "opponents", "colors", "results")
+
+    def __init__(self, players: list[Player]) -> None:
+        self.players = players
+        self.index = {player.name: idx for idx, player in enumerate(players)}
+        self.initial_scores = array('d', (player.initial_score for player in players))
+        games_count = sum(len(player.games) for player in players)
+        self.game_offsets = array('l', [0]) * (len(players) + 1)
+        self.opponents = array('l', [NO_OPPONENT]) * games_count
+        self.colors = array('b', [0]) * games_count
+        self.results = array('b', [0]) * games_count
+        offset = 0
+        for idx, player in enumerate(players):
+            self.game_offsets[idx] = offset
+            for game in player.games:
+                self.opponents[offset] = self.index.get(game.opponent, NO_OPPONENT)
+                self.colors[offset] = COLOR_CODES[game.color]
+                self.results[offset] = RESULT_CODES[game.result]
+                offset += 1
+        self.game_offsets[len(players)] = offset
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def games(self, idx: int) -> range:
+        return range(self.game_offsets[idx], self.game_offsets[idx + 1])
+
+    def past_opponents(self, idx: int) -> set[int]:
+        return {self.opponents[game] for game in self.games(idx)} - {idx, NO_OPPONENT}
+
+
+@dataclass(frozen=True, slots=True)
 class ColorPreference:
     can_play_as_black: bool
     can_play_as_white: bool
@@ -100,20 +148,31 @@ class Scoring:
     def player_score(self, player: Player) -> float:
         return player.initial_score + sum(self.scoring_scheme[game.result] for game in player.games)
 
+    def get_table_scores(self, table: PlayerTable) -> list[float]:
+        points = [self.scoring_scheme[result] for result in RESULT_TYPES]
+        return [
+            table.initial_scores[idx] + sum(points[table.results[game]] for game in table.games(idx))
+            for idx in range(len(table))
+        ]
+
     def get_scores(self, players: Iterable[Player]) -> list[Score]:
-        scores = {}
-        for player in players:
-            score = self.player_score(player)
-            scores[player.name] = Score(player, score)
-        for player in players:
-            opponents = (g.opponent for g in player.games if g.result != ResultType.BYE)
-            sos = sum(scores[o].score for o in opponents)
-            scores[player.name].sos = sos
-        for player in players:
-            opponents = (g.opponent for g in player.games if g.result != ResultType.BYE)
-            sosos = sum(scores[o].sos for o in opponents)
-            scores[player.name].sosos = sosos
-        return sorted(scores.values(), reverse=True)
+        table = PlayerTable(list(players))
+        bye_code = RESULT_CODES[ResultType.BYE]
+        count = len(table)
+        opponents = [[] for _ in range(count)]
+        for idx in range(count):
+            for game in table.games(idx):
+                if table.results[game] == bye_code:
+                    continue
+                if table.opponents[game] == NO_OPPONENT:
+                    raise KeyError(f"unknown opponent of {table.players[idx].name}")
+                opponents[idx].append(table.opponents[game])
+        scores = self.get_table_scores(table)
+        sos = [sum(scores[opponent] for opponent in opponents[idx]) for idx in range(count)]
+        sosos = [sum(sos[opponent] for opponent in opponents[idx]) for idx in range(count)]
+        return sorted(
+            (Score(table.players[idx], scores[idx], sos[idx], sosos[idx]) for idx in range(count)), reverse=True
+        )
 
 
 Pairing = Tuple[list[Pair], Optional[Player]]
@@ -127,7 +186,8 @@ class MacMahon:
     def get_pairing(self) -> Pairing:
         pairs = []
         bye = self._get_bye(self.players)
-        while len(self.players):
+        self._prepare_search()
+        while self._remaining_count:
             player1 = self._get_first_player()
             player2 = self._get_second_player(player1)
             player1_color_preference = self._get_color_preference(player1)
@@ -148,23 +208,79 @@ class MacMahon:
                 players.remove(player)
                 return player
 
+    def _prepare_search(self) -> None:
+        """
+        Precomputes past opponents of every player as sets of indexes and keeps players in buckets by number of
+        remaining past opponents, so picking a player does not require scanning all remaining players.
+        """
+        count = len(self.players)
+        self._table = PlayerTable(self.players)
+        self._past_opponents = [self._table.past_opponents(idx) for idx in range(count)]
+        self._past_opponent_of = [[] for _ in range(count)]
+        for idx, past_opponents in enumerate(self._past_opponents):
+            for opponent_idx in past_opponents:
+                self._past_opponent_of[opponent_idx].append(idx)
+        # The more remaining past opponents, the fewer possible opponents - such players are paired first.
+        self._blocked_count = [len(past_opponents) for past_opponents in self._past_opponents]
+        self._buckets = defaultdict(list)
+        for idx, blocked_count in enumerate(self._blocked_count):
+            heapq.heappush(self._buckets[blocked_count], idx)
+        # Remaining players as doubly linked list in order of positions, -1 and `count` are sentinels.
+        self._previous = list(range(-1, count - 1))
+        self._next = list(range(1, count + 1))
+        self._removed = [False] * count
+        self._remaining_count = count
+
+    def _remove(self, idx: int) -> None:
+        self._removed[idx] = True
+        self._remaining_count -= 1
+        previous_idx, next_idx = self._previous[idx], self._next[idx]
+        if previous_idx >= 0:
+            self._next[previous_idx] = next_idx
+        if next_idx < len(self.players):
+            self._previous[next_idx] = previous_idx
+        for opponent_idx in self._past_opponent_of[idx]:
+            if not self._removed[opponent_idx]:
+                self._blocked_count[opponent_idx] -= 1
+                heapq.heappush(self._buckets[self._blocked_count[opponent_idx]], opponent_idx)
+
     def _get_first_player(self) -> Player:
-        sorted_players = sorted(self.players, key=lambda player: (len(list(self._possible_opponents(player))), self.position[player.name]))
-        first_player = sorted_players[0]
-        self.players.remove(first_player)
-        return first_player
+        for blocked_count in sorted(self._buckets, reverse=True):
+            bucket = self._buckets[blocked_count]
+            # Skip entries of removed players and players who have already moved to a lower bucket.
+            while bucket and (self._removed[bucket[0]] or self._blocked_count[bucket[0]] != blocked_count):
+                heapq.heappop(bucket)
+            if bucket:
+                first_idx = bucket[0]
+                break
+            del self._buckets[blocked_count]
+        self._remove(first_idx)
+        return self.players[first_idx]
 
     def _get_second_player(self, player1: Player) -> Player:
+        player1_idx = self._table.index[player1.name]
+        past_opponents = self._past_opponents[player1_idx]
+        # Closest possible opponents above and below the first player, pointers of removed player still point
+        # to its remaining neighbours.
+        above_idx = self._previous[player1_idx]
+        while above_idx >= 0 and above_idx in past_opponents:
+            above_idx = self._previous[above_idx]
+        below_idx = self._next[player1_idx]
+        while below_idx < len(self.players) and below_idx in past_opponents:
+            below_idx = self._next[below_idx]
+        candidates = [idx for idx in (above_idx, below_idx) if 0 <= idx < len(self.players)]
+        if not candidates:
+            raise IndexError(f"no possible opponent for {player1.name}")
         player1_position = self.position[player1.name]
-        possible_opponents = self._possible_opponents(player1)
-        sorted_opponents = sorted(possible_opponents, key=lambda player: abs(self.position[player.name] - player1_position))
-        second_player = sorted_opponents[0]
-        self.players.remove(second_player)
-        return second_player
+        second_idx = min(
+            candidates,
+            key=lambda idx: (abs(self.position[self.players[idx].name] - player1_position), idx),
+        )
+        self._remove(second_idx)
+        return self.players[second_idx]
 
     def _possible_opponents(self, player: Player) -> Iterator[Player]:
-        past_opponents = [g.opponent for g in player.games]
-        excluded_players = past_opponents + [player.name]
+        excluded_players = {g.opponent for g in player.games} | {player.name}
         return (opponent for opponent in self.players if opponent.name not in excluded_players)
 
     def _get_color_preference(self, player: Player) -> ColorPreference:
@@ -201,9 +317,144 @@ class MacMahon:
         return tuple(colors)
 
 
-def prepare_next_round(players: list[Player]) -> Pairing:
+class OptimalMacMahon(MacMahon):
+    """
+    Pairs the whole round at once as a minimum cost perfect matching, so it never dead-ends and can accept a slightly
+    worse pair to get a better pairing overall. Players are matched only within a window of nearby positions,
+    which is solved exactly with dynamic programming over pairing states of the window. The window is widened while
+    the best pairing still contains repeated games, up to `max_window` as the cost grows exponentially with it.
+    Repeats left then are removed by swapping opponents between pairs.
+    """
+
+    SCORE_DIFFERENCE_COST = 100
+    POSITION_DISTANCE_COST = 1
+    COLOR_CONFLICT_COST = 20
+    COLOR_PREFERENCE_COST = 5
+    REPEAT_COST = 100_000
+
+    def __init__(
+        self, sorted_players: list[Player], scoring: Optional[Scoring] = None, window: int = 6, max_window: int = 12
+    ):
+        super().__init__(sorted_players)
+        self.scoring = scoring or Scoring()
+        self.window = window
+        self.max_window = max_window
+
+    def get_pairing(self) -> Pairing:
+        bye = self._get_bye(self.players)
+        count = len(self.players)
+        if count % 2:
+            raise ValueError("odd number of players and nobody can get a bye")
+        table = PlayerTable(self.players)
+        self._scores = self.scoring.get_table_scores(table)
+        self._past_opponents = [table.past_opponents(idx) for idx in range(count)]
+        self._color_preferences = [self._get_color_preference(player) for player in self.players]
+        max_window = min(self.max_window, count - 1)
+        window = min(self.window, max_window)
+        while True:
+            matching, cost = self._get_matching(window)
+            if cost < self.REPEAT_COST or window >= max_window:
+                break
+            window = min(window * 2, max_window)
+        if cost >= self.REPEAT_COST:
+            matching = self._swap_repeated_opponents(matching)
+
+        pairs = []
+        for idx1, idx2 in matching:
+            player1, player2 = self.players[idx1], self.players[idx2]
+            player1_color, _ = self._determine_colors(self._color_preferences[idx1], self._color_preferences[idx2])
+            if player1_color == Color.BLACK:
+                pairs.append(Pair(player1, player2))
+            else:
+                pairs.append(Pair(player2, player1))
+        return pairs, bye
+
+    def _get_matching(self, window: int) -> Tuple[list[Tuple[int, int]], float]:
+        count = len(self.players)
+        # States for every position: bit `k` of a mask is set if player `idx + k` is already paired with someone above.
+        # Each state keeps the lowest cost of reaching it, previous mask and offset of the opponent (0 if none).
+        states = [dict() for _ in range(count + 1)]
+        states[0][0] = (0, None, 0)
+        for idx in range(count):
+            for mask, (cost, _, _) in states[idx].items():
+                if mask & 1:
+                    self._update_state(states[idx + 1], mask >> 1, cost, mask, 0)
+                    continue
+                for offset in range(1, min(window, count - 1 - idx) + 1):
+                    if not mask & (1 << offset):
+                        pair_cost = self._get_pair_cost(idx, idx + offset)
+                        self._update_state(states[idx + 1], (mask | (1 << offset)) >> 1, cost + pair_cost, mask, offset)
+
+        matching = []
+        mask = 0
+        for idx in range(count, 0, -1):
+            _, previous_mask, offset = states[idx][mask]
+            if offset:
+                matching.append((idx - 1, idx - 1 + offset))
+            mask = previous_mask
+        matching.reverse()
+        return matching, states[count][0][0]
+
+    def _swap_repeated_opponents(self, matching: list[Tuple[int, int]]) -> list[Tuple[int, int]]:
+        """
+        Repeats left by the largest window are removed by swapping opponents of a repeated pair with another pair,
+        choosing the swap which lowers the cost the most, until no swap lowers it.
+        """
+        matching = list(matching)
+        improved = True
+        while improved:
+            improved = False
+            for i, (idx1, idx2) in enumerate(matching):
+                if idx2 not in self._past_opponents[idx1]:
+                    continue
+                best_change, best_swap = 0, None
+                for j, (idx3, idx4) in enumerate(matching):
+                    if j == i:
+                        continue
+                    old_cost = self._get_pair_cost(idx1, idx2) + self._get_pair_cost(idx3, idx4)
+                    for pair1, pair2 in [((idx1, idx3), (idx2, idx4)), ((idx1, idx4), (idx2, idx3))]:
+                        pair1, pair2 = tuple(sorted(pair1)), tuple(sorted(pair2))
+                        change = self._get_pair_cost(*pair1) + self._get_pair_cost(*pair2) - old_cost
+                        if change < best_change:
+                            best_change, best_swap = change, (j, pair1, pair2)
+                if best_swap:
+                    j, matching[i], matching[j] = best_swap
+                    improved = True
+        return sorted(matching)
+
+    @staticmethod
+    def _update_state(states: dict, mask: int, cost: float, previous_mask: int, offset: int) -> None:
+        if mask not in states or cost < states[mask][0]:
+            states[mask] = (cost, previous_mask, offset)
+
+    def _get_pair_cost(self, idx1: int, idx2: int) -> float:
+        cost = self.SCORE_DIFFERENCE_COST * (self._scores[idx1] - self._scores[idx2]) ** 2
+        cost += self.POSITION_DISTANCE_COST * (idx2 - idx1)
+        if idx2 in self._past_opponents[idx1]:
+            cost += self.REPEAT_COST
+        preference1, preference2 = self._color_preferences[idx1], self._color_preferences[idx2]
+        if (not preference1.can_play_as_black and not preference2.can_play_as_black) or (
+            not preference1.can_play_as_white and not preference2.can_play_as_white
+        ):
+            cost += self.COLOR_CONFLICT_COST
+        elif (not preference1.should_play_as_black and not preference2.should_play_as_black) or (
+            not preference1.should_play_as_white and not preference2.should_play_as_white
+        ):
+            cost += self.COLOR_PREFERENCE_COST
+        return cost
+
+
+class PairingEngine(str, Enum):
+    GREEDY = 'greedy'
+    OPTIMAL = 'optimal'
+
+
+def prepare_next_round(players: list[Player], engine: PairingEngine = PairingEngine.GREEDY) -> Pairing:
     scoring = Scoring()
     scores = scoring.get_scores(players)
     sorted_players = [score.player for score in scores]
-    macmahon = MacMahon(sorted_players)
+    if engine == PairingEngine.OPTIMAL:
+        macmahon = OptimalMacMahon(sorted_players, scoring=scoring)
+    else:
+        macmahon = MacMahon(sorted_players)
     return macmahon.get_pairing()
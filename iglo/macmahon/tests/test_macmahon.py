@@ -1,10 +1,12 @@
 import random
+import time
 from operator import itemgetter
 from unittest import mock
 
 import pytest
 
-from macmahon.macmahon import MacMahon, Color, ColorPreference, Pair, prepare_next_round
+from macmahon.macmahon import MacMahon, Color, ColorPreference, Pair, prepare_next_round, GameRecord, Player, \
+    ResultType, Scoring, OptimalMacMahon, PairingEngine
 from macmahon.tests.conftest import alice, bob, cindy, dean, eve, floyd, player_with_no_games, player_with_only_bye, \
     sylwia, patryk, jetbrain, kjkz, kubit, hornedrat, mithirii, kam
 
@@ -154,3 +156,165 @@ def test_real_live_round_4(real_live_players_round_4):
     assert pair4.black.name == jetbrain.name
     assert pair4.white.name == hornedrat.name
     assert bye is None
+
+
+def _reference_pairs(sorted_players):
+    """Straightforward implementation of pairing rules: player with the fewest possible opponents is paired first,
+    with the closest possible opponent by position."""
+    players = sorted_players[:]
+    position = {player.name: pos for pos, player in enumerate(players)}
+    MacMahon([])._get_bye(players)
+    pairs = []
+    while players:
+        def possible_opponents(player):
+            excluded = [g.opponent for g in player.games] + [player.name]
+            return [opponent for opponent in players if opponent.name not in excluded]
+
+        player1 = min(players, key=lambda player: (len(possible_opponents(player)), position[player.name]))
+        players.remove(player1)
+        player2 = min(
+            possible_opponents(player1),
+            key=lambda player: (abs(position[player.name] - position[player1.name]), position[player.name]),
+        )
+        players.remove(player2)
+        pairs.append({player1.name, player2.name})
+    return pairs
+
+
+def _simulated_players(number_of_players, number_of_rounds, seed):
+    rng = random.Random(seed)
+    names = [f'player-{idx}' for idx in range(number_of_players)]
+    records = {name: [] for name in names}
+    for _ in range(number_of_rounds):
+        rng.shuffle(names)
+        if len(names) % 2:
+            records[names[-1]].append(GameRecord('', Color.BYE, ResultType.BYE))
+        for black, white in zip(names[::2], names[1::2]):
+            black_won = rng.random() < 0.5
+            records[black].append(GameRecord(white, Color.BLACK, ResultType.WIN if black_won else ResultType.LOSE))
+            records[white].append(GameRecord(black, Color.WHITE, ResultType.LOSE if black_won else ResultType.WIN))
+    return [Player(name, 0, -rng.randint(0, 2), records[name]) for name in sorted(names)]
+
+
+@pytest.mark.parametrize('number_of_players, number_of_rounds', [(10, 3), (25, 5), (60, 6), (201, 8)])
+def test_get_pairing_matches_reference(number_of_players, number_of_rounds):
+    players = _simulated_players(number_of_players, number_of_rounds, seed=number_of_players)
+    sorted_players = [score.player for score in Scoring().get_scores(players)]
+
+    pairs, bye = MacMahon(sorted_players).get_pairing()
+
+    assert [{pair.black.name, pair.white.name} for pair in pairs] == _reference_pairs(sorted_players)
+
+
+def _players_from_history(history):
+    return [
+        Player(name, 0, initial_score, [GameRecord(opponent, color, result) for opponent, color, result in games])
+        for name, initial_score, games in history
+    ]
+
+
+dead_end_players = _players_from_history([
+    ('p0', 0, [('p4', Color.WHITE, ResultType.WIN), ('p5', Color.WHITE, ResultType.WIN),
+               ('p1', Color.WHITE, ResultType.LOSE)]),
+    ('p1', 0, [('p3', Color.WHITE, ResultType.LOSE), ('p4', Color.BLACK, ResultType.WIN),
+               ('p0', Color.BLACK, ResultType.WIN)]),
+    ('p2', 0, [('p5', Color.WHITE, ResultType.WIN), ('p3', Color.WHITE, ResultType.WIN),
+               ('p5', Color.WHITE, ResultType.LOSE)]),
+    ('p3', -2, [('p1', Color.BLACK, ResultType.WIN), ('p2', Color.BLACK, ResultType.LOSE),
+                ('p4', Color.BLACK, ResultType.LOSE)]),
+    ('p4', 0, [('p0', Color.BLACK, ResultType.LOSE), ('p1', Color.WHITE, ResultType.LOSE),
+               ('p3', Color.WHITE, ResultType.WIN)]),
+    ('p5', 0, [('p2', Color.BLACK, ResultType.LOSE), ('p0', Color.BLACK, ResultType.LOSE),
+               ('p2', Color.BLACK, ResultType.WIN)]),
+])
+
+
+def _repeated_pairs(pairs):
+    return [pair for pair in pairs if pair.white.name in {g.opponent for g in pair.black.games}]
+
+
+def test_optimal_pairing_when_greedy_dead_ends():
+    with pytest.raises(IndexError):
+        prepare_next_round(dead_end_players)
+
+    pairs, bye = prepare_next_round(dead_end_players, engine=PairingEngine.OPTIMAL)
+
+    assert bye is None
+    assert sorted(name for pair in pairs for name in (pair.black.name, pair.white.name)) == [
+        'p0', 'p1', 'p2', 'p3', 'p4', 'p5'
+    ]
+    assert _repeated_pairs(pairs) == []
+
+
+def test_optimal_pairing_pairs_neighbours_in_first_round():
+    players = [Player(f'player-{idx}', 0, 0) for idx in range(6)]
+
+    pairs, bye = OptimalMacMahon(players).get_pairing()
+
+    assert [{pair.black.name, pair.white.name} for pair in pairs] == [
+        {'player-0', 'player-1'}, {'player-2', 'player-3'}, {'player-4', 'player-5'}
+    ]
+
+
+def test_optimal_pairing_avoids_repeats(sorted_players):
+    pairs, bye = OptimalMacMahon(sorted_players).get_pairing()
+
+    assert bye == cindy
+    assert _repeated_pairs(pairs) == []
+
+
+@pytest.mark.parametrize('number_of_players, number_of_rounds', [(25, 5), (201, 8)])
+def test_optimal_pairing_of_simulated_tournament(number_of_players, number_of_rounds):
+    players = _simulated_players(number_of_players, number_of_rounds, seed=number_of_players)
+
+    pairs, bye = prepare_next_round(players, engine=PairingEngine.OPTIMAL)
+
+    paired = [name for pair in pairs for name in (pair.black.name, pair.white.name)] + ([bye.name] if bye else [])
+    assert sorted(paired) == sorted(player.name for player in players)
+    assert _repeated_pairs(pairs) == []
+
+
+def _play_round(players, pairs, bye, rng):
+    new_games = {player.name: [] for player in players}
+    for pair in pairs:
+        black_won = rng.random() < 0.5
+        new_games[pair.black.name].append(
+            GameRecord(pair.white.name, Color.BLACK, ResultType.WIN if black_won else ResultType.LOSE)
+        )
+        new_games[pair.white.name].append(
+            GameRecord(pair.black.name, Color.WHITE, ResultType.LOSE if black_won else ResultType.WIN)
+        )
+    if bye:
+        new_games[bye.name].append(GameRecord('', Color.BYE, ResultType.BYE))
+    return [Player(p.name, p.rating, p.initial_score, p.games + new_games[p.name]) for p in players]
+
+
+@pytest.mark.parametrize('number_of_players, number_of_rounds', [(30, 20), (40, 25)])
+def test_optimal_pairing_late_rounds_are_fast(number_of_players, number_of_rounds):
+    rng = random.Random(number_of_players)
+    players = [Player(f'player-{idx}', 0, -(idx * 3 // number_of_players)) for idx in range(number_of_players)]
+    durations = []
+    repeats = 0
+    for _ in range(number_of_rounds):
+        start = time.perf_counter()
+        pairs, bye = prepare_next_round(players, engine=PairingEngine.OPTIMAL)
+        durations.append(time.perf_counter() - start)
+        repeats += len(_repeated_pairs(pairs))
+        players = _play_round(players, pairs, bye, rng)
+
+    # Window is capped, so late rounds with many past opponents are not slower than a few hundred milliseconds
+    assert max(durations) < 2
+    assert repeats <= number_of_rounds // 10
+
+
+def test_optimal_pairing_swaps_opponents_of_repeats_outside_window():
+    players = _players_from_history([
+        ('p0', 0, [('p1', Color.BLACK, ResultType.WIN)]),
+        ('p1', 0, [('p0', Color.WHITE, ResultType.LOSE)]),
+        ('p2', 0, [('p3', Color.BLACK, ResultType.WIN)]),
+        ('p3', 0, [('p2', Color.WHITE, ResultType.LOSE)]),
+    ])
+
+    pairs, bye = OptimalMacMahon(players, window=1, max_window=1).get_pairing()
+
+    assert _repeated_pairs(pairs) == []
@@ -0,0 +1,24 @@
+from macmahon.macmahon import PlayerTable, NO_OPPONENT, COLOR_CODES, RESULT_CODES, Color, ResultType
+from macmahon.tests.conftest import alice, bob, eve
+
+
+def test_player_table(players):
+    table = PlayerTable(players)
+
+    assert len(table) == 5
+    assert list(table.game_offsets) == [0, 3, 6, 9, 12, 15]
+    assert [table.opponents[game] for game in table.games(1)] == [0, 4, NO_OPPONENT]
+    assert [table.colors[game] for game in table.games(1)] == [
+        COLOR_CODES[Color.WHITE], COLOR_CODES[Color.BLACK], COLOR_CODES[Color.BYE]
+    ]
+    assert [table.results[game] for game in table.games(1)] == [
+        RESULT_CODES[ResultType.LOSE], RESULT_CODES[ResultType.LOSE], RESULT_CODES[ResultType.BYE]
+    ]
+    assert list(table.initial_scores) == [0, 0, 0, -1, -1]
+
+
+def test_past_opponents_skip_players_outside_table():
+    table = PlayerTable([alice, bob, eve])
+
+    assert table.past_opponents(0) == {1}
+    assert table.past_opponents(2) == {1}
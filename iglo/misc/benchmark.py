@@ -0,0 +1,95 @@
+"""
+Helpers for reproducible benchmarks. Results are plain dictionaries, so they can be dumped as JSON and compared
+across commits.
+"""
+
+import argparse
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Optional
+
+
+@dataclass(frozen=True)
+class Measurement:
+    wall_time: float  # best of repeats, in seconds
+    retained_bytes: int  # memory allocated by the call and still held after it, not the total of allocations
+    peak_memory: int  # peak memory allocated during the call, in bytes
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def measure(func: Callable, *args, repeat: int = 1, **kwargs) -> tuple[Any, Measurement]:
+    """
+    Calls the function `repeat` times to measure wall time and once more with `tracemalloc` enabled to measure memory,
+    as tracing allocations slows the call down. Returns result of the last call.
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat has to be at least 1, got {repeat}")
+    wall_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        wall_times.append(time.perf_counter() - start)
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    result = func(*args, **kwargs)
+    after, peak = tracemalloc.get_traced_memory()
+    if not was_tracing:
+        tracemalloc.stop()
+    return result, Measurement(wall_time=min(wall_times), retained_bytes=after - before, peak_memory=peak - before)
+
+
+def positive_int(value: str) -> int:
+    """Argument type of numbers of measured calls."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"has to be at least 1, got {number}")
+    return number
+
+
+def summarize(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "total": sum(values),
+        "mean": statistics.mean(values),
+        "max": max(values),
+    }
+
+
+def percentile(values: list[float], fraction: float) -> Optional[float]:
+    """Percentile with linear interpolation between closest values, e.g. `fraction=0.95` for p95."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def get_environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "commit": _get_commit(),
+    }
+
+
+def _get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
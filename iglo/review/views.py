@@ -1,7 +1,7 @@
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from django.views.generic import DetailView, ListView
 
-from league.models import Game
+from league.models import Game, Group
 from review.models import Teacher
 
 
@@ -15,6 +15,9 @@ class TeacherListView(ListView):
 class TeacherDetailView(DetailView):
     model = Teacher
 
+    def get_queryset(self):
+        return super().get_queryset().prefetch_related(Prefetch("groups", queryset=Group.objects.select_related("season")))
+
 
 class ReviewListView(ListView):
     model = Game  # todo: split reviews from game?
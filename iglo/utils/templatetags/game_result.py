@@ -7,9 +7,9 @@ from league.models import WinType, Game
 def result(game: Game):
     if not game.is_played:
         return None
-    if not game.winner or game.is_bye:
+    if not game.winner_id or game.is_bye:
         return WinType(game.win_type).label
-    winner_color = "B" if game.winner == game.black else "W"
+    winner_color = "B" if game.winner_id == game.black_id else "W"
     if game.win_type:
         win_type = (
             game.points_difference or 0.5 if game.win_type == WinType.POINTS else WinType(game.win_type).label